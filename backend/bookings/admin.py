@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Booking, Ticket
+from .models import ArchivedBooking, Booking, DailySales, Ticket
 
 
 class TicketInline(admin.TabularInline):
@@ -80,3 +80,46 @@ class TicketAdmin(admin.ModelAdmin):
         ("QR Code", {"fields": ("qr_code",)}),
         ("Timestamps", {"fields": ("created_at",)}),
     )
+
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(admin.ModelAdmin):
+    list_display = (
+        "booking_number",
+        "user_id",
+        "show_start_time",
+        "total_seats",
+        "total_amount",
+        "booking_status",
+        "archived_at",
+    )
+    list_filter = ("payment_status", "booking_status", "show_type")
+    search_fields = ("booking_number",)
+    date_hierarchy = "show_start_time"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    list_display = (
+        "date",
+        "show_id",
+        "movie_id",
+        "payment_method",
+        "bookings",
+        "tickets",
+        "revenue",
+    )
+    list_filter = ("show_type", "payment_method")
+    date_hierarchy = "date"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
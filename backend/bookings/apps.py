@@ -7,4 +7,4 @@ class BookingsConfig(AppConfig):
 
     def ready(self):
         """Initialize app when ready."""
-        pass
+        from . import signals  # noqa: F401
@@ -0,0 +1,290 @@
+"""
+Cold storage for historical bookings.
+
+Bookings for shows that ended before the retention window are moved into
+ArchivedBooking, one bounded chunk per transaction, and removed from the hot
+booking and ticket tables. BookingHistory gives reporting code one interface
+over both tiers.
+"""
+
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from itertools import chain
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.utils import timezone
+
+from coupons.models import CouponUsage
+from promotions.models import PointsTransaction
+
+from .models import ArchivedBooking, Booking, Ticket
+
+# Booking fields copied to the archive as they are
+COPIED_FIELDS = (
+    "id",
+    "booking_number",
+    "user_id",
+    "show_id",
+    "total_seats",
+    "total_amount",
+    "discount_amount",
+    "promotion_applied",
+    "payment_status",
+    "booking_status",
+    "payment_method",
+    "payment_reference",
+    "created_at",
+    "updated_at",
+)
+
+
+def get_archive_cutoff(days=None):
+    """Return the show end time before which bookings are archived."""
+    if days is None:
+        days = getattr(settings, "BOOKING_ARCHIVE_RETENTION_DAYS", 365)
+    return timezone.now() - timedelta(days=days)
+
+
+def archivable_bookings(cutoff):
+    """Return live bookings whose show ended before the cutoff."""
+    return Booking.objects.filter(show__end_time__lt=cutoff)
+
+
+def archive_bookings(cutoff, chunk_size=500, start_after=0):
+    """
+    Move bookings for shows that ended before the cutoff into cold storage.
+
+    Each chunk is copied and deleted in one transaction, so an interrupted
+    run leaves every booking in exactly one tier and can simply be rerun.
+
+    Yields ``(archived, last_id)`` after each chunk is committed.
+    """
+    queryset = archivable_bookings(cutoff)
+    last_id = start_after
+
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values(
+                *COPIED_FIELDS,
+                movie_id=F("show__movie_id"),
+                theater_id=F("show__theater_id"),
+                show_start_time=F("show__start_time"),
+                show_type=F("show__show_type"),
+            )[:chunk_size]
+        )
+        if not rows:
+            break
+
+        ids = [row["id"] for row in rows]
+        tickets = defaultdict(list)
+        ticket_rows = (
+            Ticket.objects.filter(booking_id__in=ids)
+            .order_by("id")
+            .values_list("booking_id", *ArchivedBooking.TICKET_FIELDS)
+        )
+        for booking_id, number, seat, category, price, is_used in ticket_rows:
+            tickets[booking_id].append([number, seat, category, str(price), is_used])
+
+        with transaction.atomic():
+            ArchivedBooking.objects.bulk_create(
+                [ArchivedBooking(tickets=tickets[row["id"]], **row) for row in rows]
+            )
+            # Archived bookings keep their id; keep coupon usages and points
+            # transactions pointing at them
+            for model in (CouponUsage, PointsTransaction):
+                model.objects.filter(booking_id__in=ids).update(
+                    archived_booking_id=F("booking_id")
+                )
+            Ticket.objects.filter(booking_id__in=ids).delete()
+            Booking.objects.filter(id__in=ids).delete()
+
+        last_id = ids[-1]
+        yield len(ids), last_id
+
+
+class BookingHistory:
+    """
+    Query live and archived bookings as one data set.
+
+    Filters and aggregates use the field names below, which are translated
+    to the matching lookup on each tier. Only additive aggregates (Sum,
+    Count, Min, Max) are supported, because results from the two tiers are
+    merged in Python.
+
+    Example::
+
+        BookingHistory(show_start_time__gte=start).aggregate_by(
+            "movie", revenue=Sum("total_amount"), bookings=Count("id")
+        )
+    """
+
+    # Unified field name -> (live lookup, archive lookup)
+    FIELDS = {
+        "id": ("id", "id"),
+        "booking_number": ("booking_number", "booking_number"),
+        "user": ("user", "user"),
+        "show": ("show", "show"),
+        "movie": ("show__movie", "movie"),
+        "theater": ("show__theater", "theater"),
+        "show_type": ("show__show_type", "show_type"),
+        "show_start_time": ("show__start_time", "show_start_time"),
+        "total_seats": ("total_seats", "total_seats"),
+        "total_amount": ("total_amount", "total_amount"),
+        "discount_amount": ("discount_amount", "discount_amount"),
+        "promotion_applied": ("promotion_applied", "promotion_applied"),
+        "payment_status": ("payment_status", "payment_status"),
+        "booking_status": ("booking_status", "booking_status"),
+        "payment_method": ("payment_method", "payment_method"),
+        "created_at": ("created_at", "created_at"),
+    }
+
+    # How partial results from the two tiers are combined
+    MERGERS = {
+        Sum: lambda a, b: b if a is None else a if b is None else a + b,
+        Count: lambda a, b: (a or 0) + (b or 0),
+        Min: lambda a, b: b if a is None else a if b is None else min(a, b),
+        Max: lambda a, b: b if a is None else a if b is None else max(a, b),
+    }
+
+    def __init__(self, **filters):
+        self.filters = filters
+
+    def filter(self, **filters):
+        return BookingHistory(**{**self.filters, **filters})
+
+    def _translate(self, name, archived):
+        """Translate a unified field name or lookup to one tier's lookup."""
+        field, _, lookup = name.partition("__")
+        if field not in self.FIELDS:
+            raise ValueError(f"Unknown booking history field: {field}")
+        translated = self.FIELDS[field][1 if archived else 0]
+        return f"{translated}__{lookup}" if lookup else translated
+
+    def _querysets(self):
+        live = Booking.objects.filter(
+            **{self._translate(k, False): v for k, v in self.filters.items()}
+        )
+        archived = ArchivedBooking.objects.filter(
+            **{self._translate(k, True): v for k, v in self.filters.items()}
+        )
+        return ((live, False), (archived, True))
+
+    def _translate_aggregates(self, aggregates, archived):
+        translated = {}
+        for name, aggregate in aggregates.items():
+            if type(aggregate) not in self.MERGERS:
+                raise ValueError(
+                    f"Unsupported aggregate for booking history: {aggregate}"
+                )
+            field = aggregate.source_expressions[0].name
+            translated[name] = type(aggregate)(self._translate(field, archived))
+        return translated
+
+    def count(self):
+        return sum(queryset.count() for queryset, _ in self._querysets())
+
+    def aggregate(self, **aggregates):
+        """Like QuerySet.aggregate, over both tiers."""
+        result = {}
+        for queryset, archived in self._querysets():
+            partial = queryset.aggregate(
+                **self._translate_aggregates(aggregates, archived)
+            )
+            for name, aggregate in aggregates.items():
+                merge = self.MERGERS[type(aggregate)]
+                result[name] = merge(result.get(name), partial[name])
+        return result
+
+    def aggregate_by(self, *fields, **aggregates):
+        """
+        Group by the given fields and aggregate, over both tiers.
+
+        Returns a list of dicts keyed by the unified field names.
+        """
+        groups = {}
+        for queryset, archived in self._querysets():
+            lookups = {field: self._translate(field, archived) for field in fields}
+            rows = (
+                queryset.order_by()
+                .values(*lookups.values())
+                .annotate(**self._translate_aggregates(aggregates, archived))
+            )
+            for row in rows:
+                key = tuple(row[lookups[field]] for field in fields)
+                group = groups.setdefault(key, dict(zip(fields, key)))
+                for name, aggregate in aggregates.items():
+                    merge = self.MERGERS[type(aggregate)]
+                    group[name] = merge(group.get(name), row[name])
+        return list(groups.values())
+
+    def aggregate_tickets(self, *fields):
+        """
+        Group the bookings' tickets by ticket fields, over both tiers.
+
+        ``fields`` are names from ArchivedBooking.TICKET_FIELDS. Returns a
+        list of dicts with the fields, ``tickets`` (the number of tickets)
+        and ``revenue`` (the sum of their prices). Archived tickets are read
+        from their bookings' JSON and added up in Python.
+        """
+        (live, _), (archived, _) = self._querysets()
+        groups = {}
+
+        def add(key, tickets, revenue):
+            group = groups.setdefault(
+                key, {**dict(zip(fields, key)), "tickets": 0, "revenue": Decimal(0)}
+            )
+            group["tickets"] += tickets
+            group["revenue"] += revenue
+
+        rows = (
+            Ticket.objects.filter(booking__in=live)
+            .order_by()
+            .values(*fields)
+            .annotate(tickets=Count("id"), revenue=Sum("price"))
+        )
+        for row in rows:
+            add(tuple(row[field] for field in fields), row["tickets"], row["revenue"])
+
+        positions = [ArchivedBooking.TICKET_FIELDS.index(field) for field in fields]
+        price = ArchivedBooking.TICKET_FIELDS.index("price")
+        for tickets in archived.values_list("tickets", flat=True).iterator():
+            for ticket in tickets:
+                key = tuple(ticket[position] for position in positions)
+                add(key, 1, Decimal(ticket[price]))
+        return list(groups.values())
+
+    def values(self, *fields):
+        """Iterate over rows from both tiers as dicts with unified field names."""
+        for queryset, archived in self._querysets():
+            lookups = {field: self._translate(field, archived) for field in fields}
+            for row in queryset.values(*lookups.values()).iterator():
+                yield {field: row[lookup] for field, lookup in lookups.items()}
+
+    def values_list(self, *fields, order_by=(), chunk_size=2000):
+        """
+        Iterate over rows from both tiers as tuples of the given fields.
+
+        With ``order_by`` (unified field names, ascending, all among
+        ``fields``), each tier is sorted by the database and the two streams
+        are merged, so rows come out in order without sorting in memory.
+        """
+        tiers = []
+        for queryset, archived in self._querysets():
+            queryset = queryset.order_by(
+                *(self._translate(field, archived) for field in order_by)
+            )
+            lookups = [self._translate(field, archived) for field in fields]
+            tiers.append(queryset.values_list(*lookups).iterator(chunk_size))
+
+        if not order_by:
+            return chain(*tiers)
+        positions = [fields.index(field) for field in order_by]
+        return heapq.merge(
+            *tiers, key=lambda row: tuple(row[position] for position in positions)
+        )
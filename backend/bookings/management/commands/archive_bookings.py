@@ -0,0 +1,93 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.archive import archivable_bookings, archive_bookings, get_archive_cutoff
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Management command to move historical bookings into cold storage.
+
+    Bookings (and their tickets) for shows that ended before the retention
+    window are copied into the archive table and removed from the hot
+    tables, one chunk per transaction. Reports read both tiers through
+    bookings.archive.BookingHistory.
+    """
+
+    help = "Moves bookings for shows older than the retention window into the archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Archive bookings for shows that ended more than this many days ago "
+            "(default: BOOKING_ARCHIVE_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of bookings to move per transaction (default: 500)",
+        )
+        parser.add_argument(
+            "--start-after",
+            type=int,
+            default=0,
+            help="Resume after this booking id",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Perform a dry run without making any changes",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        start_after = options["start_after"]
+
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        cutoff = get_archive_cutoff(options["days"])
+        count = archivable_bookings(cutoff).filter(id__gt=start_after).count()
+
+        self.stdout.write(
+            f"Found {count} bookings for shows that ended before "
+            f"{cutoff.strftime('%Y-%m-%d %H:%M')} to archive"
+        )
+
+        if count == 0:
+            self.stdout.write(self.style.SUCCESS("No bookings to archive."))
+            return
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(f"DRY RUN: Would archive {count} bookings.")
+            )
+            return
+
+        archived = 0
+        last_id = start_after
+        try:
+            for chunk_count, last_id in archive_bookings(
+                cutoff, chunk_size=chunk_size, start_after=start_after
+            ):
+                archived += chunk_count
+                self.stdout.write(
+                    f"Archived {archived}/{count} bookings (last id {last_id})"
+                )
+                self.stdout.flush()
+        except Exception as e:
+            logger.error(f"Error archiving bookings: {str(e)}")
+            raise CommandError(
+                f"Failed to archive bookings after {archived} bookings: {str(e)}. "
+                f"Resume with --start-after {last_id}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully archived {archived} bookings.")
+        )
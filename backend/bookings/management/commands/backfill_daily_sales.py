@@ -0,0 +1,68 @@
+import logging
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.sales import rebuild_daily_sales
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Management command to rebuild the daily sales fact table.
+
+    The table is kept up to date as bookings are saved; run this once after
+    deploying it, or to repair a date range after bookings were changed with
+    queryset.update(), which bypasses the signals that maintain it. Archived
+    bookings are included.
+    """
+
+    help = "Rebuilds daily sales totals from live and archived bookings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start-date",
+            type=str,
+            help="First booking date to rebuild (YYYY-MM-DD, default: earliest)",
+        )
+        parser.add_argument(
+            "--end-date",
+            type=str,
+            help="Last booking date to rebuild (YYYY-MM-DD, default: latest)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows per INSERT (default: 1000)",
+        )
+
+    def parse_date(self, value, option):
+        if value is None:
+            return None
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"{option} must be in YYYY-MM-DD format")
+
+    def handle(self, *args, **options):
+        start_date = self.parse_date(options["start_date"], "--start-date")
+        end_date = self.parse_date(options["end_date"], "--end-date")
+
+        if start_date and end_date and start_date > end_date:
+            raise CommandError("--start-date must not be after --end-date")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        try:
+            count = rebuild_daily_sales(
+                start_date, end_date, batch_size=options["batch_size"]
+            )
+        except Exception as e:
+            logger.error(f"Error rebuilding daily sales: {str(e)}")
+            raise CommandError(f"Failed to rebuild daily sales: {str(e)}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully rebuilt {count} daily sales rows.")
+        )
@@ -0,0 +1,124 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0001_initial"),
+        ("movies", "0003_show_is_archived"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedBooking",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("booking_number", models.CharField(max_length=20, unique=True)),
+                ("show_start_time", models.DateTimeField()),
+                ("show_type", models.CharField(max_length=20)),
+                ("total_seats", models.PositiveIntegerField()),
+                ("total_amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "discount_amount",
+                    models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+                ),
+                ("promotion_applied", models.BooleanField(default=False)),
+                (
+                    "payment_status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("COMPLETED", "Completed"),
+                            ("FAILED", "Failed"),
+                            ("REFUNDED", "Refunded"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "booking_status",
+                    models.CharField(
+                        choices=[
+                            ("RESERVED", "Reserved"),
+                            ("CONFIRMED", "Confirmed"),
+                            ("CANCELLED", "Cancelled"),
+                            ("EXPIRED", "Expired"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "payment_method",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                (
+                    "payment_reference",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                ("tickets", models.JSONField(default=list)),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="archived_bookings",
+                        to="movies.movie",
+                    ),
+                ),
+                (
+                    "show",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="archived_bookings",
+                        to="movies.show",
+                    ),
+                ),
+                (
+                    "theater",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="archived_bookings",
+                        to="movies.theater",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="archived_bookings",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["user"], name="bookings_ar_user_id_5d6698_idx"
+                    ),
+                    models.Index(
+                        fields=["created_at"], name="bookings_ar_created_cf404f_idx"
+                    ),
+                    models.Index(
+                        fields=["show_start_time"],
+                        name="bookings_ar_show_st_8b3d0c_idx",
+                    ),
+                    models.Index(
+                        fields=["movie", "show_start_time"],
+                        name="bookings_ar_movie_i_be8b8a_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
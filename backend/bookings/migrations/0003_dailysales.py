@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0002_archivedbooking"),
+        ("movies", "0003_show_is_archived"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("show_type", models.CharField(max_length=20)),
+                (
+                    "payment_method",
+                    models.CharField(blank=True, default="", max_length=100),
+                ),
+                ("bookings", models.IntegerField(default=0)),
+                ("tickets", models.IntegerField(default=0)),
+                (
+                    "gross_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "discount_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("confirmed_bookings", models.IntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("cancelled_bookings", models.IntegerField(default=0)),
+                (
+                    "refunded_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="daily_sales",
+                        to="movies.movie",
+                    ),
+                ),
+                (
+                    "show",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="daily_sales",
+                        to="movies.show",
+                    ),
+                ),
+                (
+                    "theater",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="daily_sales",
+                        to="movies.theater",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+                "indexes": [
+                    models.Index(
+                        fields=["movie", "date"], name="bookings_da_movie_i_4a7418_idx"
+                    ),
+                    models.Index(
+                        fields=["theater", "date"],
+                        name="bookings_da_theater_4201a5_idx",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("date", "show", "payment_method"),
+                        name="unique_daily_sales",
+                    )
+                ],
+            },
+        ),
+    ]
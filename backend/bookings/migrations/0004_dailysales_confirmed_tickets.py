@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:20
+
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def set_confirmed_tickets(apps, schema_editor):
+    DailySales = apps.get_model("bookings", "DailySales")
+    for model_name in ("Booking", "ArchivedBooking"):
+        model = apps.get_model("bookings", model_name)
+        rows = (
+            model.objects.filter(booking_status="CONFIRMED")
+            .values("show", "payment_method", date=TruncDate("created_at"))
+            .annotate(seats=Sum("total_seats"))
+            .order_by()
+        )
+        for row in rows:
+            DailySales.objects.filter(
+                date=row["date"],
+                show=row["show"],
+                payment_method=row["payment_method"] or "",
+            ).update(confirmed_tickets=models.F("confirmed_tickets") + row["seats"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0003_dailysales"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailysales",
+            name="confirmed_tickets",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(set_confirmed_tickets, migrations.RunPython.noop),
+    ]
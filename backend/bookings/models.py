@@ -105,3 +105,143 @@ class Ticket(models.Model):
             models.Index(fields=["ticket_number"]),
             models.Index(fields=["booking"]),
         ]
+
+
+class ArchivedBooking(models.Model):
+    """
+    Cold-storage copy of a booking whose show is past the retention window.
+
+    Archived bookings keep their original id and booking number. Show
+    details needed for reporting are copied onto the row, and the booking's
+    tickets are packed into a single JSON column, so the hot booking and
+    ticket tables can be pruned. References are kept without database
+    constraints because the show, movie or user may be deleted later.
+    """
+
+    # Positions of the values stored for each ticket in ``tickets``
+    TICKET_FIELDS = (
+        "ticket_number",
+        "seat_number",
+        "seat_category",
+        "price",
+        "is_used",
+    )
+
+    id = models.BigIntegerField(primary_key=True)
+    booking_number = models.CharField(max_length=20, unique=True)
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="archived_bookings",
+    )
+    show = models.ForeignKey(
+        Show,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="archived_bookings",
+    )
+    movie = models.ForeignKey(
+        "movies.Movie",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="archived_bookings",
+    )
+    theater = models.ForeignKey(
+        "movies.Theater",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="archived_bookings",
+    )
+    show_start_time = models.DateTimeField()
+    show_type = models.CharField(max_length=20)
+    total_seats = models.PositiveIntegerField()
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    promotion_applied = models.BooleanField(default=False)
+    payment_status = models.CharField(max_length=10, choices=PaymentStatus.choices)
+    booking_status = models.CharField(max_length=10, choices=BookingStatus.choices)
+    payment_method = models.CharField(max_length=100, blank=True, null=True)
+    payment_reference = models.CharField(max_length=100, blank=True, null=True)
+    tickets = models.JSONField(default=list)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived booking {self.booking_number}"
+
+    def get_tickets(self):
+        """Unpack the stored tickets into dicts."""
+        return [dict(zip(self.TICKET_FIELDS, ticket)) for ticket in self.tickets]
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user"]),
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["show_start_time"]),
+            models.Index(fields=["movie", "show_start_time"]),
+        ]
+
+
+class DailySales(models.Model):
+    """
+    Booking totals per day, show and payment method.
+
+    Rows are updated incrementally whenever a booking is saved (see
+    bookings/sales.py), so charts and reports can read sales figures without
+    scanning bookings. ``date`` is the local date the booking was made.
+    Deleting or archiving a booking leaves its sales in place.
+    """
+
+    date = models.DateField()
+    show = models.ForeignKey(
+        Show,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="daily_sales",
+    )
+    movie = models.ForeignKey(
+        "movies.Movie",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="daily_sales",
+    )
+    theater = models.ForeignKey(
+        "movies.Theater",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="daily_sales",
+    )
+    show_type = models.CharField(max_length=20)
+    payment_method = models.CharField(max_length=100, blank=True, default="")
+
+    # Every booking made
+    bookings = models.IntegerField(default=0)
+    tickets = models.IntegerField(default=0)
+    gross_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    discount_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    # Bookings by their current status
+    confirmed_bookings = models.IntegerField(default=0)
+    confirmed_tickets = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cancelled_bookings = models.IntegerField(default=0)
+    refunded_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"Sales for show {self.show_id} on {self.date}"
+
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "show", "payment_method"],
+                name="unique_daily_sales",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["movie", "date"]),
+            models.Index(fields=["theater", "date"]),
+        ]
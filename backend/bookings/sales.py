@@ -0,0 +1,223 @@
+"""
+Daily sales fact table maintenance.
+
+Each booking contributes a set of measures (one booking, its seats, its
+amount, ...) to the DailySales row for the day it was made, its show and its
+payment method. When a booking is saved, its previous contribution is
+subtracted and the new one added, so confirming, cancelling or refunding a
+booking moves its numbers between measures without rescanning anything.
+``backfill_daily_sales`` rebuilds the table from live and archived bookings.
+
+Every write to the table replaces the DAILY_SALES_STAMP version stamp (see
+xcounter.cache_utils), which caches of data read from it depend on.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from movies.models import Show
+from xcounter.cache_utils import bump_version_stamp
+
+from .archive import BookingHistory
+from .models import Booking, BookingStatus, DailySales, PaymentStatus
+
+DAILY_SALES_STAMP = "daily_sales"
+
+# Booking fields the fact table depends on
+TRACKED_FIELDS = (
+    "show_id",
+    "created_at",
+    "payment_method",
+    "booking_status",
+    "payment_status",
+    "total_seats",
+    "total_amount",
+    "discount_amount",
+)
+
+
+def get_contribution(
+    booking_status, payment_status, total_seats, total_amount, discount_amount
+):
+    """Return the measures a booking in the given state adds to its row."""
+    confirmed = booking_status == BookingStatus.CONFIRMED
+    return {
+        "bookings": 1,
+        "tickets": total_seats,
+        "gross_amount": total_amount,
+        "discount_amount": discount_amount,
+        "confirmed_bookings": int(confirmed),
+        "confirmed_tickets": total_seats if confirmed else 0,
+        "revenue": total_amount if confirmed else 0,
+        "cancelled_bookings": int(booking_status == BookingStatus.CANCELLED),
+        "refunded_amount": (
+            total_amount if payment_status == PaymentStatus.REFUNDED else 0
+        ),
+    }
+
+
+def get_sales_date(created_at):
+    """Return the local date a booking made at ``created_at`` is counted on."""
+    return timezone.localdate(created_at)
+
+
+def _booking_state(booking):
+    return {field: getattr(booking, field) for field in TRACKED_FIELDS}
+
+
+def _state_key(state):
+    return (
+        get_sales_date(state["created_at"]),
+        state["show_id"],
+        state["payment_method"] or "",
+    )
+
+
+def _state_contribution(state):
+    return get_contribution(
+        state["booking_status"],
+        state["payment_status"],
+        state["total_seats"],
+        Decimal(str(state["total_amount"])),
+        Decimal(str(state["discount_amount"])),
+    )
+
+
+def apply_sales_delta(date, show, payment_method, delta):
+    """
+    Add ``delta`` (measure -> change) to a DailySales row, creating it if needed.
+
+    ``show`` is the Show the row belongs to. Updates use F() expressions, so
+    concurrent bookings for the same show and day don't lose each other's
+    changes.
+    """
+    delta = {measure: value for measure, value in delta.items() if value}
+    if not delta:
+        return
+
+    bump_version_stamp(DAILY_SALES_STAMP)
+    rows = DailySales.objects.filter(
+        date=date, show_id=show.pk, payment_method=payment_method
+    )
+    if rows.update(**{measure: F(measure) + value for measure, value in delta.items()}):
+        return
+
+    try:
+        with transaction.atomic():
+            DailySales.objects.create(
+                date=date,
+                show_id=show.pk,
+                movie_id=show.movie_id,
+                theater_id=show.theater_id,
+                show_type=show.show_type,
+                payment_method=payment_method,
+                **delta,
+            )
+    except IntegrityError:
+        # Another booking created the row first
+        rows.update(**{measure: F(measure) + value for measure, value in delta.items()})
+
+
+def record_booking_sales(booking, previous=None):
+    """
+    Update the fact table after a booking is saved.
+
+    ``previous`` is the booking's tracked state before the save, or None for
+    a new booking.
+    """
+    current = _booking_state(booking)
+    if previous == current:
+        return
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    if previous is not None:
+        for measure, value in _state_contribution(previous).items():
+            deltas[_state_key(previous)][measure] -= value
+    for measure, value in _state_contribution(current).items():
+        deltas[_state_key(current)][measure] += value
+
+    shows = {booking.show_id: booking.show}
+    if previous is not None and previous["show_id"] not in shows:
+        shows[previous["show_id"]] = Show.objects.get(pk=previous["show_id"])
+
+    for (date, show_id, payment_method), delta in deltas.items():
+        apply_sales_delta(date, shows[show_id], payment_method, delta)
+
+
+def get_booking_state(booking_id):
+    """Load the tracked state of a saved booking, or None if it doesn't exist."""
+    return Booking.objects.filter(pk=booking_id).values(*TRACKED_FIELDS).first()
+
+
+def rebuild_daily_sales(start_date=None, end_date=None, batch_size=1000):
+    """
+    Recompute DailySales rows from live and archived bookings.
+
+    Rows for the given date range (inclusive, every date when omitted) are
+    replaced in one transaction. Returns the number of rows written.
+    """
+    filters = {}
+    if start_date is not None:
+        filters["created_at__date__gte"] = start_date
+    if end_date is not None:
+        filters["created_at__date__lte"] = end_date
+
+    groups = BookingHistory(**filters).aggregate_by(
+        "created_at__date",
+        "show",
+        "movie",
+        "theater",
+        "show_type",
+        "payment_method",
+        "booking_status",
+        "payment_status",
+        bookings=Count("id"),
+        tickets=Sum("total_seats"),
+        total_amount=Sum("total_amount"),
+        discount_amount=Sum("discount_amount"),
+    )
+
+    rows = {}
+    for group in groups:
+        key = (group["created_at__date"], group["show"], group["payment_method"] or "")
+        row = rows.get(key)
+        if row is None:
+            row = rows[key] = DailySales(
+                date=key[0],
+                show_id=key[1],
+                movie_id=group["movie"],
+                theater_id=group["theater"],
+                show_type=group["show_type"],
+                payment_method=key[2],
+            )
+
+        # Contribution of one booking, scaled to the whole group
+        contribution = get_contribution(
+            group["booking_status"],
+            group["payment_status"],
+            group["tickets"],
+            group["total_amount"],
+            group["discount_amount"],
+        )
+        contribution["bookings"] = group["bookings"]
+        contribution["confirmed_bookings"] *= group["bookings"]
+        contribution["cancelled_bookings"] *= group["bookings"]
+        for measure, value in contribution.items():
+            setattr(row, measure, getattr(row, measure) + value)
+
+    existing = DailySales.objects.all()
+    if start_date is not None:
+        existing = existing.filter(date__gte=start_date)
+    if end_date is not None:
+        existing = existing.filter(date__lte=end_date)
+
+    with transaction.atomic():
+        existing.delete()
+        DailySales.objects.bulk_create(rows.values(), batch_size=batch_size)
+        bump_version_stamp(DAILY_SALES_STAMP)
+
+    return len(rows)
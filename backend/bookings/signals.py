@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Booking
+from .sales import get_booking_state, record_booking_sales
+
+
+@receiver(pre_save, sender=Booking)
+def remember_booking_sales_state(sender, instance, raw=False, **kwargs):
+    """Keep the booking's state before the save to compute the sales delta."""
+    if raw:
+        return
+    instance._sales_previous = (
+        get_booking_state(instance.pk) if instance.pk is not None else None
+    )
+
+
+@receiver(post_save, sender=Booking)
+def update_daily_sales(sender, instance, raw=False, **kwargs):
+    """Move the booking's numbers in the daily sales fact table."""
+    if raw:
+        return
+    record_booking_sales(instance, getattr(instance, "_sales_previous", None))
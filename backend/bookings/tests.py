@@ -1,3 +1,340 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Sum
+from django.test import AsyncClient, TestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from coupons.models import Coupon, CouponUsage
+from movies.models import Movie, Show, Theater
+from promotions.models import PointsTransaction, TransactionType
+from users.models import CustomUser
+from xcounter.cache_utils import get_version_stamp
+
+from .archive import BookingHistory, archive_bookings
+from .models import ArchivedBooking, Booking, BookingStatus, DailySales, PaymentStatus
+from .sales import DAILY_SALES_STAMP, rebuild_daily_sales
+
+MEASURES = (
+    "bookings",
+    "tickets",
+    "gross_amount",
+    "confirmed_bookings",
+    "confirmed_tickets",
+    "revenue",
+    "cancelled_bookings",
+    "refunded_amount",
+)
+
+
+def create_show(start_time):
+    movie = Movie.objects.create(
+        title="Test Movie",
+        description="Test movie",
+        release_date=start_time.date(),
+        duration_minutes=120,
+    )
+    theater = Theater.objects.create(name="Test", location="Test", capacity=100)
+    return Show.objects.create(
+        movie=movie,
+        theater=theater,
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        price=Decimal("10.00"),
+        total_seats=100,
+        available_seats=100,
+    )
+
+
+class BookingTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email="customer@example.com")
+        self.show = create_show(timezone.now() + timedelta(days=1))
+
+    def create_booking(self, **fields):
+        fields = {
+            "show": self.show,
+            "total_seats": 2,
+            "total_amount": Decimal("20.00"),
+            **fields,
+        }
+        return Booking.objects.create(
+            user=self.user,
+            booking_number=f"BK-TEST-{Booking.objects.count() + 1}",
+            **fields,
+        )
+
+
+class DailySalesTests(BookingTestCase):
+    def sales(self):
+        return {
+            row["payment_method"]: {measure: row[measure] for measure in MEASURES}
+            for row in DailySales.objects.values("payment_method", *MEASURES)
+        }
+
+    def assertSales(self, expected):
+        expected = {
+            method: dict(dict.fromkeys(MEASURES, 0), **measures)
+            for method, measures in expected.items()
+        }
+        self.assertEqual(self.sales(), expected)
+
+    def test_new_booking_is_counted(self):
+        self.create_booking(payment_method="card")
+
+        self.assertSales({"card": {"bookings": 1, "tickets": 2, "gross_amount": 20}})
+
+    def test_confirming_moves_amount_to_revenue(self):
+        booking = self.create_booking(payment_method="card")
+        booking.booking_status = BookingStatus.CONFIRMED
+        booking.payment_status = PaymentStatus.COMPLETED
+        booking.save()
+
+        self.assertSales(
+            {
+                "card": {
+                    "bookings": 1,
+                    "tickets": 2,
+                    "gross_amount": 20,
+                    "confirmed_bookings": 1,
+                    "confirmed_tickets": 2,
+                    "revenue": 20,
+                }
+            }
+        )
+
+    def test_amount_change_is_applied(self):
+        booking = self.create_booking(booking_status=BookingStatus.CONFIRMED)
+        booking.total_amount = Decimal("25.00")
+        booking.save()
+
+        self.assertEqual(self.sales()[""]["revenue"], 25)
+        self.assertEqual(self.sales()[""]["gross_amount"], 25)
+
+    def test_payment_method_change_moves_booking(self):
+        booking = self.create_booking(payment_method="card")
+        booking.payment_method = "cash"
+        booking.save()
+
+        self.assertSales(
+            {
+                "card": {},
+                "cash": {"bookings": 1, "tickets": 2, "gross_amount": 20},
+            }
+        )
+
+    def test_cancelling_and_refunding(self):
+        booking = self.create_booking(booking_status=BookingStatus.CONFIRMED)
+        booking.booking_status = BookingStatus.CANCELLED
+        booking.payment_status = PaymentStatus.REFUNDED
+        booking.save()
+
+        self.assertSales(
+            {
+                "": {
+                    "bookings": 1,
+                    "tickets": 2,
+                    "gross_amount": 20,
+                    "cancelled_bookings": 1,
+                    "refunded_amount": 20,
+                }
+            }
+        )
+
+    def test_rebuild_matches_incremental_updates(self):
+        booking = self.create_booking(payment_method="card")
+        booking.booking_status = BookingStatus.CONFIRMED
+        booking.save()
+        self.create_booking(payment_method="cash")
+        incremental = self.sales()
+
+        rebuild_daily_sales()
+
+        self.assertEqual(self.sales(), incremental)
+
+    def test_rebuild_only_replaces_its_range(self):
+        booking = self.create_booking()
+        today = timezone.localdate()
+        # update() bypasses the signals, leaving today's row stale
+        Booking.objects.filter(pk=booking.pk).update(
+            created_at=booking.created_at - timedelta(days=10)
+        )
+
+        rebuild_daily_sales(today - timedelta(days=10), today - timedelta(days=10))
+        self.assertEqual(
+            sorted(DailySales.objects.values_list("date", "bookings")),
+            [(today - timedelta(days=10), 1), (today, 1)],
+        )
+
+        rebuild_daily_sales()
+        self.assertEqual(
+            list(DailySales.objects.values_list("date", "bookings")),
+            [(today - timedelta(days=10), 1)],
+        )
+
+    def test_rebuild_includes_archived_bookings(self):
+        old_show = create_show(timezone.now() - timedelta(days=400))
+        self.create_booking(show=old_show, booking_status=BookingStatus.CONFIRMED)
+        self.create_booking(payment_method="card")
+        before = self.sales()
+        list(archive_bookings(timezone.now() - timedelta(days=365)))
+
+        rebuild_daily_sales()
+
+        self.assertEqual(ArchivedBooking.objects.count(), 1)
+        self.assertEqual(self.sales(), before)
+
+    def test_sales_changes_replace_stamp(self):
+        stamp = get_version_stamp(DAILY_SALES_STAMP)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_booking()
+
+        self.assertNotEqual(get_version_stamp(DAILY_SALES_STAMP), stamp)
+
+    def test_backfill_command(self):
+        self.create_booking(payment_method="card")
+        self.create_booking(payment_method="cash")
+        DailySales.objects.all().delete()
+        out = io.StringIO()
+
+        call_command("backfill_daily_sales", stdout=out)
+
+        self.assertIn("rebuilt 2 daily sales rows", out.getvalue())
+        self.assertEqual(set(self.sales()), {"card", "cash"})
+        with self.assertRaises(CommandError):
+            call_command(
+                "backfill_daily_sales", start_date="2024-02-01", end_date="2024-01-01"
+            )
+
+
+class ArchiveTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old_show = create_show(timezone.now() - timedelta(days=400))
+        self.old_booking = self.create_booking(
+            show=self.old_show,
+            total_seats=1,
+            total_amount=Decimal("10.00"),
+            booking_status=BookingStatus.CONFIRMED,
+        )
+        self.booking = self.create_booking(booking_status=BookingStatus.CONFIRMED)
+        self.cutoff = timezone.now() - timedelta(days=365)
+
+    def archive(self):
+        return list(archive_bookings(self.cutoff))
+
+    def test_old_bookings_are_moved(self):
+        self.assertEqual(self.archive(), [(1, self.old_booking.pk)])
+
+        self.assertFalse(Booking.objects.filter(pk=self.old_booking.pk).exists())
+        archived = ArchivedBooking.objects.get(pk=self.old_booking.pk)
+        self.assertEqual(archived.booking_number, self.old_booking.booking_number)
+        self.assertTrue(Booking.objects.filter(pk=self.booking.pk).exists())
+
+    def test_references_keep_booking_number(self):
+        coupon = Coupon.objects.create(
+            code="TEST",
+            description="Test",
+            discount_value=10,
+            valid_from=timezone.now() - timedelta(days=500),
+            valid_to=timezone.now() + timedelta(days=30),
+        )
+        usage = CouponUsage.objects.create(
+            coupon=coupon,
+            user=self.user,
+            booking=self.old_booking,
+            discount_amount=1,
+        )
+        transaction = PointsTransaction.objects.create(
+            customer=self.user.loyalty_profile,
+            transaction_type=TransactionType.EARNING,
+            points=10,
+            booking=self.old_booking,
+        )
+
+        self.archive()
+
+        for reference in (usage, transaction):
+            reference.refresh_from_db()
+            self.assertIsNone(reference.booking)
+            self.assertEqual(
+                reference.get_booking_number(), self.old_booking.booking_number
+            )
+
+    def test_history_merges_both_tiers(self):
+        self.archive()
+
+        history = BookingHistory()
+        self.assertEqual(history.count(), 2)
+        self.assertEqual(
+            history.aggregate(revenue=Sum("total_amount"), bookings=Count("id")),
+            {"revenue": Decimal("30.00"), "bookings": 2},
+        )
+        self.assertEqual(
+            sorted(
+                (row["show"], row["bookings"])
+                for row in history.aggregate_by("show", bookings=Count("id"))
+            ),
+            [(self.show.pk, 1), (self.old_show.pk, 1)],
+        )
+
+    def test_history_translates_filters(self):
+        self.archive()
+
+        old = BookingHistory(show_start_time__lt=self.cutoff)
+        self.assertEqual(
+            list(old.values_list("booking_number")),
+            [(self.old_booking.booking_number,)],
+        )
+
+
+class ExportTests(BookingTestCase):
+    url = "/api/bookings/bookings/export/"
+
+    def setUp(self):
+        super().setUp()
+        self.staff = CustomUser.objects.create_user(
+            email="staff@example.com", is_staff=True, role="ADMIN"
+        )
+        self.token = Token.objects.create(user=self.staff)
+        self.booking = self.create_booking(payment_method="=HYPERLINK(1)")
+
+    def read_rows(self, content):
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_export_streams_rows(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+
+        response = client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        rows = self.read_rows(b"".join(response.streaming_content).decode())
+        self.assertEqual(rows[0][0], "Booking Number")
+        self.assertEqual(rows[1][0], self.booking.booking_number)
+
+    def test_formulas_are_neutralised(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+
+        response = client.get(self.url)
+
+        rows = self.read_rows(b"".join(response.streaming_content).decode())
+        self.assertEqual(rows[1][-1], "'=HYPERLINK(1)")
+
+    async def test_asgi_export_streams_asynchronously(self):
+        response = await AsyncClient().get(
+            self.url, headers={"authorization": f"Token {self.token.key}"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        rows = self.read_rows(content.decode())
+        self.assertEqual(rows[1][0], self.booking.booking_number)
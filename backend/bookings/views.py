@@ -6,7 +6,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from movies.models import Show
-from users.permissions import IsAdmin
+from users.permissions import IsAdmin, IsStaffUser
+from xcounter.exports import stream_csv
 
 from .models import Booking, BookingStatus, PaymentStatus, SeatCategory, Ticket
 from .serializers import (
@@ -30,6 +31,20 @@ class BookingViewSet(viewsets.ModelViewSet):
     search_fields = ["booking_number", "user__email", "show__movie__title"]
     ordering_fields = ["created_at", "total_amount", "total_seats"]
     ordering = ["-created_at"]
+    export_columns = [
+        ("Booking Number", "booking_number"),
+        ("Created At", "created_at"),
+        ("Customer", "user__email"),
+        ("Movie", "show__movie__title"),
+        ("Theater", "show__theater__name"),
+        ("Show Time", "show__start_time"),
+        ("Seats", "total_seats"),
+        ("Total Amount", "total_amount"),
+        ("Discount", "discount_amount"),
+        ("Booking Status", "booking_status"),
+        ("Payment Status", "payment_status"),
+        ("Payment Method", "payment_method"),
+    ]
 
     def get_queryset(self):
         user = self.request.user
@@ -59,6 +74,8 @@ class BookingViewSet(viewsets.ModelViewSet):
             return [permissions.IsAuthenticated()]
         elif self.action in ["update", "partial_update", "destroy"]:
             return [permissions.IsAuthenticated(), IsAdmin()]
+        elif self.action == "export":
+            return [permissions.IsAuthenticated(), IsStaffUser()]
         return [permissions.IsAuthenticated()]
 
     @action(detail=False, methods=["get"])
@@ -198,6 +215,12 @@ class BookingViewSet(viewsets.ModelViewSet):
         serializer = BookingListSerializer(queryset, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream the bookings matching the list filters as CSV (staff only)"""
+        queryset = self.filter_queryset(self.get_queryset())
+        return stream_csv(request, queryset, self.export_columns, "bookings")
+
     @action(detail=False, methods=["post"], permission_classes=[IsAdmin])
     def vip_reservation(self, request):
         """
@@ -225,6 +248,19 @@ class TicketViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ["ticket_number", "seat_number", "booking__booking_number"]
     ordering_fields = ["created_at", "seat_number"]
     ordering = ["-created_at"]
+    export_columns = [
+        ("Ticket Number", "ticket_number"),
+        ("Booking Number", "booking__booking_number"),
+        ("Created At", "created_at"),
+        ("Movie", "booking__show__movie__title"),
+        ("Theater", "booking__show__theater__name"),
+        ("Show Time", "booking__show__start_time"),
+        ("Seat", "seat_number"),
+        ("Seat Category", "seat_category"),
+        ("Price", "price"),
+        ("Used", "is_used"),
+        ("Booking Status", "booking__booking_status"),
+    ]
 
     def get_queryset(self):
         user = self.request.user
@@ -267,6 +303,12 @@ class TicketViewSet(viewsets.ReadOnlyModelViewSet):
             status=status.HTTP_200_OK,
         )
 
+    @action(detail=False, methods=["get"], permission_classes=[IsStaffUser])
+    def export(self, request):
+        """Stream the tickets matching the list filters as CSV (staff only)"""
+        queryset = self.filter_queryset(self.get_queryset())
+        return stream_csv(request, queryset, self.export_columns, "tickets")
+
     @action(detail=False, methods=["get"], permission_classes=[IsAdmin])
     def vip_tickets(self, request):
         """Get all VIP tickets (admin only)"""
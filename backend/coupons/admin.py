@@ -218,7 +218,7 @@ class CouponUsageAdmin(admin.ModelAdmin):
     user_email.short_description = "User"
 
     def booking_number(self, obj):
-        return obj.booking.booking_number if obj.booking else "N/A"
+        return obj.get_booking_number() or "N/A"
 
     booking_number.short_description = "Booking"
 
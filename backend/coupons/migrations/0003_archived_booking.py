@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0003_dailysales"),
+        ("coupons", "0002_create_default_coupons"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="couponusage",
+            name="archived_booking",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="coupon_usages",
+                to="bookings.archivedbooking",
+            ),
+        ),
+    ]
@@ -118,8 +118,21 @@ class CouponUsage(models.Model):
         blank=True,
         related_name="coupon_usages",
     )
+    # Set when the booking is moved to cold storage (see bookings/archive.py)
+    archived_booking = models.ForeignKey(
+        "bookings.ArchivedBooking",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="coupon_usages",
+    )
     discount_amount = models.DecimalField(max_digits=10, decimal_places=2)
     used_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.coupon.code} - {self.user.email}"
+
+    def get_booking_number(self):
+        """Return the number of the booking, live or archived."""
+        booking = self.booking or self.archived_booking
+        return booking.booking_number if booking else None
@@ -155,9 +155,7 @@ class CouponValidationSerializer(serializers.Serializer):
 class CouponUsageSerializer(serializers.ModelSerializer):
     coupon_code = serializers.CharField(source="coupon.code", read_only=True)
     user_email = serializers.EmailField(source="user.email", read_only=True)
-    booking_number = serializers.CharField(
-        source="booking.booking_number", read_only=True
-    )
+    booking_number = serializers.CharField(source="get_booking_number", read_only=True)
 
     class Meta:
         model = CouponUsage
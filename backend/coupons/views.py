@@ -1,9 +1,11 @@
+from django.db.models.functions import Coalesce
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from bookings.models import Booking
 from users.permissions import IsAdminUser, IsStaffUser
+from xcounter.exports import stream_csv
 
 from .models import Coupon, CouponType, CouponUsage
 from .serializers import (
@@ -235,13 +237,32 @@ class CouponUsageViewSet(
     serializer_class = CouponUsageSerializer
     permission_classes = [IsStaffUser]
     filterset_fields = ["coupon", "user"]
-    search_fields = ["coupon__code", "user__email", "booking__booking_number"]
+    search_fields = [
+        "coupon__code",
+        "user__email",
+        "booking__booking_number",
+        "archived_booking__booking_number",
+    ]
     ordering_fields = ["used_at"]
+    export_columns = [
+        ("Used At", "used_at"),
+        ("Coupon", "coupon__code"),
+        ("Customer", "user__email"),
+        (
+            "Booking Number",
+            Coalesce("booking__booking_number", "archived_booking__booking_number"),
+        ),
+        ("Discount", "discount_amount"),
+    ]
 
     def get_queryset(self):
         if self.request.user.is_staff:
-            return CouponUsage.objects.all().order_by("-used_at")
-        return CouponUsage.objects.filter(user=self.request.user).order_by("-used_at")
+            queryset = CouponUsage.objects.all()
+        else:
+            queryset = CouponUsage.objects.filter(user=self.request.user)
+        return queryset.select_related(
+            "coupon", "user", "booking", "archived_booking"
+        ).order_by("-used_at")
 
     def get_permissions(self):
         if self.action == "list_my_usages":
@@ -256,3 +277,11 @@ class CouponUsageViewSet(
         queryset = CouponUsage.objects.filter(user=request.user).order_by("-used_at")
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream the coupon usages matching the list filters as CSV
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return stream_csv(request, queryset, self.export_columns, "coupon-usages")
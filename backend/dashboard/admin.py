@@ -6,6 +6,7 @@ from .models import (
     Metric,
     MetricValue,
     ReportTemplate,
+    refresh_latest_values,
 )
 
 
@@ -17,6 +18,9 @@ class MetricAdmin(admin.ModelAdmin):
         "display_type",
         "is_active",
         "refresh_frequency",
+        "last_calculated_at",
+        "last_calculation_ms",
+        "last_query_count",
     )
     list_filter = (
         "category",
@@ -42,7 +46,27 @@ class MetricAdmin(admin.ModelAdmin):
                 )
             },
         ),
-        ("Refresh Settings", {"fields": ("refresh_frequency",)}),
+        (
+            "Refresh Settings",
+            {
+                "fields": (
+                    "refresh_frequency",
+                    "last_calculated_at",
+                    "last_calculation_ms",
+                    "last_query_count",
+                )
+            },
+        ),
+        (
+            "Retention",
+            {
+                "fields": (
+                    "raw_retention_days",
+                    "hourly_retention_days",
+                    "daily_retention_days",
+                )
+            },
+        ),
         (
             "Visibility",
             {
@@ -56,12 +80,13 @@ class MetricAdmin(admin.ModelAdmin):
         ),
         ("Display Settings", {"fields": ("display_order",)}),
     )
+    readonly_fields = ("last_calculated_at", "last_calculation_ms", "last_query_count")
 
 
 @admin.register(MetricValue)
 class MetricValueAdmin(admin.ModelAdmin):
-    list_display = ("metric", "timestamp", "display_value")
-    list_filter = ("metric", "timestamp")
+    list_display = ("metric", "timestamp", "resolution", "display_value")
+    list_filter = ("metric", "resolution", "timestamp")
     date_hierarchy = "timestamp"
 
     def display_value(self, obj):
@@ -77,6 +102,15 @@ class MetricValueAdmin(admin.ModelAdmin):
 
     display_value.short_description = "Value"
 
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_latest_values([obj.metric_id])
+
+    def delete_queryset(self, request, queryset):
+        metric_ids = set(queryset.values_list("metric", flat=True))
+        super().delete_queryset(request, queryset)
+        refresh_latest_values(metric_ids)
+
 
 @admin.register(DashboardLayout)
 class DashboardLayoutAdmin(admin.ModelAdmin):
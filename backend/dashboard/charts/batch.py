@@ -0,0 +1,159 @@
+"""
+Batched chart evaluation.
+
+A batch is a list of chart specs (``{"chart": name, "params": {...}}``).
+Charts whose data is already cached are read with one ``get_many``; the
+rest are computed concurrently on a bounded thread pool, so a cold
+dashboard takes about as long as its slowest chart instead of the sum of
+all of them. Each worker thread uses its own database connection, which is
+closed when the chart is done.
+"""
+
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from ..occupancy import DIMENSIONS
+from ..visualization import (
+    chart_cache_key,
+    get_bookings_over_time_chart_data,
+    get_cohort_retention_chart_data,
+    get_genre_distribution_chart_data,
+    get_monthly_revenue_chart_data,
+    get_movie_ratings_chart_data,
+    get_rfm_segments_chart_data,
+    get_theater_occupancy_chart_data,
+    get_ticket_types_chart_data,
+    get_visit_intervals_chart_data,
+)
+
+# Cache statuses reported for each chart
+HIT = "HIT"
+MISS = "MISS"
+ERROR = "ERROR"
+
+# Integer parameter: invalid or out of range values fall back to the default,
+# like the single-chart views do
+IntParam = namedtuple("IntParam", ["default", "min", "max"])
+
+# Parameter restricted to a set of values
+ChoiceParam = namedtuple("ChoiceParam", ["default", "choices"])
+
+# A chart that can be batched: the function computing it and its parameters,
+# in the order they appear in its cache key
+ChartSpec = namedtuple("ChartSpec", ["function", "params"])
+
+CHARTS = {
+    "movie_ratings": ChartSpec(get_movie_ratings_chart_data, {}),
+    "bookings_over_time": ChartSpec(
+        get_bookings_over_time_chart_data, {"days": IntParam(30, 1, 365)}
+    ),
+    "genre_distribution": ChartSpec(get_genre_distribution_chart_data, {}),
+    "ticket_types": ChartSpec(get_ticket_types_chart_data, {}),
+    "monthly_revenue": ChartSpec(
+        get_monthly_revenue_chart_data, {"months": IntParam(12, 1, 60)}
+    ),
+    "theater_occupancy": ChartSpec(
+        get_theater_occupancy_chart_data,
+        {
+            "days": IntParam(30, 1, 365),
+            "group_by": ChoiceParam("theater", tuple(DIMENSIONS)),
+        },
+    ),
+    "cohort_retention": ChartSpec(
+        get_cohort_retention_chart_data, {"months": IntParam(12, 1, 60)}
+    ),
+    "visit_intervals": ChartSpec(get_visit_intervals_chart_data, {}),
+    "rfm_segments": ChartSpec(get_rfm_segments_chart_data, {}),
+}
+
+
+def clean_params(chart, params):
+    """Return a chart's parameters with defaults filled in and bad values reset."""
+    cleaned = {}
+    for name, param in CHARTS[chart].params.items():
+        value = params.get(name, param.default)
+        if isinstance(param, IntParam):
+            try:
+                value = int(value)
+            except (ValueError, TypeError):
+                value = param.default
+            if value < param.min or value > param.max:
+                value = param.default
+        elif value not in param.choices:
+            value = param.default
+        cleaned[name] = value
+    return cleaned
+
+
+def _compute_chart(chart, params):
+    """Compute one chart in a worker thread and time it."""
+    started = time.perf_counter()
+    try:
+        data = CHARTS[chart].function(**params)
+        status = MISS
+    except Exception as e:
+        data = {"error": str(e)}
+        status = ERROR
+    finally:
+        # Connections are per thread; don't leave this one open
+        connections.close_all()
+    return data, status, (time.perf_counter() - started) * 1000
+
+
+def evaluate_charts(specs, max_workers=None):
+    """
+    Evaluate a batch of chart specs.
+
+    ``specs`` are dicts with a ``chart`` name (a key of CHARTS), optional
+    ``params`` and an optional ``id`` (defaults to the chart name). Returns
+    one dict per spec, in order, with ``id``, ``chart``, ``params``,
+    ``cache`` (HIT, MISS or ERROR), ``ms`` and ``data``.
+    """
+    if max_workers is None:
+        max_workers = getattr(settings, "CHART_BATCH_MAX_WORKERS", 4)
+
+    results = []
+    for spec in specs:
+        chart = spec["chart"]
+        params = clean_params(chart, spec.get("params") or {})
+        results.append(
+            {
+                "id": spec.get("id", chart),
+                "chart": chart,
+                "params": params,
+                "cache_key": chart_cache_key(chart, *params.values()),
+            }
+        )
+
+    cached = cache.get_many({result["cache_key"] for result in results})
+    misses = {}
+    for result in results:
+        data = cached.get(result["cache_key"])
+        if data:
+            result.update(cache=HIT, ms=0, data=data)
+        else:
+            # The same chart asked for twice is only computed once
+            misses.setdefault(result["cache_key"], []).append(result)
+
+    if misses:
+        workers = min(max_workers, len(misses))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                cache_key: executor.submit(
+                    _compute_chart, waiting[0]["chart"], waiting[0]["params"]
+                )
+                for cache_key, waiting in misses.items()
+            }
+            for cache_key, future in futures.items():
+                data, status, ms = future.result()
+                for result in misses[cache_key]:
+                    result.update(cache=status, ms=round(ms, 3), data=data)
+
+    for result in results:
+        del result["cache_key"]
+    return results
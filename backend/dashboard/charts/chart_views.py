@@ -2,6 +2,9 @@
 API views for chart data.
 """
 
+import time
+
+from django.conf import settings
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from rest_framework import status
@@ -10,13 +13,19 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from users.permissions import IsAdminOrModerator
 
+from ..occupancy import DIMENSIONS
 from ..visualization import (
     get_bookings_over_time_chart_data,
+    get_cohort_retention_chart_data,
     get_genre_distribution_chart_data,
     get_monthly_revenue_chart_data,
     get_movie_ratings_chart_data,
+    get_rfm_segments_chart_data,
+    get_theater_occupancy_chart_data,
     get_ticket_types_chart_data,
+    get_visit_intervals_chart_data,
 )
+from .batch import CHARTS, evaluate_charts
 
 
 class BaseChartView(APIView):
@@ -100,31 +109,146 @@ class MonthlyRevenueChartView(BaseChartView):
         return get_monthly_revenue_chart_data(months=months)
 
 
-class AdminDashboardView(BaseChartView):
-    """API view for the admin dashboard."""
+@method_decorator(cache_page(60 * 5), name="dispatch")  # Cache for 5 minutes
+class TheaterOccupancyChartView(BaseChartView):
+    """API view for theater occupancy chart data."""
 
     def get_chart_data(self, request):
-        """Return admin dashboard data."""
-        return {
-            "revenue_summary": get_monthly_revenue_chart_data(months=12),
-            "bookings_summary": get_bookings_over_time_chart_data(days=30),
-            "genre_distribution": get_genre_distribution_chart_data(),
-            "ticket_types": get_ticket_types_chart_data(),
-            "top_movies": get_movie_ratings_chart_data(),
-        }
+        """Return theater occupancy chart data."""
+        days = request.query_params.get("days", 30)
+        try:
+            days = int(days)
+            if days < 1 or days > 365:
+                days = 30
+        except (ValueError, TypeError):
+            days = 30
 
+        group_by = request.query_params.get("group_by", "theater")
+        if group_by not in DIMENSIONS:
+            group_by = "theater"
 
-class ModeratorDashboardView(BaseChartView):
-    """API view for the moderator dashboard."""
+        return get_theater_occupancy_chart_data(days=days, group_by=group_by)
+
+
+@method_decorator(cache_page(60 * 5), name="dispatch")  # Cache for 5 minutes
+class CohortRetentionChartView(BaseChartView):
+    """API view for customer cohort retention chart data."""
 
     def get_chart_data(self, request):
-        """Return moderator dashboard data."""
-        return {
-            "bookings_summary": get_bookings_over_time_chart_data(days=30),
-            "genre_distribution": get_genre_distribution_chart_data(),
-            "ticket_types": get_ticket_types_chart_data(),
-            "top_movies": get_movie_ratings_chart_data(),
-        }
+        """Return cohort retention chart data."""
+        months = request.query_params.get("months", 12)
+        try:
+            months = int(months)
+            if months < 1 or months > 60:
+                months = 12
+        except (ValueError, TypeError):
+            months = 12
+
+        return get_cohort_retention_chart_data(months=months)
+
+
+@method_decorator(cache_page(60 * 5), name="dispatch")  # Cache for 5 minutes
+class VisitIntervalsChartView(BaseChartView):
+    """API view for time between customer visits chart data."""
+
+    def get_chart_data(self, request):
+        """Return visit intervals chart data."""
+        return get_visit_intervals_chart_data()
+
+
+@method_decorator(cache_page(60 * 5), name="dispatch")  # Cache for 5 minutes
+class RFMSegmentsChartView(BaseChartView):
+    """API view for customer RFM segments chart data."""
+
+    def get_chart_data(self, request):
+        """Return RFM segments chart data."""
+        return get_rfm_segments_chart_data()
+
+
+class BatchChartView(APIView):
+    """
+    API view evaluating several charts in one request.
+
+    Expects ``{"charts": [{"chart": "monthly_revenue", "params": {...},
+    "id": "..."}, ...]}`` and returns every chart with its cache status and
+    computation time. Cache misses are computed concurrently.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminOrModerator]
+
+    def post(self, request, format=None):
+        specs = request.data.get("charts")
+        if not isinstance(specs, list) or not specs:
+            return Response(
+                {"error": "charts must be a non-empty list of chart specs"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        max_charts = getattr(settings, "CHART_BATCH_MAX_CHARTS", 20)
+        if len(specs) > max_charts:
+            return Response(
+                {"error": f"At most {max_charts} charts can be requested at once"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        for spec in specs:
+            if not isinstance(spec, dict) or spec.get("chart") not in CHARTS:
+                return Response(
+                    {
+                        "error": f"Invalid chart spec: {spec}",
+                        "available_charts": list(CHARTS),
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if not isinstance(spec.get("params") or {}, dict):
+                return Response(
+                    {"error": f"params must be an object: {spec}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        started = time.perf_counter()
+        charts = evaluate_charts(specs)
+        return Response(
+            {
+                "charts": charts,
+                "ms": round((time.perf_counter() - started) * 1000, 3),
+            }
+        )
+
+
+class BatchDashboardView(BaseChartView):
+    """Base class for dashboards made of a fixed set of batched charts."""
+
+    # Response key -> chart spec
+    charts = {}
+
+    def get_chart_data(self, request):
+        """Return the dashboard's charts, keyed by their response key."""
+        specs = [{"id": key, **spec} for key, spec in self.charts.items()]
+        return {chart["id"]: chart["data"] for chart in evaluate_charts(specs)}
+
+
+class AdminDashboardView(BatchDashboardView):
+    """API view for the admin dashboard."""
+
+    charts = {
+        "revenue_summary": {"chart": "monthly_revenue", "params": {"months": 12}},
+        "bookings_summary": {"chart": "bookings_over_time", "params": {"days": 30}},
+        "genre_distribution": {"chart": "genre_distribution"},
+        "ticket_types": {"chart": "ticket_types"},
+        "top_movies": {"chart": "movie_ratings"},
+    }
+
+
+class ModeratorDashboardView(BatchDashboardView):
+    """API view for the moderator dashboard."""
+
+    charts = {
+        "bookings_summary": {"chart": "bookings_over_time", "params": {"days": 30}},
+        "genre_distribution": {"chart": "genre_distribution"},
+        "ticket_types": {"chart": "ticket_types"},
+        "top_movies": {"chart": "movie_ratings"},
+    }
 
 
 class ReportListView(BaseChartView):
@@ -0,0 +1,215 @@
+"""
+Customer cohort and retention analytics.
+
+Confirmed bookings from both storage tiers are read once, ordered by
+customer and time, into parallel typed arrays (customer, local day, month,
+amount). Everything else is computed from those columns in a single
+sequential pass, one run of rows per customer, with no per-customer
+queries:
+
+- monthly acquisition cohorts (the month of a customer's first booking)
+  and the share of each cohort booking again N months later,
+- the number of days between a customer's consecutive visits,
+- RFM (recency, frequency, monetary) scores and segments.
+
+The analysis is cached as a whole, so the charts built from it share one
+pass over the bookings.
+"""
+
+from array import array
+from collections import Counter, defaultdict
+from statistics import mean, median
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from bookings.archive import BookingHistory
+from bookings.models import BookingStatus
+
+CACHE_KEY = "customer_analytics"
+CACHE_TIMEOUT = 60 * 60
+
+# Upper bounds (in days, inclusive) of the time-between-visits buckets; the
+# last bucket is open ended
+VISIT_INTERVAL_BUCKETS = (7, 14, 30, 60, 90, 180)
+
+# RFM segments as (name, rule on the recency, frequency and monetary
+# scores), checked in order; scores go from 1 (worst) to 5 (best)
+RFM_SEGMENTS = (
+    ("Champions", lambda r, f, m: r >= 4 and f >= 4 and m >= 4),
+    ("Loyal", lambda r, f, m: r >= 3 and f >= 3),
+    ("Big Spenders", lambda r, f, m: r >= 3 and m >= 4),
+    ("New", lambda r, f, m: r >= 4),
+    ("At Risk", lambda r, f, m: r <= 2 and (f >= 3 or m >= 4)),
+    ("Lost", lambda r, f, m: r <= 2),
+    ("Needs Attention", lambda r, f, m: True),
+)
+
+
+class BookingEvents:
+    """Confirmed bookings as columns, sorted by customer and time."""
+
+    def __init__(self):
+        self.customers = array("q")
+        self.days = array("l")  # Local date ordinal
+        self.months = array("l")  # year * 12 + month - 1
+        self.amounts = array("d")
+
+    def __len__(self):
+        return len(self.customers)
+
+    @classmethod
+    def load(cls):
+        events = cls()
+        rows = BookingHistory(booking_status=BookingStatus.CONFIRMED).values_list(
+            "user", "created_at", "total_amount", order_by=("user", "created_at")
+        )
+        for customer, created_at, amount in rows:
+            date = timezone.localdate(created_at)
+            events.customers.append(customer)
+            events.days.append(date.toordinal())
+            events.months.append(date.year * 12 + date.month - 1)
+            events.amounts.append(float(amount))
+        return events
+
+    def runs(self):
+        """Yield ``(start, end)`` index ranges of each customer's rows."""
+        customers = self.customers
+        start = 0
+        for index in range(1, len(customers) + 1):
+            if index == len(customers) or customers[index] != customers[start]:
+                yield start, index
+                start = index
+
+
+def month_label(month):
+    return f"{month // 12}-{month % 12 + 1:02d}"
+
+
+def _scores(values, higher_is_better=True):
+    """
+    Return 1-5 quintile scores of the values, by rank. Equal values get the
+    score of the first of them.
+    """
+    order = sorted(range(len(values)), key=values.__getitem__)
+    scores = array("b", bytes(len(values)))
+    previous = score = None
+    for rank, index in enumerate(order):
+        if values[index] != previous:
+            score = rank * 5 // len(values) + 1
+            previous = values[index]
+        scores[index] = score if higher_is_better else 6 - score
+    return scores
+
+
+def analyze(events, today=None):
+    """Compute cohorts, visit intervals and RFM segments from booking events."""
+    today = (today or timezone.localdate()).toordinal()
+
+    cohorts = defaultdict(Counter)  # Cohort month -> months later -> customers
+    intervals = array("l")
+    recency = array("l")
+    frequency = array("l")
+    monetary = array("d")
+
+    days, months, amounts = events.days, events.months, events.amounts
+    for start, end in events.runs():
+        cohort = months[start]
+        cohorts[cohort].update({month - cohort for month in set(months[start:end])})
+
+        previous = days[start]
+        for day in days[start + 1 : end]:
+            # Several bookings on one day are one visit
+            if day != previous:
+                intervals.append(day - previous)
+                previous = day
+
+        recency.append(today - days[end - 1])
+        frequency.append(end - start)
+        monetary.append(sum(amounts[start:end]))
+
+    return {
+        "cohorts": _summarize_cohorts(cohorts),
+        "visit_intervals": _summarize_intervals(intervals),
+        "rfm": _summarize_rfm(recency, frequency, monetary),
+    }
+
+
+def _summarize_cohorts(cohorts):
+    rows = []
+    for cohort in sorted(cohorts):
+        counts = cohorts[cohort]
+        size = counts[0]
+        rows.append(
+            {
+                "cohort": month_label(cohort),
+                "customers": size,
+                "retention": [
+                    round(counts[offset] / size * 100, 2)
+                    for offset in range(max(counts) + 1)
+                ],
+            }
+        )
+    return rows
+
+
+def _summarize_intervals(intervals):
+    buckets = Counter()
+    for interval in intervals:
+        for index, bound in enumerate(VISIT_INTERVAL_BUCKETS):
+            if interval <= bound:
+                buckets[index] += 1
+                break
+        else:
+            buckets[len(VISIT_INTERVAL_BUCKETS)] += 1
+
+    labels = []
+    lower = 1
+    for bound in VISIT_INTERVAL_BUCKETS:
+        labels.append(f"{lower}-{bound} days")
+        lower = bound + 1
+    labels.append(f"{lower}+ days")
+
+    return {
+        "labels": labels,
+        "counts": [buckets[index] for index in range(len(labels))],
+        "visits": len(intervals),
+        "mean_days": round(mean(intervals), 1) if intervals else None,
+        "median_days": median(intervals) if intervals else None,
+    }
+
+
+def _summarize_rfm(recency, frequency, monetary):
+    segments = {name: {"customers": 0, "monetary": 0.0} for name, _ in RFM_SEGMENTS}
+    if recency:
+        r_scores = _scores(recency, higher_is_better=False)
+        f_scores = _scores(frequency)
+        m_scores = _scores(monetary)
+        for r, f, m, amount in zip(r_scores, f_scores, m_scores, monetary):
+            for name, rule in RFM_SEGMENTS:
+                if rule(r, f, m):
+                    segments[name]["customers"] += 1
+                    segments[name]["monetary"] += amount
+                    break
+
+    return [
+        {
+            "segment": name,
+            "customers": segment["customers"],
+            "average_monetary": (
+                round(segment["monetary"] / segment["customers"], 2)
+                if segment["customers"]
+                else 0
+            ),
+        }
+        for name, segment in segments.items()
+    ]
+
+
+def get_customer_analytics():
+    """Return the cached customer analytics, computing them if needed."""
+    analytics = cache.get(CACHE_KEY)
+    if analytics is None:
+        analytics = analyze(BookingEvents.load())
+        cache.set(CACHE_KEY, analytics, CACHE_TIMEOUT)
+    return analytics
@@ -0,0 +1,126 @@
+import json
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from .metric_stream import get_group_name, serialize_metric_value
+from .models import Metric
+
+
+class MetricStreamConsumer(AsyncWebsocketConsumer):
+    """
+    WebSocket consumer streaming new metric values to dashboards.
+
+    Clients send ``{"type": "subscribe", "metrics": [<key>, ...]}`` (or
+    ``"unsubscribe"``) with metric keys, i.e. calculation methods. They get
+    the current values of the metrics they subscribed to, then every new
+    value as it is calculated.
+    """
+
+    async def connect(self):
+        """Handle WebSocket connection."""
+        if self.scope["user"].is_anonymous:
+            # Reject anonymous users
+            await self.close()
+            return
+
+        self.role = Metric.get_dashboard_role(self.scope["user"])
+        self.subscriptions = set()
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        """Handle WebSocket disconnection."""
+        for key in getattr(self, "subscriptions", ()):
+            await self.channel_layer.group_discard(
+                get_group_name(self.role, key), self.channel_name
+            )
+
+    async def receive(self, text_data):
+        """Handle receiving messages from WebSocket."""
+        try:
+            data = json.loads(text_data)
+        except ValueError:
+            await self.send_error("Invalid JSON")
+            return
+
+        message_type = data.get("type")
+        keys = data.get("metrics")
+        if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+            await self.send_error("metrics must be a list of metric keys")
+            return
+
+        if message_type == "subscribe":
+            await self.subscribe(keys)
+        elif message_type == "unsubscribe":
+            await self.unsubscribe(keys)
+        else:
+            await self.send_error(f"Unknown message type: {message_type}")
+
+    async def subscribe(self, keys):
+        """Join the groups of the metric keys visible to the user's role."""
+        metrics = await self.get_current_values(keys)
+        allowed = {metric["key"] for metric in metrics}
+
+        for key in allowed - self.subscriptions:
+            await self.channel_layer.group_add(
+                get_group_name(self.role, key), self.channel_name
+            )
+        self.subscriptions |= allowed
+
+        await self.send(
+            text_data=json.dumps(
+                {
+                    "type": "subscribed",
+                    "metrics": sorted(allowed),
+                    "rejected": sorted(set(keys) - allowed),
+                }
+            )
+        )
+        for metric in metrics:
+            if metric["value"] is not None:
+                await self.send(
+                    text_data=json.dumps({"type": "metric_value", **metric["value"]})
+                )
+
+    async def unsubscribe(self, keys):
+        """Leave the groups of the given metric keys."""
+        for key in self.subscriptions & set(keys):
+            await self.channel_layer.group_discard(
+                get_group_name(self.role, key), self.channel_name
+            )
+        self.subscriptions -= set(keys)
+        await self.send(
+            text_data=json.dumps(
+                {"type": "unsubscribed", "metrics": sorted(self.subscriptions)}
+            )
+        )
+
+    async def metric_value(self, event):
+        """Handle a new metric value and send it to the WebSocket."""
+        await self.send(text_data=json.dumps({"type": "metric_value", **event["data"]}))
+
+    async def send_error(self, message):
+        await self.send(text_data=json.dumps({"type": "error", "error": message}))
+
+    @database_sync_to_async
+    def get_current_values(self, keys):
+        """
+        Return the active metrics with the given keys visible to the user's
+        role, with their latest value.
+        """
+        metrics = Metric.objects.filter(
+            calculation_method__in=keys,
+            is_active=True,
+            **{Metric.ROLE_VISIBILITY[self.role]: True},
+        ).select_related("latest_value")
+        return [
+            {
+                "key": metric.calculation_method,
+                "value": (
+                    serialize_metric_value(metric, metric.latest_value)
+                    if metric.latest_value
+                    else None
+                ),
+            }
+            for metric in metrics
+        ]
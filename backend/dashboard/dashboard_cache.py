@@ -0,0 +1,95 @@
+"""
+Cached dashboard payloads.
+
+Dashboard payloads only depend on the viewer's role, so each role's payload
+is built once and shared. A cached payload carries the dashboard version
+stamp it was built from (see xcounter.cache_utils); the stamp is replaced
+whenever a Metric or raw MetricValue is written, which makes the payload
+stale. Stamps are shared by every process, so values written by
+calculate_metrics or another worker make every process's payload stale,
+whichever cache it is kept in.
+
+Only one request builds a payload at a time: it takes a short lock, and
+everyone else is served without piling onto the database. While a stale
+payload is rebuilt the others get the stale copy (stale-while-revalidate);
+when there is no payload at all they wait briefly for it, and only build
+one themselves, without caching it, if it doesn't show up in time.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from xcounter.cache_utils import bump_version_stamp, get_version_stamp
+
+DASHBOARD_STAMP = "dashboard_metrics"
+
+# Cache statuses reported with each payload
+HIT = "HIT"
+STALE = "STALE"
+MISS = "MISS"
+
+# How long requests without a cached payload wait for another request to
+# build it, and how often they check
+COLD_MISS_WAIT = 5
+COLD_MISS_POLL_INTERVAL = 0.1
+
+
+def bump_dashboard_version():
+    """Mark every cached dashboard payload stale."""
+    bump_version_stamp(DASHBOARD_STAMP)
+
+
+def _cache_key(role):
+    return f"role_dashboard:{role}"
+
+
+def _wait_for_entry(cache_key):
+    """Wait up to COLD_MISS_WAIT seconds for a cache entry; return it or None."""
+    deadline = time.monotonic() + COLD_MISS_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(COLD_MISS_POLL_INTERVAL)
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_dashboard_payload(role, build):
+    """
+    Return ``(payload, cache_status)`` for a role.
+
+    ``build`` is called without arguments to compute the payload when the
+    cache can't serve it.
+    """
+    version = get_version_stamp(DASHBOARD_STAMP)
+    cache_key = _cache_key(role)
+    lock_key = f"{cache_key}:rebuilding"
+    entry = cache.get(cache_key)
+
+    if entry is not None and entry["version"] == version:
+        return entry["payload"], HIT
+
+    lock_timeout = getattr(settings, "DASHBOARD_CACHE_REBUILD_TIMEOUT", 30)
+    if not cache.add(lock_key, True, lock_timeout):
+        # Another request is building it
+        if entry is None:
+            entry = _wait_for_entry(cache_key)
+        if entry is not None:
+            return entry["payload"], HIT if entry["version"] == version else STALE
+        # It didn't finish in time; build a payload for this request only
+        return build(), MISS
+
+    try:
+        payload = build()
+        # Keep stale payloads around much longer than they are fresh, so
+        # there is something to serve while they are rebuilt
+        cache.set(
+            cache_key,
+            {"version": version, "payload": payload},
+            getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 60 * 60 * 24),
+        )
+    finally:
+        cache.delete(lock_key)
+    return payload, MISS
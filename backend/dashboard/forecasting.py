@@ -0,0 +1,217 @@
+"""
+Per-show demand forecasting.
+
+Forecasts the final ticket sales of upcoming shows with a pickup model: a
+show that has sold ``sold`` tickets ``lead`` days before it starts is
+expected to end up where similar past shows ended up from the same point.
+
+Training and scoring are one batch. Two queries load every recent past
+show and every upcoming show, and their daily confirmed ticket sales from
+the DailySales fact table; past shows are turned into cumulative sales
+curves by lead day and summed per similarity key, after which each upcoming
+show is scored with a few lookups.
+
+Only confirmed tickets count as sales, so cancelled, pending and expired
+bookings don't inflate the curves; an upcoming show has sold the seats it no
+longer has available.
+
+Similar shows are looked up from the most to the least specific key, using
+the first one backed by enough past shows:
+
+    movie, show type, weekday, hour
+    movie, show type
+    show type, weekday, hour
+    all shows
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from bookings.models import DailySales
+from movies.models import Show
+
+# Past shows that started at most this many days ago are used for training
+HISTORY_DAYS = 180
+
+# Sales more than this many days before a show are counted at this lead
+MAX_LEAD_DAYS = 30
+
+# Fewest past shows a similarity key needs to be used
+MIN_SIMILAR_SHOWS = 3
+
+# Similarity keys, from the most to the least specific
+SIMILARITY_KEYS = (
+    ("movie_slot", ("movie", "show_type", "weekday", "hour")),
+    ("movie", ("movie", "show_type")),
+    ("slot", ("show_type", "weekday", "hour")),
+    ("all", ()),
+)
+
+
+class PickupModel:
+    """Sales curves of past shows, summed per similarity key."""
+
+    def __init__(self):
+        # (level, key) -> number of shows, total final sales and, per lead
+        # day, total sales by then
+        self.shows = defaultdict(int)
+        self.final = defaultdict(int)
+        self.sold_by_lead = defaultdict(lambda: [0] * (MAX_LEAD_DAYS + 1))
+
+    @staticmethod
+    def get_keys(show):
+        for level, fields in SIMILARITY_KEYS:
+            yield level, (level, *(show[field] for field in fields))
+
+    def add(self, show, curve):
+        """Add a past show and its cumulative sales curve (sold by lead day)."""
+        for _, key in self.get_keys(show):
+            self.shows[key] += 1
+            self.final[key] += curve[0]
+            sold_by_lead = self.sold_by_lead[key]
+            for lead, sold in enumerate(curve):
+                sold_by_lead[lead] += sold
+
+    def predict(self, show, sold, lead):
+        """
+        Return ``(forecast, level, similar_shows)`` for a show that has sold
+        ``sold`` tickets ``lead`` days before it starts.
+        """
+        lead = min(lead, MAX_LEAD_DAYS)
+        for level, key in self.get_keys(show):
+            count = self.shows.get(key, 0)
+            if count < MIN_SIMILAR_SHOWS:
+                continue
+
+            sold_then = self.sold_by_lead[key][lead]
+            if sold and sold_then:
+                # Similar shows sold final / sold_then times what they had
+                forecast = sold * self.final[key] / sold_then
+            else:
+                # Nothing to scale; add the average number sold since then
+                forecast = sold + (self.final[key] - sold_then) / count
+            return min(forecast, show["total_seats"]), level, count
+        return sold, None, 0
+
+
+def _get_shows(start, end, now):
+    # Past shows are deactivated when they are archived but still count as
+    # history; only active upcoming shows are forecast
+    shows = (
+        Show.objects.filter(start_time__gte=start, start_time__lt=end)
+        .filter(Q(start_time__lt=now) | Q(is_active=True))
+        .values(
+            "id",
+            "movie",
+            "movie__title",
+            "theater",
+            "theater__name",
+            "show_type",
+            "start_time",
+            "total_seats",
+            "available_seats",
+        )
+    )
+    result = {}
+    for show in shows:
+        local = timezone.localtime(show["start_time"])
+        show["date"] = local.date()
+        show["weekday"] = local.isoweekday()
+        show["hour"] = local.hour
+        result[show["id"]] = show
+    return result
+
+
+def _get_daily_sales(start, end):
+    """
+    Return show id -> [(sale date, confirmed tickets), ...] for shows in the
+    range.
+    """
+    rows = (
+        DailySales.objects.filter(show__start_time__gte=start, show__start_time__lt=end)
+        .values("show", "date")
+        .annotate(tickets=Sum("confirmed_tickets"))
+        .order_by()
+    )
+    sales = defaultdict(list)
+    for row in rows:
+        sales[row["show"]].append((row["date"], row["tickets"]))
+    return sales
+
+
+def _get_curve(show, sales):
+    """Return the cumulative tickets sold at each lead day, 0 (final) first."""
+    by_lead = [0] * (MAX_LEAD_DAYS + 1)
+    for date, tickets in sales:
+        lead = min(max((show["date"] - date).days, 0), MAX_LEAD_DAYS)
+        by_lead[lead] += tickets
+    # Sold by lead L = everything sold L or more days before the show
+    for lead in range(MAX_LEAD_DAYS - 1, -1, -1):
+        by_lead[lead] += by_lead[lead + 1]
+    return by_lead
+
+
+def forecast_shows(horizon_days=14, now=None):
+    """
+    Forecast the final ticket sales of the shows starting in the next
+    ``horizon_days`` days.
+
+    Returns a list of dicts, ordered by start time.
+    """
+    now = now or timezone.now()
+    start = now - timedelta(days=HISTORY_DAYS)
+    end = now + timedelta(days=horizon_days)
+    shows = _get_shows(start, end, now)
+    sales = _get_daily_sales(start, end)
+
+    model = PickupModel()
+    upcoming = []
+    for show_id, show in shows.items():
+        if show["start_time"] < now:
+            model.add(show, _get_curve(show, sales.get(show_id, ())))
+        else:
+            upcoming.append(show)
+
+    today = timezone.localdate(now)
+    forecasts = []
+    for show in sorted(upcoming, key=lambda show: show["start_time"]):
+        sold = show["total_seats"] - show["available_seats"]
+        lead = (show["date"] - today).days
+        forecast, level, similar_shows = model.predict(show, sold, lead)
+        forecasts.append(
+            {
+                "show": show["id"],
+                "movie": show["movie"],
+                "movie_title": show["movie__title"],
+                "theater": show["theater"],
+                "theater_name": show["theater__name"],
+                "show_type": show["show_type"],
+                "start_time": show["start_time"],
+                "total_seats": show["total_seats"],
+                "lead_days": lead,
+                "sold": sold,
+                "forecast": round(forecast),
+                "forecast_occupancy": (
+                    round(forecast / show["total_seats"] * 100, 2)
+                    if show["total_seats"]
+                    else 0
+                ),
+                "basis": level,
+                "similar_shows": similar_shows,
+            }
+        )
+    return forecasts
+
+
+def get_show_forecasts(horizon_days=14):
+    """Return forecast_shows(horizon_days), cached for 15 minutes."""
+    cache_key = f"show_forecasts_{horizon_days}"
+    forecasts = cache.get(cache_key)
+    if forecasts is None:
+        forecasts = forecast_shows(horizon_days)
+        cache.set(cache_key, forecasts, 60 * 15)
+    return forecasts
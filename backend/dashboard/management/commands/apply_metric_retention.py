@@ -0,0 +1,54 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.models import Metric
+from dashboard.retention import apply_retention
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Management command to downsample and prune metric values.
+
+    Rolls raw values up to hourly, daily and monthly resolution and deletes
+    values past each metric's retention horizons. Run it at least daily.
+    """
+
+    help = "Rolls up metric values and prunes them past their retention horizons"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--metric",
+            type=int,
+            action="append",
+            dest="metric_ids",
+            help="Only process the metric with this id (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        metrics = Metric.objects.all()
+        if options["metric_ids"]:
+            metrics = metrics.filter(id__in=options["metric_ids"])
+
+        try:
+            results = apply_retention(metrics)
+        except Exception as e:
+            logger.error(f"Error applying metric retention: {str(e)}")
+            raise CommandError(f"Failed to apply metric retention: {str(e)}")
+
+        total_created = total_deleted = 0
+        for metric, (created, deleted) in results.items():
+            total_created += created
+            total_deleted += deleted
+            if created or deleted:
+                self.stdout.write(
+                    f"{metric.name}: {created} values rolled up, {deleted} pruned"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rolled up {total_created} and pruned {total_deleted} metric values."
+            )
+        )
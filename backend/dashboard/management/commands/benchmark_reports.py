@@ -0,0 +1,181 @@
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookings.models import Booking, BookingStatus, PaymentStatus, Ticket
+from bookings.sales import rebuild_daily_sales
+from dashboard.report_generators import (
+    _generate_finance_report,
+    _generate_sales_report,
+)
+from movies.models import Movie, Show, Theater
+from users.models import CustomUser
+
+# Reports whose data depends on the bookings in their period
+REPORTS = {
+    "Sales": _generate_sales_report,
+    "Finance": _generate_finance_report,
+}
+
+
+class Command(BaseCommand):
+    """
+    Management command timing the booking reports for growing numbers of
+    bookings in their period.
+
+    Test bookings are added in steps up to each requested number and every
+    report is built after each step, reporting its queries and build time.
+    Everything runs in a transaction that is rolled back at the end, so no
+    test data is left behind; the transaction holds locks on the tables it
+    writes, so run this against a development database.
+    """
+
+    help = "Times report generation for growing numbers of bookings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bookings",
+            type=int,
+            nargs="+",
+            default=[1000, 10000, 50000],
+            help="Numbers of bookings to time the reports with "
+            "(default: 1000 10000 50000)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Length of the report period in days (default: 30)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of rows per INSERT (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(set(options["bookings"]))
+        days = options["days"]
+        if sizes[0] < 1:
+            raise CommandError("--bookings must be at least 1")
+        if days < 1:
+            raise CommandError("--days must be at least 1")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        end = timezone.localdate()
+        start = end - timedelta(days=days - 1)
+        parameters = {
+            "start_date": start.isoformat(),
+            # Reports end at midnight of their end date
+            "end_date": (end + timedelta(days=1)).isoformat(),
+        }
+
+        self.stdout.write(
+            f"{'Bookings':>10}"
+            + "".join(f"{name + ' queries':>18}{name + ' (s)':>14}" for name in REPORTS)
+        )
+        with tempfile.TemporaryDirectory() as directory, transaction.atomic():
+            user, shows = self.create_fixtures(start, days)
+            created = 0
+            for size in sizes:
+                self.create_bookings(user, shows, start, created, size, options)
+                created = size
+                rebuild_daily_sales(start, end)
+
+                row = f"{size:>10}"
+                for name, generate in REPORTS.items():
+                    queries, seconds = self.time_report(
+                        generate, os.path.join(directory, f"{name}.pdf"), parameters
+                    )
+                    row += f"{queries:>18}{seconds:>14.3f}"
+                self.stdout.write(row)
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished; test data removed."))
+
+    def create_fixtures(self, start, days):
+        """Create a customer and one show on each day of the period."""
+        user = CustomUser.objects.create_user(
+            email=f"report-benchmark-{int(time.time())}@example.com", password=None
+        )
+        movie = Movie.objects.create(
+            title="Report Benchmark",
+            description="Report benchmark movie",
+            release_date=start,
+            duration_minutes=120,
+        )
+        theater = Theater.objects.create(
+            name="Report Benchmark", location="Benchmark", capacity=100
+        )
+        shows = []
+        for day in range(days):
+            start_time = timezone.make_aware(
+                datetime.combine(start + timedelta(days=day), datetime.min.time())
+            ) + timedelta(hours=20)
+            shows.append(
+                Show.objects.create(
+                    movie=movie,
+                    theater=theater,
+                    start_time=start_time,
+                    end_time=start_time + timedelta(hours=2),
+                    price=Decimal("10.00"),
+                    total_seats=100,
+                    available_seats=100,
+                )
+            )
+        return user, shows
+
+    def create_bookings(self, user, shows, start, first, last, options):
+        """Add bookings ``first`` to ``last`` (exclusive), spread over the days."""
+        days = len(shows)
+        bookings = Booking.objects.bulk_create(
+            (
+                Booking(
+                    user=user,
+                    show=shows[number % days],
+                    booking_number=f"RB{number % days:03d}{number:09d}",
+                    total_seats=1,
+                    total_amount=Decimal("10.00"),
+                    booking_status=BookingStatus.CONFIRMED,
+                    payment_status=PaymentStatus.COMPLETED,
+                )
+                for number in range(first, last)
+            ),
+            batch_size=options["batch_size"],
+        )
+        Ticket.objects.bulk_create(
+            (
+                Ticket(
+                    booking=booking,
+                    seat_number="A1",
+                    price=booking.total_amount,
+                    ticket_number=f"RT{booking.booking_number[2:]}",
+                )
+                for booking in bookings
+            ),
+            batch_size=options["batch_size"],
+        )
+
+        # created_at is set on insert; move each booking to its show's day
+        for day, show in enumerate(shows):
+            Booking.objects.filter(booking_number__startswith=f"RB{day:03d}").update(
+                created_at=show.start_time - timedelta(hours=8)
+            )
+
+    def time_report(self, generate, filepath, parameters):
+        """Build a report; return the number of queries and the seconds taken."""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            generate(filepath, parameters)
+            seconds = time.perf_counter() - started
+        return len(queries), seconds
@@ -0,0 +1,79 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from dashboard.metric_scheduler import run_due_metrics, run_metrics
+from dashboard.models import Metric
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Management command to calculate dashboard metrics that are due.
+
+    Run it from cron (e.g. every few minutes), or with --loop as a
+    long-running worker.
+    """
+
+    help = "Calculates every dashboard metric that is due per its refresh frequency"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Calculate every active metric, whether it is due or not",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and check for due metrics every --interval seconds",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=60,
+            help="Seconds between checks when running with --loop (default: 60)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # Like a request, each run drops connections that have gone
+            # stale or outlived CONN_MAX_AGE
+            close_old_connections()
+            self.run_once(options["all"])
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    def run_once(self, calculate_all):
+        if calculate_all:
+            results = run_metrics(list(Metric.objects.filter(is_active=True)))
+        else:
+            results = run_due_metrics()
+
+        if not results:
+            self.stdout.write("No metrics are due.")
+            return
+
+        failed = 0
+        for metric, value, cost in results:
+            if value is None:
+                failed += 1
+                self.stdout.write(
+                    self.style.WARNING(f"Could not calculate: {metric.name}")
+                )
+            else:
+                self.stdout.write(
+                    f"Calculated: {metric.name} "
+                    f"({cost.ms:.1f} ms, {cost.queries} queries)"
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Calculated {len(results) - failed} of {len(results)} due metrics."
+            )
+        )
+        self.stdout.flush()
@@ -1,14 +1,16 @@
 import csv
 import json
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from bookings.models import Booking, Ticket
+from bookings.models import DailySales, Ticket
+from dashboard.time_buckets import aggregate_by_bucket
 from django.core.management.base import BaseCommand, CommandError
-from django.db.models import Sum
+from django.db.models import Count, Sum
 from django.utils import timezone
-from movies.models import Movie, Show
+from movies.models import Genre, Show
 
 logger = logging.getLogger(__name__)
 
@@ -104,49 +106,59 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f"Reports saved to {output_dir}/"))
 
+    def get_sales(self, start_date, end_date):
+        """Return the daily sales rows for bookings made in the given period."""
+        return DailySales.objects.filter(
+            date__gte=timezone.localdate(start_date),
+            date__lte=timezone.localdate(end_date),
+        )
+
     def generate_movie_report(self, start_date, end_date, output_dir, output_format):
         """Generate a report on movie performance."""
         self.stdout.write("Generating movie performance report...")
 
-        # Get all movies with shows during this period
+        # Shows, tickets and revenue per movie for shows during this period
         shows_in_period = Show.objects.filter(
             start_time__gte=start_date, start_time__lte=end_date
         )
-        movie_ids = shows_in_period.values_list("movie_id", flat=True).distinct()
-        movies = Movie.objects.filter(id__in=movie_ids)
-
-        # For each movie, get the number of shows, tickets sold, and revenue
-        movie_data = []
-        for movie in movies:
-            movie_shows = shows_in_period.filter(movie=movie)
-            show_count = movie_shows.count()
-
-            # Get tickets for these shows
-            tickets = Ticket.objects.filter(booking__show__in=movie_shows)
-            ticket_count = tickets.count()
-
-            # Calculate revenue
-            revenue = (
-                Booking.objects.filter(show__in=movie_shows).aggregate(
-                    total=Sum("total_amount")
-                )["total"]
-                or 0
+        show_stats = (
+            shows_in_period.values("movie", "movie__title")
+            .annotate(show_count=Count("id"), total_capacity=Sum("total_seats"))
+            .order_by()
+        )
+        sales = dict(
+            (row["movie"], row)
+            for row in DailySales.objects.filter(
+                show__start_time__gte=start_date, show__start_time__lte=end_date
             )
+            .values("movie")
+            .annotate(ticket_count=Sum("tickets"), revenue=Sum("gross_amount"))
+            .order_by()
+        )
 
-            # Calculate average occupancy rate
-            total_capacity = sum(show.theater.capacity for show in movie_shows)
+        genres = defaultdict(list)
+        for movie_id, name in Genre.objects.filter(
+            movies__in=[stat["movie"] for stat in show_stats]
+        ).values_list("movies", "name"):
+            genres[movie_id].append(name)
+
+        movie_data = []
+        for stat in show_stats:
+            movie_sales = sales.get(stat["movie"], {})
+            ticket_count = movie_sales.get("ticket_count") or 0
+            total_capacity = stat["total_capacity"] or 0
             occupancy_rate = (
                 (ticket_count / total_capacity * 100) if total_capacity > 0 else 0
             )
 
             movie_data.append(
                 {
-                    "id": movie.id,
-                    "title": movie.title,
-                    "genre": movie.genre.name if movie.genre else "Unknown",
-                    "show_count": show_count,
+                    "id": stat["movie"],
+                    "title": stat["movie__title"],
+                    "genre": ", ".join(genres[stat["movie"]]) or "Unknown",
+                    "show_count": stat["show_count"],
                     "ticket_count": ticket_count,
-                    "revenue": revenue,
+                    "revenue": movie_sales.get("revenue") or 0,
                     "occupancy_rate": occupancy_rate,
                 }
             )
@@ -193,34 +205,27 @@ class Command(BaseCommand):
         """Generate a report on booking activity."""
         self.stdout.write("Generating booking activity report...")
 
-        # Get all bookings in this period
-        bookings = Booking.objects.filter(
-            created_at__gte=start_date, created_at__lte=end_date
-        )
-
-        # Group bookings by date
-        booking_data = {}
-        for booking in bookings:
-            date_str = booking.created_at.strftime("%Y-%m-%d")
-            if date_str not in booking_data:
-                booking_data[date_str] = {
-                    "date": date_str,
-                    "count": 0,
-                    "tickets": 0,
-                    "revenue": 0,
-                    "cancelled": 0,
-                }
-
-            booking_data[date_str]["count"] += 1
-            booking_data[date_str]["tickets"] += booking.tickets.count()
-            booking_data[date_str]["revenue"] += booking.total_amount
-
-            if booking.status == "CANCELLED":
-                booking_data[date_str]["cancelled"] += 1
-
-        # Convert to list and sort by date
-        booking_data = [v for k, v in booking_data.items()]
-        booking_data = sorted(booking_data, key=lambda x: x["date"])
+        # Bookings in this period by day, including the days without any
+        booking_data = [
+            {
+                "date": day["label"],
+                "count": day["count"],
+                "tickets": day["tickets"],
+                "revenue": day["revenue"],
+                "cancelled": day["cancelled"],
+            }
+            for day in aggregate_by_bucket(
+                DailySales.objects.all(),
+                "date",
+                "day",
+                timezone.localdate(start_date),
+                timezone.localdate(end_date),
+                count=Sum("bookings"),
+                tickets=Sum("tickets"),
+                revenue=Sum("gross_amount"),
+                cancelled=Sum("cancelled_bookings"),
+            )
+        ]
 
         # Write the report
         filename = f"{output_dir}/booking_activity_{start_date.strftime('%Y_%m')}.{output_format}"
@@ -252,50 +257,45 @@ class Command(BaseCommand):
         """Generate a report on revenue."""
         self.stdout.write("Generating revenue report...")
 
-        # Get all bookings in this period
-        bookings = Booking.objects.filter(
-            created_at__gte=start_date, created_at__lte=end_date
-        )
+        # Bookings in this period
+        sales = self.get_sales(start_date, end_date)
 
         # Calculate overall metrics
-        total_bookings = bookings.count()
-        total_revenue = bookings.aggregate(total=Sum("total_amount"))["total"] or 0
+        totals = sales.aggregate(
+            total_bookings=Sum("bookings"), total_revenue=Sum("gross_amount")
+        )
+        total_bookings = totals["total_bookings"] or 0
+        total_revenue = totals["total_revenue"] or 0
         avg_booking_value = total_revenue / total_bookings if total_bookings > 0 else 0
 
         # Group by payment method
-        payment_methods = {}
-        for booking in bookings:
-            payment_method = booking.payment_method or "Unknown"
-            if payment_method not in payment_methods:
-                payment_methods[payment_method] = {
-                    "method": payment_method,
-                    "count": 0,
-                    "revenue": 0,
-                }
-
-            payment_methods[payment_method]["count"] += 1
-            payment_methods[payment_method]["revenue"] += booking.total_amount
-
-        payment_data = [v for k, v in payment_methods.items()]
-        payment_data = sorted(payment_data, key=lambda x: x["revenue"], reverse=True)
-
-        # Ticket type analysis
-        ticket_types = {}
-        tickets = Ticket.objects.filter(booking__in=bookings)
-        for ticket in tickets:
-            ticket_type = ticket.ticket_type
-            if ticket_type not in ticket_types:
-                ticket_types[ticket_type] = {
-                    "type": ticket_type,
-                    "count": 0,
-                    "revenue": 0,
-                }
-
-            ticket_types[ticket_type]["count"] += 1
-            ticket_types[ticket_type]["revenue"] += ticket.price
-
-        ticket_data = [v for k, v in ticket_types.items()]
-        ticket_data = sorted(ticket_data, key=lambda x: x["revenue"], reverse=True)
+        payment_data = [
+            {
+                "method": row["payment_method"] or "Unknown",
+                "count": row["count"],
+                "revenue": row["revenue"],
+            }
+            for row in sales.values("payment_method")
+            .annotate(count=Sum("bookings"), revenue=Sum("gross_amount"))
+            .order_by("-revenue")
+        ]
+
+        # Ticket type analysis (seat categories aren't part of the daily
+        # sales table, so these come from the tickets themselves)
+        ticket_data = [
+            {
+                "type": row["seat_category"],
+                "count": row["count"],
+                "revenue": row["revenue"],
+            }
+            for row in Ticket.objects.filter(
+                booking__created_at__gte=start_date,
+                booking__created_at__lte=end_date,
+            )
+            .values("seat_category")
+            .annotate(count=Count("id"), revenue=Sum("price"))
+            .order_by("-revenue")
+        ]
 
         # Write the report
         filename = (
@@ -0,0 +1,122 @@
+import logging
+import multiprocessing
+import time
+from multiprocessing.connection import wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.models import GeneratedReport
+from dashboard.report_queue import claim_reports, fail_report, fail_stale_reports
+from dashboard.report_worker import render_report_process
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Management command rendering queued reports in worker processes, one
+    process per report.
+
+    Run it as a long-running worker next to the web server; more than one
+    can share the queue.
+    """
+
+    help = "Renders queued reports in worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Reports rendered at the same time (default: REPORT_WORKERS)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2,
+            help="Seconds between checks for queued reports (default: 2)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Render the reports queued now, then exit",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"] or getattr(settings, "REPORT_WORKERS", 2)
+        if workers < 1:
+            raise CommandError("--workers must be at least 1")
+        timeout = getattr(settings, "REPORT_JOB_TIMEOUT", 60 * 30)
+
+        self.stdout.write(f"Rendering reports with {workers} workers")
+
+        # Each report is rendered in a fresh process, which sets Django up and
+        # opens its own database connection. A process that hangs is
+        # terminated and one that crashes only fails its own report.
+        context = multiprocessing.get_context("spawn")
+        running = {}  # report id -> (process, monotonic start time)
+        try:
+            while True:
+                self.reap(running, timeout)
+
+                failed = fail_stale_reports(exclude=running)
+                if failed:
+                    self.stdout.write(
+                        self.style.WARNING(f"Marked {failed} stale reports as failed")
+                    )
+
+                for report_id in claim_reports(workers - len(running)):
+                    process = context.Process(
+                        target=render_report_process,
+                        args=(report_id,),
+                        name=f"report-{report_id}",
+                    )
+                    process.start()
+                    running[report_id] = (process, time.monotonic())
+
+                if not running:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+                    continue
+
+                wait(
+                    [process.sentinel for process, _ in running.values()],
+                    timeout=options["interval"],
+                )
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping; waiting for running reports to finish")
+        finally:
+            for process, started in running.values():
+                process.join(max(started + timeout - time.monotonic(), 0))
+            self.reap(running, timeout)
+
+    def reap(self, running, timeout):
+        """Handle finished report processes and terminate those over time."""
+        for report_id, (process, started) in list(running.items()):
+            if process.is_alive():
+                if time.monotonic() - started < timeout:
+                    continue
+                process.terminate()
+                process.join()
+                fail_report(report_id, "Report generation timed out")
+            else:
+                process.join()
+                if process.exitcode != 0:
+                    logger.error(
+                        f"Worker rendering report {report_id} exited with code "
+                        f"{process.exitcode}"
+                    )
+                    fail_report(report_id, "The report worker stopped unexpectedly")
+            del running[report_id]
+
+            report_status = (
+                GeneratedReport.objects.filter(pk=report_id)
+                .values_list("status", flat=True)
+                .first()
+            )
+            if report_status == GeneratedReport.Status.COMPLETED:
+                self.stdout.write(self.style.SUCCESS(f"Rendered report {report_id}"))
+            else:
+                self.stdout.write(self.style.WARNING(f"Report {report_id} failed"))
+            self.stdout.flush()
@@ -0,0 +1,94 @@
+"""
+Metric registry.
+
+Each metric computation is registered under a key, which metrics select
+with their ``calculation_method``. A registration declares the snapshot
+data sources the computation depends on (see MetricDataSnapshot) and,
+optionally, a TTL in seconds for which its result is cached and reused
+across calculation runs:
+
+    @registry.register("total_sales", depends_on=["booking_totals"])
+    def total_sales(data):
+        return data.booking_totals["total_sales"] or 0
+
+Computations and data loads are measured with ``measure_cost``, which
+records their duration and the number of queries they ran.
+"""
+
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+MetricDefinition = namedtuple(
+    "MetricDefinition", ["key", "compute", "category", "depends_on", "ttl"]
+)
+
+
+class Cost:
+    """Duration (ms) and query count of a piece of work."""
+
+    def __init__(self, ms=0.0, queries=0):
+        self.ms = ms
+        self.queries = queries
+
+    def __add__(self, other):
+        return Cost(self.ms + other.ms, self.queries + other.queries)
+
+    def __repr__(self):
+        return f"Cost(ms={self.ms:.3f}, queries={self.queries})"
+
+
+@contextmanager
+def measure_cost():
+    """Measure the block's duration and the queries it runs into a Cost."""
+    cost = Cost()
+
+    def count_query(execute, sql, params, many, context):
+        cost.queries += 1
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        with connection.execute_wrapper(count_query):
+            yield cost
+    finally:
+        cost.ms = (time.perf_counter() - started) * 1000
+
+
+class MetricRegistry:
+    """Registered metric computations, by key."""
+
+    def __init__(self):
+        self._definitions = {}
+
+    def register(self, key, depends_on=(), category=None, ttl=None):
+        """Decorator registering a function computing a metric from a snapshot."""
+
+        def decorator(compute):
+            if key in self._definitions:
+                raise ImproperlyConfigured(f"Metric {key!r} is already registered")
+            self._definitions[key] = MetricDefinition(
+                key, compute, category, tuple(depends_on), ttl
+            )
+            return compute
+
+        return decorator
+
+    def get(self, key):
+        """Return the definition registered under a key, or None."""
+        return self._definitions.get(key)
+
+    def keys(self):
+        return self._definitions.keys()
+
+    def __iter__(self):
+        return iter(self._definitions.values())
+
+    def __contains__(self, key):
+        return key in self._definitions
+
+
+registry = MetricRegistry()
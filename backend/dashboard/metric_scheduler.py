@@ -0,0 +1,121 @@
+"""
+Scheduled metric calculation.
+
+A metric is due when it has never been calculated or when its
+refresh_frequency has elapsed since ``last_calculated_at``. Due metrics share
+one MetricDataSnapshot, so each piece of base data they depend on is loaded
+with one aggregate pass, and all resulting MetricValue rows are written with
+a single bulk insert.
+"""
+
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .dashboard_cache import bump_dashboard_version
+from .metric_registry import Cost
+from .metric_stream import broadcast_metric_values
+from .metrics import MetricCalculator, MetricDataSnapshot
+from .models import Metric, MetricValue
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVALS = {
+    Metric.RefreshFrequency.HOURLY: timedelta(hours=1),
+    Metric.RefreshFrequency.DAILY: timedelta(days=1),
+    Metric.RefreshFrequency.WEEKLY: timedelta(weeks=1),
+    Metric.RefreshFrequency.MONTHLY: timedelta(days=30),
+}
+
+
+def get_due_metrics(now=None):
+    """Return active metrics whose refresh interval has elapsed."""
+    now = now or timezone.now()
+    due = Q(last_calculated_at__isnull=True)
+    for frequency, interval in REFRESH_INTERVALS.items():
+        due |= Q(refresh_frequency=frequency, last_calculated_at__lte=now - interval)
+    return Metric.objects.filter(due, is_active=True)
+
+
+def run_metrics(metrics, now=None):
+    """
+    Calculate the given metrics from shared aggregate passes and store them.
+
+    Returns a list of ``(metric, value, cost)`` tuples. A metric's time is its
+    own computation plus an equal share of each data source it used; its
+    query count is what calculating it on its own takes. Metrics that can't
+    be calculated get a value and cost of None and are not stored.
+    """
+    now = now or timezone.now()
+    calculator = MetricCalculator(MetricDataSnapshot(now=now))
+
+    computations = []
+    for metric in metrics:
+        try:
+            computation = calculator.compute(metric)
+        except Exception as e:
+            logger.error(f"Error calculating metric {metric.id}: {str(e)}")
+            computation = None
+        computations.append((metric, computation))
+
+    # Number of metrics sharing each data source
+    users = Counter(
+        source
+        for _, computation in computations
+        if computation is not None
+        for source in computation.sources
+    )
+
+    results = []
+    metric_values = []
+    for metric, computation in computations:
+        if computation is None or computation.value is None:
+            results.append((metric, None, None))
+            continue
+
+        cost = computation.cost
+        for source in computation.sources:
+            load = calculator.snapshot.costs[source]
+            cost += Cost(load.ms / users[source], load.queries)
+
+        metric_values.append(
+            calculator.build_metric_value(metric, computation.value, now)
+        )
+        metric.last_calculated_at = now
+        metric.last_calculation_ms = round(cost.ms, 3)
+        metric.last_query_count = cost.queries
+        results.append((metric, computation.value, cost))
+
+    with transaction.atomic():
+        # bulk_create doesn't send post_save, so point the metrics at their
+        # new values, invalidate the cached dashboards and stream the values
+        # here
+        MetricValue.objects.bulk_create(metric_values)
+        calculated = []
+        for metric_value in metric_values:
+            metric_value.metric.latest_value = metric_value
+            calculated.append(metric_value.metric)
+        Metric.objects.bulk_update(
+            calculated,
+            [
+                "last_calculated_at",
+                "last_calculation_ms",
+                "last_query_count",
+                "latest_value",
+            ],
+        )
+        if calculated:
+            bump_dashboard_version()
+            broadcast_metric_values(metric_values)
+
+    return results
+
+
+def run_due_metrics(now=None):
+    """Calculate and store every metric that is due."""
+    now = now or timezone.now()
+    return run_metrics(list(get_due_metrics(now)), now=now)
@@ -0,0 +1,77 @@
+"""
+Live metric streaming.
+
+Dashboards subscribe to metric keys (calculation methods) over a WebSocket
+(see dashboard/consumers.py) instead of polling. Every subscriber with the
+same dashboard role joins the same channel layer group per key, so a newly
+written MetricValue is sent once per role that can see its metric, however
+many dashboards are open.
+"""
+
+import logging
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def get_group_name(role, key):
+    """Return the channel layer group streaming a metric key to a role."""
+    return f"dashboard_metrics.{role}.{key}"
+
+
+def serialize_metric_value(metric, metric_value):
+    """Return the message data for a metric value."""
+    value = metric.get_value(metric_value)
+    if isinstance(value, Decimal):
+        value = float(value)
+    return {
+        "metric": metric.id,
+        "key": metric.calculation_method,
+        "name": metric.name,
+        "value": value,
+        "timestamp": metric_value.timestamp.isoformat(),
+    }
+
+
+def broadcast_metric_values(metric_values):
+    """
+    Send new raw MetricValues to the dashboards subscribed to their metrics.
+
+    Sent once the current transaction commits, so dashboards never see a
+    value that gets rolled back. Errors are logged, not raised.
+    """
+    try:
+        messages = [
+            (
+                get_group_name(role, metric_value.metric.calculation_method),
+                {
+                    "type": "metric.value",
+                    "data": serialize_metric_value(metric_value.metric, metric_value),
+                },
+            )
+            for metric_value in metric_values
+            for role in metric_value.metric.get_roles()
+        ]
+    except Exception as e:
+        # Streaming is best effort; never fail the write because of it
+        logger.error(f"Error preparing metric values for streaming: {str(e)}")
+        return
+
+    if messages:
+        transaction.on_commit(lambda: _send(messages))
+
+
+def _send(messages):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    for group, message in messages:
+        try:
+            async_to_sync(channel_layer.group_send)(group, message)
+        except Exception as e:
+            logger.error(f"Error streaming metric value to {group}: {str(e)}")
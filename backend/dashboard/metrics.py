@@ -0,0 +1,448 @@
+"""
+Dashboard metric calculation.
+
+Metrics read their numbers from a MetricDataSnapshot, which computes each
+piece of base data (booking totals, user counts, ...) with one aggregate
+query the first time any metric asks for it. Calculating every metric that
+needs the same base data therefore costs a single pass over that table.
+
+The computations themselves are registered in the metric registry (see
+dashboard/metric_registry.py) under the key metrics use as their
+``calculation_method``, with the data sources they depend on.
+"""
+
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from decimal import Decimal
+from functools import cached_property
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from bookings.archive import BookingHistory
+from bookings.models import DailySales
+from coupons.models import Coupon
+from employees.models import Department, EmployeeProfile, PerformanceReview
+from movies.models import Movie, Show
+from users.models import CustomUser
+
+from .forecasting import forecast_shows
+from .metric_registry import Cost, measure_cost, registry
+from .models import Metric, MetricValue
+from .occupancy import get_occupancy_rows, summarize
+
+
+class MetricDataSnapshot:
+    """
+    Base data shared by metric calculations, computed once per snapshot.
+
+    Each attribute below is one aggregate pass. A snapshot is meant to be
+    short-lived: create one per calculation run.
+    """
+
+    SOURCES = (
+        "booking_totals",
+        "coupon_usage",
+        "popular_movies",
+        "theater_utilization",
+        "user_counts",
+        "repeat_customers",
+        "active_movies",
+        "upcoming_shows",
+        "employee_totals",
+        "department_distribution",
+        "performance_ratings",
+        "show_forecasts",
+    )
+
+    def __init__(self, now=None):
+        self.now = now or timezone.now()
+        # Source -> Cost of loading it, and source -> error it failed with
+        self.costs = {}
+        self.errors = {}
+
+    def load(self, source):
+        """
+        Compute a data source (if not done yet) and return it.
+
+        The cost of the first load is recorded in ``costs``. A source that
+        failed to load raises the same error again without being retried.
+        """
+        if source in self.errors:
+            raise self.errors[source]
+        if source not in self.costs:
+            try:
+                with measure_cost() as cost:
+                    getattr(self, source)
+            except Exception as e:
+                self.errors[source] = e
+                raise
+            self.costs[source] = cost
+        return getattr(self, source)
+
+    @cached_property
+    def booking_totals(self):
+        today = timezone.localdate(self.now)
+        return DailySales.objects.aggregate(
+            total_sales=Sum("revenue"),
+            monthly_sales=Sum("revenue", filter=Q(date__gte=today.replace(day=1))),
+            daily_sales=Sum("revenue", filter=Q(date=today)),
+            tickets_sold=Sum("tickets"),
+        )
+
+    @cached_property
+    def coupon_usage(self):
+        return list(
+            Coupon.objects.annotate(usage_count=Count("usages")).values_list(
+                "code", "usage_count"
+            )
+        )
+
+    @cached_property
+    def popular_movies(self):
+        return list(
+            DailySales.objects.values("movie__title")
+            .annotate(ticket_count=Sum("tickets"))
+            .order_by("-ticket_count")
+            .values_list("movie__title", "ticket_count")[:5]
+        )
+
+    @cached_property
+    def theater_utilization(self):
+        # Shows that have started, so future shows don't drag it down
+        rows = get_occupancy_rows(end=self.now)
+        return [
+            (theater["label"], theater["utilization"])
+            for theater in summarize(rows, "theater")
+            if theater["seats"]
+        ]
+
+    @cached_property
+    def show_forecasts(self):
+        return forecast_shows(horizon_days=7, now=self.now)
+
+    @cached_property
+    def user_counts(self):
+        customer = Q(role="CUSTOMER")
+        return CustomUser.objects.aggregate(
+            total_customers=Count("id", filter=customer),
+            new_customers=Count(
+                "id",
+                filter=customer & Q(date_joined__gte=self.now - timedelta(days=30)),
+            ),
+            active_users=Count("id", filter=Q(is_active=True)),
+            admin_users=Count("id", filter=Q(role="ADMIN")),
+        )
+
+    @cached_property
+    def repeat_customers(self):
+        # Counted in Python, as bookings of a customer may be in both tiers
+        customers = BookingHistory(user__role="CUSTOMER").aggregate_by(
+            "user", booking_count=Count("id")
+        )
+        return sum(1 for customer in customers if customer["booking_count"] > 1)
+
+    @cached_property
+    def active_movies(self):
+        return Movie.objects.filter(is_active=True).count()
+
+    @cached_property
+    def upcoming_shows(self):
+        return Show.objects.filter(start_time__gte=self.now).count()
+
+    @cached_property
+    def employee_totals(self):
+        return EmployeeProfile.objects.aggregate(
+            total_employees=Count("id"), average_salary=Avg("current_salary")
+        )
+
+    @cached_property
+    def department_distribution(self):
+        return list(
+            Department.objects.annotate(
+                employee_count=Count("positions__employees")
+            ).values_list("name", "employee_count")
+        )
+
+    @cached_property
+    def performance_ratings(self):
+        return PerformanceReview.objects.aggregate(avg=Avg("overall_rating"))["avg"]
+
+
+def _chart(pairs):
+    pairs = list(pairs)
+    return {
+        "labels": [label for label, _ in pairs],
+        "data": [value for _, value in pairs],
+    }
+
+
+# Outcome of computing a metric: its value, the cost of the computation
+# itself and the data sources it used
+Computation = namedtuple("Computation", ["value", "cost", "sources"])
+
+
+class MetricCalculator:
+    """
+    Helper class to calculate metric values based on their calculation method.
+    This allows for complex metrics to be calculated dynamically.
+    """
+
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot or MetricDataSnapshot()
+
+    def get_definition(self, metric):
+        """Return the registered computation of a metric, or None."""
+        return registry.get(metric.calculation_method)
+
+    def compute(self, metric):
+        """
+        Compute a metric's current value without storing it.
+
+        Returns a Computation. Its cost doesn't include loading the data
+        sources, which are shared between metrics; their costs are in
+        ``snapshot.costs``. A result cached per the metric's TTL is returned
+        with no sources and a zero cost.
+        """
+        definition = self.get_definition(metric)
+        if definition is None:
+            return Computation(None, Cost(), ())
+
+        cache_key = f"metric_result:{definition.key}"
+        if definition.ttl:
+            value = cache.get(cache_key)
+            if value is not None:
+                return Computation(value, Cost(), ())
+
+        for source in definition.depends_on:
+            self.snapshot.load(source)
+        with measure_cost() as cost:
+            value = definition.compute(self.snapshot)
+
+        if definition.ttl and value is not None:
+            cache.set(cache_key, value, definition.ttl)
+        return Computation(value, cost, definition.depends_on)
+
+    def compute_value(self, metric):
+        """Compute a metric's current value without storing it."""
+        return self.compute(metric).value
+
+    def get_total_cost(self, computation):
+        """Return a computation's cost including the data sources it used."""
+        total = computation.cost
+        for source in computation.sources:
+            total += self.snapshot.costs[source]
+        return total
+
+    def build_metric_value(self, metric, value, timestamp=None):
+        """Wrap a computed value in an unsaved MetricValue."""
+        value_fields = {}
+        if isinstance(value, (dict, list)):
+            value_fields["json_value"] = value
+        elif isinstance(value, str):
+            value_fields["string_value"] = value
+        else:
+            value_fields["numeric_value"] = round(Decimal(str(value)), 2)
+        return MetricValue(
+            metric=metric, timestamp=timestamp or self.snapshot.now, **value_fields
+        )
+
+    def calculate_metric(self, metric):
+        """Calculate a metric value based on its calculation method and store it."""
+        if not metric.is_active:
+            return None
+
+        computation = self.compute(metric)
+        if computation.value is not None:
+            now = timezone.now()
+            self.build_metric_value(metric, computation.value, timestamp=now).save()
+
+            cost = self.get_total_cost(computation)
+            metric.last_calculated_at = now
+            metric.last_calculation_ms = round(cost.ms, 3)
+            metric.last_query_count = cost.queries
+            metric.save(
+                update_fields=[
+                    "last_calculated_at",
+                    "last_calculation_ms",
+                    "last_query_count",
+                ]
+            )
+        return computation.value
+
+
+# Sales metrics
+
+
+@registry.register(
+    "total_sales", depends_on=["booking_totals"], category=Metric.Category.SALES
+)
+def total_sales(data):
+    return data.booking_totals["total_sales"] or 0
+
+
+@registry.register(
+    "monthly_sales", depends_on=["booking_totals"], category=Metric.Category.SALES
+)
+def monthly_sales(data):
+    return data.booking_totals["monthly_sales"] or 0
+
+
+@registry.register(
+    "daily_sales", depends_on=["booking_totals"], category=Metric.Category.SALES
+)
+def daily_sales(data):
+    return data.booking_totals["daily_sales"] or 0
+
+
+@registry.register(
+    "tickets_sold", depends_on=["booking_totals"], category=Metric.Category.SALES
+)
+def tickets_sold(data):
+    return data.booking_totals["tickets_sold"] or 0
+
+
+@registry.register(
+    "coupon_usage", depends_on=["coupon_usage"], category=Metric.Category.SALES
+)
+def coupon_usage(data):
+    return _chart(data.coupon_usage)
+
+
+# Performance metrics
+
+
+@registry.register(
+    "popular_movies",
+    depends_on=["popular_movies"],
+    category=Metric.Category.PERFORMANCE,
+)
+def popular_movies(data):
+    return _chart(data.popular_movies)
+
+
+@registry.register(
+    "theater_utilization",
+    depends_on=["theater_utilization"],
+    category=Metric.Category.PERFORMANCE,
+)
+def theater_utilization(data):
+    return _chart(data.theater_utilization)
+
+
+@registry.register(
+    "forecast_ticket_sales",
+    depends_on=["show_forecasts"],
+    category=Metric.Category.PERFORMANCE,
+)
+def forecast_ticket_sales(data):
+    # Forecast tickets per day, for the shows of the coming week
+    by_date = defaultdict(int)
+    for forecast in data.show_forecasts:
+        date = timezone.localdate(forecast["start_time"])
+        by_date[date.isoformat()] += forecast["forecast"]
+    return _chart(sorted(by_date.items()))
+
+
+# Customer metrics
+
+
+@registry.register(
+    "total_customers", depends_on=["user_counts"], category=Metric.Category.CUSTOMER
+)
+def total_customers(data):
+    return data.user_counts["total_customers"]
+
+
+@registry.register(
+    "new_customers", depends_on=["user_counts"], category=Metric.Category.CUSTOMER
+)
+def new_customers(data):
+    return data.user_counts["new_customers"]
+
+
+@registry.register(
+    "customer_retention",
+    depends_on=["user_counts", "repeat_customers"],
+    category=Metric.Category.CUSTOMER,
+)
+def customer_retention(data):
+    total_customers = data.user_counts["total_customers"]
+    if total_customers == 0:
+        return 0
+    return (data.repeat_customers / total_customers) * 100
+
+
+# Inventory metrics
+
+
+@registry.register(
+    "active_movies", depends_on=["active_movies"], category=Metric.Category.INVENTORY
+)
+def active_movies(data):
+    return data.active_movies
+
+
+@registry.register(
+    "upcoming_shows",
+    depends_on=["upcoming_shows"],
+    category=Metric.Category.INVENTORY,
+)
+def upcoming_shows(data):
+    return data.upcoming_shows
+
+
+# Employee metrics
+
+
+@registry.register(
+    "total_employees",
+    depends_on=["employee_totals"],
+    category=Metric.Category.EMPLOYEE,
+)
+def total_employees(data):
+    return data.employee_totals["total_employees"]
+
+
+@registry.register(
+    "department_distribution",
+    depends_on=["department_distribution"],
+    category=Metric.Category.EMPLOYEE,
+    ttl=60 * 60,
+)
+def department_distribution(data):
+    return _chart(data.department_distribution)
+
+
+@registry.register(
+    "average_salary", depends_on=["employee_totals"], category=Metric.Category.EMPLOYEE
+)
+def average_salary(data):
+    return data.employee_totals["average_salary"] or 0
+
+
+@registry.register(
+    "performance_ratings",
+    depends_on=["performance_ratings"],
+    category=Metric.Category.EMPLOYEE,
+)
+def performance_ratings(data):
+    return data.performance_ratings or 0
+
+
+# System metrics
+
+
+@registry.register(
+    "active_users", depends_on=["user_counts"], category=Metric.Category.SYSTEM
+)
+def active_users(data):
+    return data.user_counts["active_users"]
+
+
+@registry.register(
+    "admin_users", depends_on=["user_counts"], category=Metric.Category.SYSTEM
+)
+def admin_users(data):
+    return data.user_counts["admin_users"]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="metric",
+            name="last_calculated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="metric",
+            name="last_calculation_ms",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
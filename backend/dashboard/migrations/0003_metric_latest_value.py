@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def set_latest_values(apps, schema_editor):
+    Metric = apps.get_model("dashboard", "Metric")
+    MetricValue = apps.get_model("dashboard", "MetricValue")
+    Metric.objects.update(
+        latest_value=Subquery(
+            MetricValue.objects.filter(metric=OuterRef("pk"))
+            .order_by("-timestamp", "-id")
+            .values("pk")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0002_metric_calculation_timing"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="metric",
+            name="latest_value",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="dashboard.metricvalue",
+            ),
+        ),
+        migrations.RunPython(set_latest_values, migrations.RunPython.noop),
+    ]
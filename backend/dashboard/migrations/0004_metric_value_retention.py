@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0003_metric_latest_value"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="metric",
+            name="daily_retention_days",
+            field=models.PositiveIntegerField(blank=True, default=730, null=True),
+        ),
+        migrations.AddField(
+            model_name="metric",
+            name="hourly_retention_days",
+            field=models.PositiveIntegerField(blank=True, default=90, null=True),
+        ),
+        migrations.AddField(
+            model_name="metric",
+            name="raw_retention_days",
+            field=models.PositiveIntegerField(blank=True, default=7, null=True),
+        ),
+        migrations.AddField(
+            model_name="metricvalue",
+            name="resolution",
+            field=models.CharField(
+                choices=[
+                    ("RAW", "Raw"),
+                    ("HOURLY", "Hourly"),
+                    ("DAILY", "Daily"),
+                    ("MONTHLY", "Monthly"),
+                ],
+                default="RAW",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="metricvalue",
+            name="sample_count",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AlterField(
+            model_name="metric",
+            name="latest_value",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="dashboard.metricvalue",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="metricvalue",
+            index=models.Index(
+                fields=["metric", "resolution", "timestamp"],
+                name="dashboard_m_metric__22fe59_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:11
+
+from django.db import migrations, models
+
+# Name fragments metrics used to be matched by, per category. Each fragment
+# is also the key of the metric's computation in the registry.
+NAME_FRAGMENTS = {
+    "SALES": [
+        "total_sales",
+        "monthly_sales",
+        "daily_sales",
+        "tickets_sold",
+        "coupon_usage",
+    ],
+    "PERFORMANCE": ["popular_movies", "theater_utilization"],
+    "CUSTOMER": ["total_customers", "new_customers", "customer_retention"],
+    "INVENTORY": ["active_movies", "upcoming_shows"],
+    "EMPLOYEE": [
+        "total_employees",
+        "department_distribution",
+        "average_salary",
+        "performance_ratings",
+    ],
+    "SYSTEM": ["active_users", "admin_users"],
+}
+
+
+def set_calculation_methods(apps, schema_editor):
+    """Point metrics matched by name at the matching registered computation."""
+    Metric = apps.get_model("dashboard", "Metric")
+    registered = {key for keys in NAME_FRAGMENTS.values() for key in keys}
+    for metric in Metric.objects.exclude(calculation_method__in=registered):
+        name = metric.name.lower()
+        for key in NAME_FRAGMENTS.get(metric.category, []):
+            if key in name:
+                metric.calculation_method = key
+                metric.save(update_fields=["calculation_method"])
+                break
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0004_metric_value_retention"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="metric",
+            name="last_query_count",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(set_calculation_methods, migrations.RunPython.noop),
+    ]
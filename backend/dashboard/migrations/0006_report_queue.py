@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0005_metric_registry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="generatedreport",
+            name="completed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="generatedreport",
+            name="progress",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="generatedreport",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="generatedreport",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("QUEUED", "Queued"),
+                    ("PROCESSING", "Processing"),
+                    ("COMPLETED", "Completed"),
+                    ("FAILED", "Failed"),
+                ],
+                default="PROCESSING",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="generatedreport",
+            name="template",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="generated_reports",
+                to="dashboard.reporttemplate",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0007_report_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VersionStamp",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=200, unique=True)),
+                ("stamp", models.CharField(max_length=32)),
+            ],
+        ),
+    ]
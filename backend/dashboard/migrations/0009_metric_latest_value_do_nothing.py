@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0008_version_stamp"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="metric",
+            name="latest_value",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to="dashboard.metricvalue",
+            ),
+        ),
+    ]
@@ -3,6 +3,31 @@ from django.utils import timezone
 
 from users.models import CustomUser
 
+from .dashboard_cache import bump_dashboard_version
+
+
+def latest_value_subquery():
+    """Subquery selecting the newest raw value of the outer metric."""
+    return models.Subquery(
+        MetricValue.objects.filter(
+            metric=models.OuterRef("pk"), resolution=MetricValue.Resolution.RAW
+        )
+        .order_by("-timestamp", "-id")
+        .values("pk")[:1]
+    )
+
+
+def refresh_latest_values(metric_ids):
+    """
+    Point the metrics at their newest raw value, or clear the pointer when
+    they have none, in one query. Deleting values leaves the pointer as it
+    is, so call this after deleting raw values.
+    """
+    Metric.objects.filter(pk__in=metric_ids).update(
+        latest_value=latest_value_subquery()
+    )
+    bump_dashboard_version()
+
 
 class Metric(models.Model):
     """
@@ -38,13 +63,20 @@ class Metric(models.Model):
     description = models.TextField(blank=True)
     category = models.CharField(max_length=20, choices=Category.choices)
     display_type = models.CharField(max_length=20, choices=DisplayType.choices)
+    # Key of the metric's computation in the metric registry
     calculation_method = models.CharField(max_length=100)
     is_active = models.BooleanField(default=True)
     refresh_frequency = models.CharField(
         max_length=20, choices=RefreshFrequency.choices
     )
 
-    # Role visibility
+    # Role visibility. ROLE_VISIBILITY maps each dashboard role to its field.
+    ROLE_VISIBILITY = {
+        "admin": "for_admins",
+        "moderator": "for_moderators",
+        "salesman": "for_salesmen",
+        "customer": "for_customers",
+    }
     for_admins = models.BooleanField(default=True)
     for_moderators = models.BooleanField(default=True)
     for_salesmen = models.BooleanField(default=False)
@@ -53,12 +85,71 @@ class Metric(models.Model):
     # Display settings
     display_order = models.IntegerField(default=0)
 
+    # Set by the metric scheduler (see dashboard/metric_scheduler.py). The
+    # query count is what calculating the metric on its own takes
+    last_calculated_at = models.DateTimeField(null=True, blank=True)
+    last_calculation_ms = models.FloatField(null=True, blank=True)
+    last_query_count = models.PositiveIntegerField(null=True, blank=True)
+
+    # Most recent raw value, kept up to date when values are written so
+    # dashboards don't have to look it up per metric. Deleting values doesn't
+    # touch it, so values can be deleted in bulk without loading them; see
+    # refresh_latest_values()
+    latest_value = models.ForeignKey(
+        "MetricValue",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    # Retention (see dashboard/retention.py). Values are rolled up to hourly,
+    # daily and monthly resolution; each resolution is pruned after the given
+    # number of days, or kept forever when empty. Monthly values are kept.
+    raw_retention_days = models.PositiveIntegerField(null=True, blank=True, default=7)
+    hourly_retention_days = models.PositiveIntegerField(
+        null=True, blank=True, default=90
+    )
+    daily_retention_days = models.PositiveIntegerField(
+        null=True, blank=True, default=730
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def get_dashboard_role(user):
+        """Return the dashboard role (a key of ROLE_VISIBILITY) of a user."""
+        if user.is_staff:
+            return "admin"
+        elif user.is_moderator:
+            return "moderator"
+        elif user.is_salesman:
+            return "salesman"
+        return "customer"
+
+    def get_roles(self):
+        """Return the dashboard roles the metric is visible to."""
+        return [
+            role for role, field in self.ROLE_VISIBILITY.items() if getattr(self, field)
+        ]
+
+    def get_value(self, metric_value):
+        """Return the field of a MetricValue that matches the display type."""
+        if self.display_type in [
+            self.DisplayType.NUMBER,
+            self.DisplayType.CURRENCY,
+            self.DisplayType.PERCENTAGE,
+        ]:
+            return metric_value.numeric_value
+        if self.display_type == self.DisplayType.TEXT:
+            return metric_value.string_value
+        return metric_value.json_value
+
     class Meta:
         ordering = ["display_order", "name"]
 
@@ -69,9 +160,23 @@ class MetricValue(models.Model):
     Each metric can have different value types based on its display_type.
     """
 
+    class Resolution(models.TextChoices):
+        RAW = "RAW", "Raw"
+        HOURLY = "HOURLY", "Hourly"
+        DAILY = "DAILY", "Daily"
+        MONTHLY = "MONTHLY", "Monthly"
+
     metric = models.ForeignKey(Metric, on_delete=models.CASCADE, related_name="values")
     timestamp = models.DateTimeField(default=timezone.now)
 
+    # Rolled-up values start at their bucket's timestamp and hold the mean
+    # of the numeric values (or the last other value) of sample_count raw
+    # values
+    resolution = models.CharField(
+        max_length=10, choices=Resolution.choices, default=Resolution.RAW
+    )
+    sample_count = models.PositiveIntegerField(default=1)
+
     # Different value types
     numeric_value = models.DecimalField(
         max_digits=15, decimal_places=2, null=True, blank=True
@@ -82,11 +187,29 @@ class MetricValue(models.Model):
     class Meta:
         ordering = ["-timestamp"]
         get_latest_by = "timestamp"
+        indexes = [
+            models.Index(fields=["metric", "resolution", "timestamp"]),
+        ]
 
     def __str__(self):
         return f"{self.metric.name} - {self.timestamp}"
 
 
+class VersionStamp(models.Model):
+    """
+    Current version stamp of a named data set (see xcounter.cache_utils).
+
+    Stamps are read from the shared "version_stamps" cache; this table is
+    the fallback when the cache is unreachable or a stamp isn't cached.
+    """
+
+    name = models.CharField(max_length=200, unique=True)
+    stamp = models.CharField(max_length=32)
+
+    def __str__(self):
+        return f"{self.name}: {self.stamp}"
+
+
 class DashboardLayout(models.Model):
     """
     Stores user-specific dashboard layouts and preferences.
@@ -149,21 +272,37 @@ class GeneratedReport(models.Model):
     """
 
     class Status(models.TextChoices):
+        QUEUED = "QUEUED", "Queued"
         PROCESSING = "PROCESSING", "Processing"
         COMPLETED = "COMPLETED", "Completed"
         FAILED = "FAILED", "Failed"
 
+    # Reports requested through the report API have no template
     template = models.ForeignKey(
-        ReportTemplate, on_delete=models.CASCADE, related_name="generated_reports"
+        ReportTemplate,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="generated_reports",
     )
     name = models.CharField(max_length=200)
     parameters = models.JSONField(null=True, blank=True)
 
+    # Hash of everything the report is rendered from; reports with the same
+    # hash share a file (see dashboard/report_cache.py)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+
     status = models.CharField(
         max_length=20, choices=Status.choices, default="PROCESSING"
     )
     error_message = models.TextField(blank=True)
 
+    # Rendering progress in percent, and when a worker started and finished
+    # rendering (see dashboard/report_queue.py)
+    progress = models.PositiveSmallIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
     file = models.FileField(upload_to="reports/", null=True, blank=True)
     generated_by = models.ForeignKey(
         CustomUser,
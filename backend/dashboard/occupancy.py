@@ -0,0 +1,112 @@
+"""
+Theater occupancy analytics.
+
+Occupancy is read from the shows themselves: each show offers
+``total_seats`` and has sold ``total_seats - available_seats``. One grouped
+aggregate over the shows in a time range returns the offered and sold seats
+per theater, show type, weekday and hour of the start time; every coarser
+breakdown (per theater, per show type, ...) is summed up from those rows in
+Python, so the number of queries doesn't grow with the number of theaters.
+"""
+
+import calendar
+from collections import defaultdict
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
+
+from movies.models import Show
+
+# Dimensions occupancy can be broken down by, with a function turning a
+# row's value for the dimension into a chart label
+DIMENSIONS = {
+    "theater": lambda row: row["theater_name"],
+    "show_type": lambda row: row["show_type"],
+    "weekday": lambda row: calendar.day_abbr[row["weekday"] - 1],
+    "hour": lambda row: f"{row['hour']:02d}:00",
+}
+
+# Row fields holding the value of each dimension
+DIMENSION_FIELDS = {
+    "theater": ("theater", "theater_name"),
+    "show_type": ("show_type",),
+    "weekday": ("weekday",),
+    "hour": ("hour",),
+}
+
+
+def get_occupancy_rows(start=None, end=None, theater_ids=None):
+    """
+    Return offered and sold seats per theater, show type, weekday and hour.
+
+    Shows starting in ``[start, end)`` are counted, including past shows
+    that have been archived and deactivated. Weekdays are ISO (1 is Monday)
+    and, like hours, in the current time zone.
+    """
+    shows = Show.objects.all()
+    if start is not None:
+        shows = shows.filter(start_time__gte=start)
+    if end is not None:
+        shows = shows.filter(start_time__lt=end)
+    if theater_ids is not None:
+        shows = shows.filter(theater__in=theater_ids)
+
+    return list(
+        shows.annotate(
+            weekday=ExtractIsoWeekDay("start_time"),
+            hour=ExtractHour("start_time"),
+            theater_name=F("theater__name"),
+        )
+        .values("theater", "theater_name", "show_type", "weekday", "hour")
+        .annotate(
+            shows=Count("id"),
+            seats=Sum("total_seats"),
+            sold=Sum(F("total_seats") - F("available_seats")),
+        )
+        .order_by()
+    )
+
+
+def get_utilization(seats, sold):
+    """Return the percentage of ``seats`` that were sold."""
+    if not seats:
+        return 0
+    return round(sold / seats * 100, 2)
+
+
+def summarize(rows, *dimensions):
+    """
+    Sum occupancy rows up by the given dimensions.
+
+    Returns a list of dicts with the dimension fields, ``label``, ``shows``,
+    ``seats``, ``sold`` and ``utilization``, ordered by dimension values.
+    """
+    groups = defaultdict(lambda: {"shows": 0, "seats": 0, "sold": 0})
+    labels = {}
+    for row in rows:
+        key = tuple(
+            row[field]
+            for dimension in dimensions
+            for field in DIMENSION_FIELDS[dimension]
+        )
+        group = groups[key]
+        group["shows"] += row["shows"]
+        group["seats"] += row["seats"] or 0
+        group["sold"] += row["sold"] or 0
+        labels[key] = " / ".join(DIMENSIONS[dimension](row) for dimension in dimensions)
+
+    fields = [
+        field for dimension in dimensions for field in DIMENSION_FIELDS[dimension]
+    ]
+    summary = []
+    for key in sorted(groups):
+        group = groups[key]
+        summary.append(
+            {
+                **dict(zip(fields, key)),
+                "label": labels[key],
+                **group,
+                "utilization": get_utilization(group["seats"], group["sold"]),
+            }
+        )
+    return summary
@@ -0,0 +1,122 @@
+"""
+Content-addressed report cache.
+
+Every report gets a content hash of what its PDF is rendered from: its
+report type, template data and parameters, and the version of the data it
+reads. Each model a report type reads has a version stamp (see
+xcounter.cache_utils) that is replaced whenever a row of it is written, so
+the hash only changes when rendering again could give a different PDF.
+Sales reports read the DailySales fact table, which is written with bulk
+queries that send no signals; bookings.sales bumps its own stamp instead.
+Reports show the date they were generated and default to periods ending
+today, so the date is part of the hash too.
+
+A report whose hash matches a completed report shares that report's file
+and is completed at once instead of being rendered again.
+"""
+
+import hashlib
+import json
+
+from django.utils import timezone
+
+from bookings.sales import DAILY_SALES_STAMP
+from xcounter.cache_utils import bump_version_stamp, get_version_stamps
+
+from .models import GeneratedReport
+
+# Models each report type reads
+REPORT_DATA_MODELS = {
+    "SALES": (),
+    "EMPLOYEE": (
+        "employees.EmployeeProfile",
+        "employees.Position",
+        "employees.Department",
+        "users.CustomUser",
+        "users.UserProfile",
+    ),
+    "MOVIES": ("movies.Movie", "movies.Show"),
+    "FINANCE": ("bookings.Booking", "bookings.Ticket", "employees.SalaryHistory"),
+    "PERFORMANCE": (
+        "employees.PerformanceReview",
+        "employees.EmployeeProfile",
+        "employees.Position",
+        "employees.Department",
+        "users.CustomUser",
+        "users.UserProfile",
+    ),
+    "CUSTOM": (),
+}
+
+# Other version stamps each report type depends on
+REPORT_DATA_STAMPS = {"SALES": (DAILY_SALES_STAMP,)}
+
+# Every model some report reads
+REPORTED_MODELS = sorted(
+    {label for labels in REPORT_DATA_MODELS.values() for label in labels}
+)
+
+# Report types of reports requested through the report API, which have no
+# template; other types are rendered as custom reports
+API_REPORT_TYPES = {"sales": "SALES", "employees": "EMPLOYEE", "movies": "MOVIES"}
+
+# Parameters of API reports that don't change what they show
+IGNORED_PARAMETERS = ("user", "generated_at")
+
+
+def report_data_stamp_name(model_label):
+    return f"report_data:{model_label}"
+
+
+def bump_report_data_version(*model_labels):
+    """Invalidate cached reports reading these models once the transaction commits."""
+    bump_version_stamp(*(report_data_stamp_name(label) for label in model_labels))
+
+
+def get_report_type(report):
+    if report.template is not None:
+        return report.template.report_type
+    report_type = (report.parameters or {}).get("type", "sales").lower()
+    return API_REPORT_TYPES.get(report_type, "CUSTOM")
+
+
+def get_content_hash(report):
+    """Return the hash of everything a report's PDF is rendered from."""
+    report_type = get_report_type(report)
+    models = REPORT_DATA_MODELS.get(report_type, ())
+    stamps = REPORT_DATA_STAMPS.get(report_type, ())
+    content = {
+        "report_type": report_type,
+        "template_data": report.template.template_data if report.template else None,
+        "parameters": {
+            name: value
+            for name, value in (report.parameters or {}).items()
+            if name not in IGNORED_PARAMETERS
+        },
+        "data": dict(
+            zip(
+                [*models, *stamps],
+                get_version_stamps(*map(report_data_stamp_name, models), *stamps),
+            )
+        ),
+        "date": timezone.localdate().isoformat(),
+    }
+    raw = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def find_cached_report(content_hash):
+    """Return the latest completed report with this hash, if its file exists."""
+    report = (
+        GeneratedReport.objects.filter(
+            content_hash=content_hash,
+            status=GeneratedReport.Status.COMPLETED,
+            file__isnull=False,
+        )
+        .exclude(file="")
+        .order_by("-completed_at")
+        .first()
+    )
+    if report is not None and report.file.storage.exists(report.file.name):
+        return report
+    return None
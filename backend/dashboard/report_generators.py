@@ -2,12 +2,13 @@ import logging
 import os
 from datetime import datetime, timedelta
 
-from bookings.models import Booking, Ticket
+from bookings.archive import BookingHistory
+from bookings.models import DailySales
 from django.conf import settings
-from django.db.models import Avg, Sum
+from django.db.models import Avg, Count, Sum
 from django.utils import timezone
 from employees.models import EmployeeProfile, PerformanceReview, SalaryHistory
-from movies.models import Movie, Show
+from movies.models import Movie
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet
@@ -20,15 +21,18 @@ from reportlab.platypus import (
     TableStyle,
 )
 
+from .time_buckets import aggregate_by_bucket
+
 logger = logging.getLogger(__name__)
 
 
-def generate_report_pdf(report):
+def generate_report_pdf(report, progress=None):
     """
     Generate a PDF report based on the report template and parameters.
 
     Args:
         report: GeneratedReport instance to generate
+        progress: Optional callable receiving the percentage done
 
     Returns:
         True if successful, False otherwise
@@ -45,27 +49,33 @@ def generate_report_pdf(report):
         filename = f"report_{report.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
         filepath = os.path.join(upload_dir, filename)
 
-        # Generate PDF based on report type
-        if template.report_type == "SALES":
-            _generate_sales_report(filepath, parameters)
+        # Generate PDF based on report type. Reports requested through the
+        # report API have no template; their parameters are the report data.
+        if template is None:
+            if not generate_pdf_report(parameters, filepath, progress):
+                raise ValueError("The report could not be generated")
+        elif template.report_type == "SALES":
+            _generate_sales_report(filepath, parameters, progress)
         elif template.report_type == "EMPLOYEE":
-            _generate_employee_report(filepath, parameters)
+            _generate_employee_report(filepath, parameters, progress)
         elif template.report_type == "MOVIES":
-            _generate_movies_report(filepath, parameters)
+            _generate_movies_report(filepath, parameters, progress)
         elif template.report_type == "FINANCE":
-            _generate_finance_report(filepath, parameters)
+            _generate_finance_report(filepath, parameters, progress)
         elif template.report_type == "PERFORMANCE":
-            _generate_performance_report(filepath, parameters)
+            _generate_performance_report(filepath, parameters, progress)
         elif template.report_type == "CUSTOM":
             # Use the template data to generate a custom report
             template_data = template.template_data or {}
-            _generate_custom_report(filepath, template_data, parameters)
+            _generate_custom_report(filepath, template_data, parameters, progress)
         else:
             raise ValueError(f"Unknown report type: {template.report_type}")
 
         # Update the report with the generated file
         report.file = os.path.join("reports", filename)
         report.status = "COMPLETED"
+        report.progress = 100
+        report.completed_at = timezone.now()
         report.save()
 
         return True
@@ -74,11 +84,41 @@ def generate_report_pdf(report):
         logger.error(f"Error generating report: {str(e)}")
         report.status = "FAILED"
         report.error_message = str(e)
+        report.completed_at = timezone.now()
         report.save()
         return False
 
 
-def _generate_sales_report(filepath, parameters):
+def _build_document(doc, elements, progress=None):
+    """
+    Build a PDF document. Progress is reported from 40% (its data is loaded)
+    to 95% as its flowables are laid out.
+    """
+    if progress is not None:
+        progress(40)
+        flowables = len(elements) or 1
+
+        def on_progress(kind, value):
+            nonlocal flowables
+            if kind == "SIZE_EST":
+                flowables = value or 1
+            elif kind == "PROGRESS":
+                progress(40 + 55 * value // flowables)
+
+        doc.setProgressCallBack(on_progress)
+    doc.build(elements)
+
+
+def _display_name(full_name, email):
+    """Return a person's name for a report table, or their email without one."""
+    return full_name or email or "N/A"
+
+
+# Sales report table headings per period size
+PERIOD_HEADINGS = {"day": "Daily", "week": "Weekly", "month": "Monthly"}
+
+
+def _generate_sales_report(filepath, parameters, progress=None):
     """Generate a sales report PDF."""
     # Get date range parameters
     start_date_str = parameters.get("start_date")
@@ -131,13 +171,16 @@ def _generate_sales_report(filepath, parameters):
     elements.append(Spacer(1, 0.25 * inch))
 
     # Summary stats
-    bookings = Booking.objects.filter(
-        created_at__gte=start_date, created_at__lte=end_date
+    sales = DailySales.objects.filter(
+        date__gte=timezone.localdate(start_date), date__lte=timezone.localdate(end_date)
+    )
+    totals = sales.aggregate(
+        bookings=Sum("bookings"), tickets=Sum("tickets"), revenue=Sum("gross_amount")
     )
 
-    total_bookings = bookings.count()
-    total_tickets = Ticket.objects.filter(booking__in=bookings).count()
-    total_revenue = bookings.aggregate(total=Sum("total_amount"))["total"] or 0
+    total_bookings = totals["bookings"] or 0
+    total_tickets = totals["tickets"] or 0
+    total_revenue = totals["revenue"] or 0
     avg_booking_value = total_revenue / total_bookings if total_bookings > 0 else 0
 
     # Summary table
@@ -169,33 +212,29 @@ def _generate_sales_report(filepath, parameters):
     elements.append(summary_table)
     elements.append(Spacer(1, 0.25 * inch))
 
-    # Sales by date
-    elements.append(Paragraph("Daily Sales", heading_style))
-    elements.append(Spacer(1, 0.15 * inch))
-
-    # Group bookings by date
-    daily_sales = {}
-    for booking in bookings:
-        date_str = booking.created_at.strftime("%Y-%m-%d")
-        if date_str not in daily_sales:
-            daily_sales[date_str] = {"count": 0, "revenue": 0}
-
-        daily_sales[date_str]["count"] += 1
-        daily_sales[date_str]["revenue"] += booking.total_amount
+    # Sales by day, week or month
+    group_by = parameters.get("group_by", "day")
+    if group_by not in ("day", "week", "month"):
+        group_by = "day"
+    period_sales = aggregate_by_bucket(
+        DailySales.objects.all(),
+        "date",
+        group_by,
+        timezone.localdate(start_date),
+        timezone.localdate(end_date),
+        count=Sum("bookings"),
+        revenue=Sum("gross_amount"),
+    )
 
-    # Sort by date
-    sorted_dates = sorted(daily_sales.keys())
+    elements.append(Paragraph(f"{PERIOD_HEADINGS[group_by]} Sales", heading_style))
+    elements.append(Spacer(1, 0.15 * inch))
 
-    # Create daily sales table
-    if sorted_dates:
+    # Create the sales table
+    if total_bookings:
         daily_data = [["Date", "Bookings", "Revenue"]]
-        for date_str in sorted_dates:
+        for period in period_sales:
             daily_data.append(
-                [
-                    date_str,
-                    str(daily_sales[date_str]["count"]),
-                    f"${daily_sales[date_str]['revenue']:.2f}",
-                ]
+                [period["label"], str(period["count"]), f"${period['revenue']:.2f}"]
             )
 
         daily_table = Table(daily_data, colWidths=[2 * inch, 1.5 * inch, 1.5 * inch])
@@ -219,10 +258,10 @@ def _generate_sales_report(filepath, parameters):
         )
 
     # Build the PDF
-    doc.build(elements)
+    _build_document(doc, elements, progress)
 
 
-def _generate_employee_report(filepath, parameters):
+def _generate_employee_report(filepath, parameters, progress=None):
     """Generate an employee report PDF."""
     # Get parameters
     department_id = parameters.get("department_id")
@@ -267,8 +306,9 @@ def _generate_employee_report(filepath, parameters):
     elements.append(Spacer(1, 0.25 * inch))
 
     # Summary stats
-    total_employees = employees.count()
-    avg_salary = employees.aggregate(avg=Avg("current_salary"))["avg"] or 0
+    summary = employees.aggregate(total=Count("id"), avg_salary=Avg("current_salary"))
+    total_employees = summary["total"]
+    avg_salary = summary["avg_salary"] or 0
 
     # Summary table
     summary_data = [
@@ -301,24 +341,26 @@ def _generate_employee_report(filepath, parameters):
     elements.append(Paragraph("Employee Details", heading_style))
     elements.append(Spacer(1, 0.15 * inch))
 
-    # Create employee table
-    if employees.exists():
+    # Create employee table, reading only the columns it shows
+    if total_employees:
         employee_data = [["Name", "Position", "Department", "Hire Date", "Salary"]]
 
-        for employee in employees:
+        rows = employees.values_list(
+            "user__profile__full_name",
+            "user__email",
+            "position__title",
+            "position__department__name",
+            "hire_date",
+            "current_salary",
+        ).order_by("user__profile__full_name", "user__email")
+        for name, email, position, department, hire_date, salary in rows:
             employee_data.append(
                 [
-                    employee.full_name,
-                    employee.position.title if employee.position else "N/A",
-                    employee.position.department.name
-                    if employee.position and employee.position.department
-                    else "N/A",
-                    employee.hire_date.strftime("%Y-%m-%d")
-                    if employee.hire_date
-                    else "N/A",
-                    f"${employee.current_salary:.2f}"
-                    if employee.current_salary
-                    else "N/A",
+                    _display_name(name, email),
+                    position or "N/A",
+                    department or "N/A",
+                    hire_date.strftime("%Y-%m-%d") if hire_date else "N/A",
+                    f"${salary:.2f}" if salary else "N/A",
                 ]
             )
 
@@ -344,10 +386,10 @@ def _generate_employee_report(filepath, parameters):
         elements.append(Paragraph("No employees found.", normal_style))
 
     # Build the PDF
-    doc.build(elements)
+    _build_document(doc, elements, progress)
 
 
-def _generate_movies_report(filepath, parameters):
+def _generate_movies_report(filepath, parameters, progress=None):
     """Generate a movies and shows report PDF."""
     # Get parameters
     active_only = parameters.get("active_only", True)
@@ -385,8 +427,11 @@ def _generate_movies_report(filepath, parameters):
     elements.append(Spacer(1, 0.25 * inch))
 
     # Summary stats
-    total_movies = movies.count()
-    total_shows = Show.objects.filter(movie__in=movies).count()
+    summary = movies.aggregate(
+        total_movies=Count("id", distinct=True), total_shows=Count("shows")
+    )
+    total_movies = summary["total_movies"]
+    total_shows = summary["total_shows"]
 
     # Summary table
     summary_data = [
@@ -419,20 +464,21 @@ def _generate_movies_report(filepath, parameters):
     elements.append(Paragraph("Movie Details", heading_style))
     elements.append(Spacer(1, 0.15 * inch))
 
-    # Create movie table
-    if movies.exists():
+    # Create movie table, reading only the columns it shows
+    if total_movies:
         movie_data = [["Title", "Duration", "Release Date", "Active", "Rating"]]
 
-        for movie in movies:
+        rows = movies.values_list(
+            "title", "duration_minutes", "release_date", "is_active", "rating"
+        )
+        for title, duration, release_date, is_active, rating in rows:
             movie_data.append(
                 [
-                    movie.title,
-                    f"{movie.duration_minutes} min",
-                    movie.release_date.strftime("%Y-%m-%d")
-                    if movie.release_date
-                    else "N/A",
-                    "Yes" if movie.is_active else "No",
-                    movie.rating or "N/A",
+                    title,
+                    f"{duration} min",
+                    release_date.strftime("%Y-%m-%d") if release_date else "N/A",
+                    "Yes" if is_active else "No",
+                    rating or "N/A",
                 ]
             )
 
@@ -458,10 +504,21 @@ def _generate_movies_report(filepath, parameters):
         elements.append(Paragraph("No movies found.", normal_style))
 
     # Build the PDF
-    doc.build(elements)
+    _build_document(doc, elements, progress)
 
 
-def _generate_finance_report(filepath, parameters):
+def _get_booking_revenue(start_date, end_date):
+    """
+    Return the booking and ticket revenue of bookings made between two
+    datetimes, archived bookings included.
+    """
+    bookings = BookingHistory(created_at__gte=start_date, created_at__lte=end_date)
+    total_revenue = bookings.aggregate(total=Sum("total_amount"))["total"] or 0
+    ticket_revenue = sum(group["revenue"] for group in bookings.aggregate_tickets())
+    return total_revenue, ticket_revenue
+
+
+def _generate_finance_report(filepath, parameters, progress=None):
     """Generate a financial report PDF."""
     # Get date range parameters
     start_date_str = parameters.get("start_date")
@@ -530,17 +587,16 @@ def _generate_finance_report(filepath, parameters):
     elements.append(Spacer(1, 0.25 * inch))
 
     # Revenue data
-    bookings = Booking.objects.filter(
-        created_at__gte=start_date, created_at__lte=end_date
-    )
-
-    total_revenue = bookings.aggregate(total=Sum("total_amount"))["total"] or 0
+    total_revenue, ticket_revenue = _get_booking_revenue(start_date, end_date)
 
-    # Employee salary expenses for the period
+    # Employee salary expenses for the period: the salaries set by the salary
+    # changes effective in it
     salary_payments = SalaryHistory.objects.filter(
         effective_date__gte=start_date, effective_date__lte=end_date
     )
-    total_salary_expense = salary_payments.aggregate(total=Sum("amount"))["total"] or 0
+    total_salary_expense = (
+        salary_payments.aggregate(total=Sum("new_salary"))["total"] or 0
+    )
 
     # Other expenses could be added here
 
@@ -580,13 +636,6 @@ def _generate_finance_report(filepath, parameters):
 
     # For simplicity, we'll just show ticket sales vs concessions
     # In a real system, you might have more revenue categories
-    ticket_revenue = (
-        Ticket.objects.filter(booking__in=bookings).aggregate(total=Sum("price"))[
-            "total"
-        ]
-        or 0
-    )
-
     other_revenue = total_revenue - ticket_revenue
 
     revenue_data = [
@@ -622,10 +671,10 @@ def _generate_finance_report(filepath, parameters):
     elements.append(revenue_table)
 
     # Build the PDF
-    doc.build(elements)
+    _build_document(doc, elements, progress)
 
 
-def _generate_performance_report(filepath, parameters):
+def _generate_performance_report(filepath, parameters, progress=None):
     """Generate a performance review report PDF."""
     # Get parameters
     employee_id = parameters.get("employee_id")
@@ -659,12 +708,16 @@ def _generate_performance_report(filepath, parameters):
     reviews = PerformanceReview.objects.all()
 
     if employee_id:
-        try:
-            employee = EmployeeProfile.objects.get(id=employee_id)
-            reviews = reviews.filter(employee=employee)
-            elements.append(Paragraph(f"Employee: {employee.full_name}", normal_style))
-        except EmployeeProfile.DoesNotExist:
-            pass
+        employee = (
+            EmployeeProfile.objects.filter(id=employee_id)
+            .values_list("user__profile__full_name", "user__email")
+            .first()
+        )
+        if employee is not None:
+            reviews = reviews.filter(employee=employee_id)
+            elements.append(
+                Paragraph(f"Employee: {_display_name(*employee)}", normal_style)
+            )
 
     if department_id:
         from employees.models import Department
@@ -679,8 +732,9 @@ def _generate_performance_report(filepath, parameters):
     elements.append(Spacer(1, 0.25 * inch))
 
     # Summary stats
-    total_reviews = reviews.count()
-    avg_rating = reviews.aggregate(avg=Avg("overall_rating"))["avg"] or 0
+    summary = reviews.aggregate(total=Count("id"), avg_rating=Avg("overall_rating"))
+    total_reviews = summary["total"]
+    avg_rating = summary["avg_rating"] or 0
 
     # Summary table
     summary_data = [
@@ -713,17 +767,25 @@ def _generate_performance_report(filepath, parameters):
     elements.append(Paragraph("Review Details", heading_style))
     elements.append(Spacer(1, 0.15 * inch))
 
-    # Create review table
-    if reviews.exists():
+    # Create review table, reading only the columns it shows
+    if total_reviews:
         review_data = [["Employee", "Review Date", "Overall Rating", "Reviewer"]]
 
-        for review in reviews:
+        rows = reviews.values_list(
+            "employee__user__profile__full_name",
+            "employee__user__email",
+            "review_date",
+            "overall_rating",
+            "reviewer__profile__full_name",
+            "reviewer__email",
+        ).order_by("-review_date")
+        for name, email, review_date, rating, reviewer_name, reviewer_email in rows:
             review_data.append(
                 [
-                    review.employee.full_name,
-                    review.review_date.strftime("%Y-%m-%d"),
-                    f"{review.overall_rating:.1f}",
-                    review.reviewer.full_name if review.reviewer else "N/A",
+                    _display_name(name, email),
+                    review_date.strftime("%Y-%m-%d"),
+                    f"{rating:.1f}",
+                    _display_name(reviewer_name, reviewer_email),
                 ]
             )
 
@@ -748,10 +810,10 @@ def _generate_performance_report(filepath, parameters):
         elements.append(Paragraph("No performance reviews found.", normal_style))
 
     # Build the PDF
-    doc.build(elements)
+    _build_document(doc, elements, progress)
 
 
-def _generate_custom_report(filepath, template_data, parameters):
+def _generate_custom_report(filepath, template_data, parameters, progress=None):
     """Generate a custom report PDF based on template data."""
     # Create the PDF document
     doc = SimpleDocTemplate(
@@ -814,10 +876,10 @@ def _generate_custom_report(filepath, template_data, parameters):
             elements.append(Spacer(1, 0.25 * inch))
 
     # Build the PDF
-    doc.build(elements)
+    _build_document(doc, elements, progress)
 
 
-def generate_pdf_report(report_data, output_path):
+def generate_pdf_report(report_data, output_path, progress=None):
     """
     Generate a PDF report based on the report data.
 
@@ -834,6 +896,7 @@ def generate_pdf_report(report_data, output_path):
                 'generated_at': '2023-05-15T12:34:56',  # Optional
             }
         output_path: Path where to save the PDF file
+        progress: Optional callable receiving the percentage done
 
     Returns:
         True if successful, False otherwise
@@ -854,11 +917,11 @@ def generate_pdf_report(report_data, output_path):
 
         # Call the appropriate report generation function
         if report_type == "sales":
-            _generate_sales_report(output_path, parameters)
+            _generate_sales_report(output_path, parameters, progress)
         elif report_type == "employees":
-            _generate_employee_report(output_path, parameters)
+            _generate_employee_report(output_path, parameters, progress)
         elif report_type == "movies":
-            _generate_movies_report(output_path, parameters)
+            _generate_movies_report(output_path, parameters, progress)
         else:
             # For custom reports, build a template_data structure
             title = report_data.get("title", f"{report_type.title()} Report")
@@ -891,7 +954,7 @@ def generate_pdf_report(report_data, output_path):
                     }
                 )
 
-            _generate_custom_report(output_path, template_data, parameters)
+            _generate_custom_report(output_path, template_data, parameters, progress)
 
         return True
 
@@ -0,0 +1,204 @@
+"""
+Report generation queue.
+
+Reports are rendered outside the request that asks for them: the API saves
+a GeneratedReport with status QUEUED and returns straight away, and the
+run_report_workers command renders queued reports, each in a worker process
+of its own (REPORT_WORKERS at a time). Workers claim a report by moving it
+from QUEUED to PROCESSING with a conditional update, so several worker
+commands can share one queue without rendering a report twice.
+
+While a report renders its progress is saved on the report and pushed to
+its owner's notification WebSocket; when it is done the owner gets a
+REPORT_READY notification. Clients can also poll the report's status.
+
+A report identical to one already rendered, with data that hasn't changed
+since, isn't queued: it shares the rendered file and is completed at once
+(see dashboard/report_cache.py).
+"""
+
+import logging
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils import timezone
+
+from notifications.models import NotificationType
+from notifications.utils import send_notification
+
+from .models import GeneratedReport
+from .report_cache import find_cached_report, get_content_hash
+from .report_generators import generate_report_pdf
+
+logger = logging.getLogger(__name__)
+
+Status = GeneratedReport.Status
+
+# Progress is only saved and pushed when it moved by at least this much
+PROGRESS_STEP = 5
+
+
+def enqueue_report(report):
+    """
+    Queue a saved report for rendering.
+
+    A report matching a completed one is completed right away with its file.
+    With REPORT_GENERATION_ASYNC = False the report is rendered right away
+    instead, e.g. for development without a worker running.
+    """
+    report.content_hash = get_content_hash(report)
+    GeneratedReport.objects.filter(pk=report.pk).update(
+        content_hash=report.content_hash
+    )
+
+    cached = find_cached_report(report.content_hash)
+    if cached is not None:
+        now = timezone.now()
+        GeneratedReport.objects.filter(pk=report.pk).update(
+            status=Status.COMPLETED,
+            file=cached.file.name,
+            progress=100,
+            started_at=now,
+            completed_at=now,
+        )
+        report.refresh_from_db()
+    elif getattr(settings, "REPORT_GENERATION_ASYNC", True):
+        GeneratedReport.objects.filter(pk=report.pk).update(
+            status=Status.QUEUED, progress=0
+        )
+        report.status = Status.QUEUED
+        report.progress = 0
+    else:
+        GeneratedReport.objects.filter(pk=report.pk).update(
+            status=Status.PROCESSING, started_at=timezone.now()
+        )
+        render_report(report.pk)
+        report.refresh_from_db()
+    return report
+
+
+def claim_reports(limit):
+    """Claim up to ``limit`` queued reports, oldest first; return their ids."""
+    claimed = []
+    candidates = GeneratedReport.objects.filter(status=Status.QUEUED).order_by(
+        "created_at"
+    )
+    for report_id in candidates.values_list("id", flat=True)[:limit]:
+        # Another worker may have claimed it since it was read
+        if GeneratedReport.objects.filter(pk=report_id, status=Status.QUEUED).update(
+            status=Status.PROCESSING, started_at=timezone.now()
+        ):
+            claimed.append(report_id)
+    return claimed
+
+
+def fail_stale_reports(exclude=()):
+    """
+    Mark reports that have been processing for longer than REPORT_JOB_TIMEOUT
+    seconds as failed; their worker died or hung. Reports in ``exclude`` are
+    left to the worker running them.
+    """
+    timeout = getattr(settings, "REPORT_JOB_TIMEOUT", 60 * 30)
+    return (
+        GeneratedReport.objects.filter(
+            status=Status.PROCESSING,
+            started_at__lt=timezone.now() - timedelta(seconds=timeout),
+        )
+        .exclude(pk__in=exclude)
+        .update(
+            status=Status.FAILED,
+            error_message="Report generation timed out",
+            completed_at=timezone.now(),
+        )
+    )
+
+
+def fail_report(report_id, error_message):
+    """
+    Mark a report that is still processing as failed and tell its owner.
+
+    Returns whether the report was failed.
+    """
+    updated = GeneratedReport.objects.filter(
+        pk=report_id, status=Status.PROCESSING
+    ).update(
+        status=Status.FAILED,
+        error_message=error_message,
+        completed_at=timezone.now(),
+    )
+    if not updated:
+        return False
+
+    report = GeneratedReport.objects.select_related("generated_by").get(pk=report_id)
+    _push(report.generated_by_id, get_report_status(report))
+    _notify(report)
+    return True
+
+
+def _push(user_id, data):
+    """Send data to a user's notification WebSocket. Errors are logged."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None or user_id is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            f"notifications_{user_id}", {"type": "notification", "data": data}
+        )
+    except Exception as e:
+        logger.error(f"Error sending report progress: {str(e)}")
+
+
+def get_report_status(report):
+    """Return the status data clients poll for and are pushed."""
+    return {
+        "type": "report_status",
+        "report": report.id,
+        "status": report.status,
+        "progress": report.progress,
+        "error_message": report.error_message,
+    }
+
+
+def render_report(report_id):
+    """Render a claimed report, saving and pushing its progress."""
+    report = GeneratedReport.objects.select_related("template").get(pk=report_id)
+    last_progress = report.progress
+
+    def progress(percent):
+        nonlocal last_progress
+        percent = min(percent, 99)
+        if percent - last_progress < PROGRESS_STEP:
+            return
+        last_progress = report.progress = percent
+        GeneratedReport.objects.filter(pk=report_id).update(progress=percent)
+        _push(report.generated_by_id, get_report_status(report))
+
+    progress(10)
+    generate_report_pdf(report, progress)
+    _push(report.generated_by_id, get_report_status(report))
+    _notify(report)
+    return report.status
+
+
+def _notify(report):
+    if report.generated_by is None:
+        return
+
+    if report.status == Status.COMPLETED:
+        message = f'Your report "{report.name}" is ready to download.'
+    else:
+        message = f'Your report "{report.name}" could not be generated.'
+    send_notification(
+        report.generated_by,
+        NotificationType.REPORT_READY,
+        {
+            "subject": f"Report {report.get_status_display().lower()}",
+            "message": message,
+            "report": report.id,
+            "status": report.status,
+        },
+        related_id=str(report.id),
+        send_email=False,
+    )
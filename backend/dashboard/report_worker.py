@@ -0,0 +1,16 @@
+"""
+Entry point of the processes run_report_workers renders reports in.
+
+Each report is rendered in a process of its own, started fresh, so Django
+is set up before anything that needs the app registry is imported.
+"""
+
+import django
+
+
+def render_report_process(report_id):
+    django.setup()
+
+    from .report_queue import render_report
+
+    render_report(report_id)
@@ -0,0 +1,273 @@
+"""
+Metric value retention and downsampling.
+
+Raw values are rolled up into hourly buckets, hourly into daily and daily
+into monthly. A rolled-up value is stored as a MetricValue with the bucket's
+start as its timestamp: numeric values are averaged (weighted by the number
+of raw values behind each source row), other values keep the last one in the
+bucket. Only complete buckets are rolled up, and each run continues after the
+last bucket already stored, so rollups are incremental.
+
+Each resolution is then pruned past the metric's retention horizon. Rows are
+only pruned once they have been rolled up, and a metric's latest raw value is
+always kept.
+"""
+
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Max, Sum
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth
+from django.utils import timezone
+
+from .metric_scheduler import REFRESH_INTERVALS
+from .models import Metric, MetricValue, refresh_latest_values
+from .time_buckets import next_bucket
+
+Resolution = MetricValue.Resolution
+
+# How a resolution is built: the resolution it is rolled up from, the
+# function truncating a timestamp to its bucket, and the metric field holding
+# the retention (in days) of the source rows.
+Rollup = namedtuple("Rollup", ["source", "trunc", "source_retention"])
+
+ROLLUPS = {
+    Resolution.HOURLY: Rollup(Resolution.RAW, TruncHour, "raw_retention_days"),
+    Resolution.DAILY: Rollup(Resolution.HOURLY, TruncDay, "hourly_retention_days"),
+    Resolution.MONTHLY: Rollup(Resolution.DAILY, TruncMonth, "daily_retention_days"),
+}
+
+# Resolution a resolution is rolled up from, and its time_buckets bucket
+FINER_RESOLUTIONS = {
+    resolution: rollup.source for resolution, rollup in ROLLUPS.items()
+}
+BUCKET_SIZES = {
+    Resolution.HOURLY: "hour",
+    Resolution.DAILY: "day",
+    Resolution.MONTHLY: "month",
+}
+
+# Approximate length of a bucket, used to pick a resolution for a time range
+BUCKET_LENGTHS = {
+    Resolution.HOURLY: timedelta(hours=1),
+    Resolution.DAILY: timedelta(days=1),
+    Resolution.MONTHLY: timedelta(days=30),
+}
+
+NUMERIC_DISPLAY_TYPES = (
+    Metric.DisplayType.NUMBER,
+    Metric.DisplayType.CURRENCY,
+    Metric.DisplayType.PERCENTAGE,
+)
+
+
+def bucket_start(timestamp, resolution):
+    """Return the start of the bucket containing a timestamp, in local time."""
+    local = timezone.localtime(timestamp)
+    local = local.replace(minute=0, second=0, microsecond=0)
+    if resolution in (Resolution.DAILY, Resolution.MONTHLY):
+        local = local.replace(hour=0)
+    if resolution == Resolution.MONTHLY:
+        local = local.replace(day=1)
+    return local
+
+
+def _numeric_buckets(source_values, trunc):
+    rows = (
+        source_values.annotate(bucket=trunc("timestamp"))
+        .values("bucket")
+        .annotate(
+            total=Sum(F("numeric_value") * F("sample_count")),
+            samples=Sum("sample_count"),
+        )
+        .order_by("bucket")
+    )
+    return [
+        (
+            row["bucket"],
+            {"numeric_value": row["total"] / row["samples"]},
+            row["samples"],
+        )
+        for row in rows
+        if row["samples"]
+    ]
+
+
+def _last_value_buckets(source_values, resolution):
+    buckets = {}
+    rows = source_values.order_by("timestamp", "id").values_list(
+        "timestamp", "string_value", "json_value", "sample_count"
+    )
+    for timestamp, string_value, json_value, sample_count in rows.iterator():
+        start = bucket_start(timestamp, resolution)
+        samples = buckets[start][2] if start in buckets else 0
+        buckets[start] = (
+            start,
+            {"string_value": string_value, "json_value": json_value},
+            samples + sample_count,
+        )
+    return list(buckets.values())
+
+
+def roll_up(metric, resolution, now=None):
+    """
+    Store rolled-up values for every complete bucket not rolled up yet.
+
+    Returns the number of values created.
+    """
+    now = now or timezone.now()
+    rollup = ROLLUPS[resolution]
+    current_bucket = bucket_start(now, resolution)
+
+    source_values = MetricValue.objects.filter(
+        metric=metric, resolution=rollup.source, timestamp__lt=current_bucket
+    )
+    last_bucket = MetricValue.objects.filter(
+        metric=metric, resolution=resolution
+    ).aggregate(last=Max("timestamp"))["last"]
+    if last_bucket is not None:
+        source_values = source_values.filter(timestamp__gte=last_bucket)
+
+    if metric.display_type in NUMERIC_DISPLAY_TYPES:
+        buckets = _numeric_buckets(
+            source_values.filter(numeric_value__isnull=False), rollup.trunc
+        )
+    else:
+        buckets = _last_value_buckets(source_values, resolution)
+
+    if last_bucket is not None:
+        # The last stored bucket is already complete
+        buckets = [bucket for bucket in buckets if bucket[0] > last_bucket]
+
+    MetricValue.objects.bulk_create(
+        [
+            MetricValue(
+                metric=metric,
+                timestamp=start,
+                resolution=resolution,
+                sample_count=samples,
+                **value_fields,
+            )
+            for start, value_fields, samples in buckets
+        ]
+    )
+    return len(buckets)
+
+
+def prune(metric, now=None):
+    """
+    Delete values past the metric's retention horizons.
+
+    Values are deleted with one query per resolution, without loading them;
+    when raw values were deleted the metric is pointed at its newest
+    remaining raw value afterwards. Returns the number of values deleted.
+    """
+    now = now or timezone.now()
+    deleted = 0
+    for resolution, rollup in ROLLUPS.items():
+        days = getattr(metric, rollup.source_retention)
+        if days is None:
+            continue
+
+        # Never prune source rows that haven't been rolled up yet
+        cutoff = min(now - timedelta(days=days), bucket_start(now, resolution))
+        values = MetricValue.objects.filter(
+            metric=metric, resolution=rollup.source, timestamp__lt=cutoff
+        )
+        if metric.latest_value_id is not None:
+            values = values.exclude(pk=metric.latest_value_id)
+        count = values.delete()[0]
+        if count and rollup.source == MetricValue.Resolution.RAW:
+            refresh_latest_values([metric.pk])
+        deleted += count
+    return deleted
+
+
+def apply_retention(metrics=None, now=None):
+    """
+    Roll up and prune the values of the given metrics (default: all).
+
+    Returns ``{metric: (created, deleted)}``.
+    """
+    now = now or timezone.now()
+    if metrics is None:
+        metrics = Metric.objects.all()
+
+    results = {}
+    for metric in metrics:
+        with transaction.atomic():
+            created = sum(roll_up(metric, resolution, now) for resolution in ROLLUPS)
+            deleted = prune(metric, now)
+        results[metric] = (created, deleted)
+    return results
+
+
+def choose_resolution(metric, start, now=None, max_points=500):
+    """
+    Pick the finest resolution that covers ``start`` to now in at most
+    ``max_points`` values and is still retained for the whole range.
+    """
+    now = now or timezone.now()
+    span = now - start
+
+    # Raw values arrive once per refresh interval
+    raw_interval = REFRESH_INTERVALS.get(metric.refresh_frequency, timedelta(hours=1))
+    candidates = [(Resolution.RAW, raw_interval, "raw_retention_days")]
+    candidates.extend(
+        (resolution, BUCKET_LENGTHS[resolution], retention)
+        for resolution, retention in (
+            (Resolution.HOURLY, "hourly_retention_days"),
+            (Resolution.DAILY, "daily_retention_days"),
+        )
+    )
+
+    for resolution, interval, retention in candidates:
+        days = getattr(metric, retention)
+        retained = days is None or start >= now - timedelta(days=days)
+        if retained and span / interval <= max_points:
+            return resolution
+    return Resolution.MONTHLY
+
+
+def _values_since(metric, start, resolution):
+    """
+    Return a metric's values since ``start`` at a resolution, followed by
+    finer values for the time after its last rolled-up bucket.
+
+    Buckets are only rolled up once they are complete, so the current bucket
+    (and every bucket, before retention first runs) only has finer values.
+    """
+    values = list(
+        MetricValue.objects.filter(
+            metric=metric, resolution=resolution, timestamp__gte=start
+        )
+        .select_related("metric")
+        .order_by("timestamp")
+    )
+    if resolution == Resolution.RAW:
+        return values
+    if values:
+        start = next_bucket(values[-1].timestamp, BUCKET_SIZES[resolution])
+    return values + _values_since(metric, start, FINER_RESOLUTIONS[resolution])
+
+
+def get_values(metric, start, resolution=None, max_points=500, now=None):
+    """
+    Return a metric's values since ``start`` at the given resolution (chosen
+    automatically when None), thinned out evenly to at most ``max_points``.
+
+    The time not rolled up to the resolution yet is filled in with finer
+    values. The resolution returned is the coarsest one of the values.
+    """
+    if resolution is None:
+        resolution = choose_resolution(metric, start, now, max_points)
+
+    values = _values_since(metric, start, resolution)
+    if values:
+        resolution = values[0].resolution
+    if len(values) > max_points:
+        step = -(-len(values) // max_points)
+        # Keep the newest value
+        values = values[::-1][::step][::-1]
+    return resolution, values
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .consumers import MetricStreamConsumer
+
+websocket_urlpatterns = [
+    path("ws/dashboard/metrics/", MetricStreamConsumer.as_asgi()),
+]
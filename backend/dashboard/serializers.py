@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from .metric_registry import registry
 from .models import (
     DashboardLayout,
     GeneratedReport,
@@ -32,6 +33,19 @@ class MetricDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Metric
         fields = "__all__"
+        read_only_fields = [
+            "last_calculated_at",
+            "last_calculation_ms",
+            "last_query_count",
+            "latest_value",
+        ]
+
+    def validate_calculation_method(self, value):
+        if value not in registry:
+            raise serializers.ValidationError(
+                f"Unknown calculation method. Available: {', '.join(registry.keys())}"
+            )
+        return value
 
 
 class MetricValueSerializer(serializers.ModelSerializer):
@@ -48,6 +62,8 @@ class MetricValueSerializer(serializers.ModelSerializer):
             "display_type",
             "category",
             "timestamp",
+            "resolution",
+            "sample_count",
             "numeric_value",
             "string_value",
             "json_value",
@@ -132,7 +148,10 @@ class GeneratedReportSerializer(serializers.ModelSerializer):
             "generated_by",
             "generated_by_email",
             "status",
+            "progress",
             "error_message",
+            "started_at",
+            "completed_at",
             "created_at",
             "updated_at",
         ]
@@ -142,7 +161,10 @@ class GeneratedReportSerializer(serializers.ModelSerializer):
             "file_size",
             "generated_by_email",
             "status",
+            "progress",
             "error_message",
+            "started_at",
+            "completed_at",
             "created_at",
             "updated_at",
         ]
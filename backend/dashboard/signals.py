@@ -0,0 +1,55 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .dashboard_cache import bump_dashboard_version
+from .metric_stream import broadcast_metric_values
+from .models import Metric, MetricValue
+from .report_cache import REPORTED_MODELS, bump_report_data_version
+
+
+@receiver(post_save, sender=MetricValue)
+def update_latest_value(sender, instance, **kwargs):
+    """Point the metric at a newly written value unless a newer one exists."""
+    if instance.resolution != MetricValue.Resolution.RAW:
+        return
+    Metric.objects.filter(pk=instance.metric_id).filter(
+        Q(latest_value__isnull=True)
+        | Q(latest_value__timestamp__lte=instance.timestamp)
+    ).update(latest_value=instance)
+    bump_dashboard_version()
+
+
+@receiver(post_save, sender=MetricValue)
+def stream_metric_value(sender, instance, created, **kwargs):
+    """Push a newly calculated value to the dashboards subscribed to it."""
+    if created and instance.resolution == MetricValue.Resolution.RAW:
+        broadcast_metric_values([instance])
+
+
+@receiver(post_save, sender=Metric)
+@receiver(post_delete, sender=Metric)
+def invalidate_dashboards(sender, **kwargs):
+    """Metric definitions and visibility are part of every dashboard."""
+    bump_dashboard_version()
+
+
+def invalidate_report_data(sender, update_fields=None, **kwargs):
+    """Reports reading a model are rendered again after it is written."""
+    # Logging in only saves last_login, which no report shows
+    if update_fields is not None and set(update_fields) == {"last_login"}:
+        return
+    bump_report_data_version(sender._meta.label)
+
+
+for model_label in REPORTED_MODELS:
+    post_save.connect(
+        invalidate_report_data,
+        sender=model_label,
+        dispatch_uid=f"report_data_save:{model_label}",
+    )
+    post_delete.connect(
+        invalidate_report_data,
+        sender=model_label,
+        dispatch_uid=f"report_data_delete:{model_label}",
+    )
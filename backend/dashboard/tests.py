@@ -1,3 +1,651 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.db.models import Count, Sum
+from django.db.models.deletion import Collector
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from bookings.archive import archive_bookings
+from bookings.models import (
+    ArchivedBooking,
+    Booking,
+    BookingStatus,
+    DailySales,
+    Ticket,
+)
+from bookings.sales import apply_sales_delta, rebuild_daily_sales
+from movies.models import Movie, Show, Theater
+from users.models import CustomUser
+from xcounter.cache_utils import get_version_stamp
+
+from .cohorts import BookingEvents, analyze
+from .dashboard_cache import DASHBOARD_STAMP, HIT, MISS, get_dashboard_payload
+from .forecasting import (
+    MAX_LEAD_DAYS,
+    PickupModel,
+    _get_curve,
+    forecast_shows,
+)
+from .metrics import MetricDataSnapshot
+from .models import (
+    GeneratedReport,
+    Metric,
+    MetricValue,
+    ReportTemplate,
+    refresh_latest_values,
+)
+from .report_cache import get_content_hash
+from .report_generators import _get_booking_revenue
+from .report_queue import (
+    claim_reports,
+    enqueue_report,
+    fail_report,
+    fail_stale_reports,
+)
+from .retention import apply_retention, get_values
+from .time_buckets import aggregate_by_bucket
+from .visualization import get_ticket_types_chart_data
+
+Resolution = MetricValue.Resolution
+
+
+@override_settings(
+    CACHES={
+        **settings.CACHES,
+        "version_stamps": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "version-stamps",
+        },
+    }
+)
+@mock.patch("xcounter.cache_utils._stamp_cache_retry_at", 0)
+class DashboardPayloadCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches["version_stamps"].clear()
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {"build": self.builds}
+
+    def test_payload_is_built_once(self):
+        self.assertEqual(
+            get_dashboard_payload("admin", self.build), ({"build": 1}, MISS)
+        )
+        self.assertEqual(
+            get_dashboard_payload("admin", self.build), ({"build": 1}, HIT)
+        )
+
+    def test_metric_value_write_makes_payload_stale(self):
+        get_dashboard_payload("admin", self.build)
+        metric = Metric.objects.create(
+            name="Revenue",
+            category=Metric.Category.SALES,
+            display_type=Metric.DisplayType.CURRENCY,
+            calculation_method="total_revenue",
+            refresh_frequency=Metric.RefreshFrequency.HOURLY,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            MetricValue.objects.create(metric=metric, numeric_value=10)
+
+        self.assertEqual(
+            get_dashboard_payload("admin", self.build), ({"build": 2}, MISS)
+        )
+
+    def test_cold_miss_waits_for_concurrent_build(self):
+        cache.add("role_dashboard:admin:rebuilding", True)
+        version = get_version_stamp(DASHBOARD_STAMP)
+
+        def finish_other_build(seconds):
+            cache.set(
+                "role_dashboard:admin",
+                {"version": version, "payload": {"build": "other"}},
+            )
+
+        with mock.patch(
+            "dashboard.dashboard_cache.time.sleep", side_effect=finish_other_build
+        ):
+            payload = get_dashboard_payload("admin", self.build)
+
+        self.assertEqual(payload, ({"build": "other"}, HIT))
+        self.assertEqual(self.builds, 0)
+
+    @mock.patch("dashboard.dashboard_cache.COLD_MISS_WAIT", 0)
+    def test_cold_miss_builds_uncached_when_wait_times_out(self):
+        cache.add("role_dashboard:admin:rebuilding", True)
+
+        self.assertEqual(
+            get_dashboard_payload("admin", self.build), ({"build": 1}, MISS)
+        )
+        self.assertIsNone(cache.get("role_dashboard:admin"))
+
+    def test_bump_from_another_process_makes_payload_stale(self):
+        get_dashboard_payload("admin", self.build)
+        # calculate_metrics runs in its own process and only shares the
+        # stamps in the stamp cache
+        caches["version_stamps"].set(f"version_stamp:{DASHBOARD_STAMP}", "bumped")
+
+        self.assertEqual(
+            get_dashboard_payload("admin", self.build), ({"build": 2}, MISS)
+        )
+
+
+def create_show(start_time=None):
+    start_time = start_time or timezone.now()
+    movie = Movie.objects.create(
+        title="Test Movie",
+        description="Test movie",
+        release_date=start_time.date(),
+        duration_minutes=120,
+    )
+    theater = Theater.objects.create(name="Test", location="Test", capacity=100)
+    return Show.objects.create(
+        movie=movie,
+        theater=theater,
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=2),
+        price=Decimal("10.00"),
+        total_seats=100,
+        available_seats=100,
+    )
+
+
+class ArchivedReportingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = CustomUser.objects.create_user(email="customer@example.com")
+        old_show = create_show(timezone.now() - timedelta(days=400))
+        show = create_show()
+        self.create_booking("BK-OLD", old_show, "VIP", Decimal("30.00"))
+        self.create_booking("BK-NEW", show, "STANDARD", Decimal("10.00"))
+        self.start = timezone.now() - timedelta(days=1)
+        self.end = timezone.now() + timedelta(days=1)
+
+    def create_booking(self, number, show, seat_category, price):
+        booking = Booking.objects.create(
+            user=self.customer,
+            show=show,
+            booking_number=number,
+            total_seats=1,
+            total_amount=price + 2,
+        )
+        Ticket.objects.create(
+            booking=booking,
+            seat_number="A1",
+            seat_category=seat_category,
+            price=price,
+            ticket_number=f"T-{number}",
+        )
+
+    def figures(self):
+        cache.clear()
+        chart = get_ticket_types_chart_data()["data"]
+        return {
+            "revenue": _get_booking_revenue(self.start, self.end),
+            "repeat_customers": MetricDataSnapshot().repeat_customers,
+            "ticket_types": dict(zip(chart["labels"], chart["datasets"][0]["data"])),
+        }
+
+    def test_figures_include_archived_bookings(self):
+        before = self.figures()
+
+        list(archive_bookings(timezone.now() - timedelta(days=365)))
+
+        self.assertEqual(ArchivedBooking.objects.count(), 1)
+        self.assertEqual(
+            before,
+            {
+                "revenue": (Decimal("44.00"), Decimal("40.00")),
+                "repeat_customers": 1,
+                "ticket_types": {"VIP": 1, "STANDARD": 1},
+            },
+        )
+        self.assertEqual(self.figures(), before)
+
+
+@override_settings(MEDIA_ROOT=tempfile.gettempdir(), REPORT_GENERATION_ASYNC=True)
+class ReportCacheTests(TestCase):
+    def setUp(self):
+        self.template = ReportTemplate.objects.create(
+            name="Sales", report_type=ReportTemplate.ReportType.SALES
+        )
+        self.parameters = {"start_date": "2025-01-01", "end_date": "2025-02-01"}
+
+    def create_report(self):
+        return GeneratedReport.objects.create(
+            template=self.template, name="Sales", parameters=self.parameters
+        )
+
+    def test_sales_hash_changes_with_daily_sales(self):
+        report = self.create_report()
+        content_hash = get_content_hash(report)
+        self.assertEqual(get_content_hash(report), content_hash)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_sales_delta(timezone.localdate(), create_show(), "", {"bookings": 1})
+        changed_hash = get_content_hash(report)
+        self.assertNotEqual(changed_hash, content_hash)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_daily_sales()
+        self.assertNotEqual(get_content_hash(report), changed_hash)
+
+    def test_identical_report_reuses_file(self):
+        rendered = self.create_report()
+        rendered.content_hash = get_content_hash(rendered)
+        rendered.status = GeneratedReport.Status.COMPLETED
+        rendered.file.save("cached-test.pdf", ContentFile(b"%PDF"), save=True)
+        self.addCleanup(rendered.file.delete, save=False)
+
+        report = enqueue_report(self.create_report())
+
+        self.assertEqual(report.status, GeneratedReport.Status.COMPLETED)
+        self.assertEqual(report.file.name, rendered.file.name)
+
+    def test_changed_parameters_are_queued(self):
+        rendered = self.create_report()
+        rendered.content_hash = get_content_hash(rendered)
+        rendered.status = GeneratedReport.Status.COMPLETED
+        rendered.file.save("cached-test.pdf", ContentFile(b"%PDF"), save=True)
+        self.addCleanup(rendered.file.delete, save=False)
+
+        self.parameters = {"start_date": "2025-01-01", "end_date": "2025-03-01"}
+        report = enqueue_report(self.create_report())
+
+        self.assertEqual(report.status, GeneratedReport.Status.QUEUED)
+
+
+def create_metric(**fields):
+    return Metric.objects.create(
+        name="Revenue",
+        category=Metric.Category.SALES,
+        display_type=Metric.DisplayType.CURRENCY,
+        calculation_method="total_revenue",
+        refresh_frequency=Metric.RefreshFrequency.HOURLY,
+        **fields,
+    )
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.now = timezone.make_aware(datetime(2025, 1, 10, 12, 40))
+        self.metric = create_metric(raw_retention_days=0)
+        # One raw value every half hour from 09:00 to 12:30
+        for number in range(8):
+            MetricValue.objects.create(
+                metric=self.metric,
+                timestamp=timezone.make_aware(datetime(2025, 1, 10, 9, 0))
+                + timedelta(minutes=30 * number),
+                numeric_value=number,
+            )
+        self.metric.refresh_from_db()
+
+    def values(self, resolution):
+        return list(
+            MetricValue.objects.filter(metric=self.metric, resolution=resolution)
+            .order_by("timestamp")
+            .values_list("timestamp__hour", "numeric_value")
+        )
+
+    def test_complete_hours_are_rolled_up(self):
+        apply_retention([self.metric], now=self.now)
+
+        self.assertEqual(
+            self.values(Resolution.HOURLY),
+            [(9, Decimal("0.5")), (10, Decimal("2.5")), (11, Decimal("4.5"))],
+        )
+        # The day isn't complete yet
+        self.assertEqual(self.values(Resolution.DAILY), [])
+
+    def test_rolled_up_raw_values_are_pruned(self):
+        apply_retention([self.metric], now=self.now)
+
+        self.assertEqual(self.values(Resolution.RAW), [(12, 6), (12, 7)])
+
+    def test_values_are_pruned_without_loading_them(self):
+        self.assertTrue(Collector("default").can_fast_delete(MetricValue.objects.all()))
+
+    def test_pruning_points_metric_at_newest_remaining_value(self):
+        Metric.objects.filter(pk=self.metric.pk).update(latest_value=None)
+        self.metric.refresh_from_db()
+
+        apply_retention([self.metric], now=self.now)
+
+        self.metric.refresh_from_db()
+        self.assertEqual(self.metric.latest_value.numeric_value, 7)
+
+    def test_deleted_latest_value_is_replaced(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.metric.latest_value.delete()
+            refresh_latest_values([self.metric.pk])
+
+        self.metric.refresh_from_db()
+        self.assertEqual(self.metric.latest_value.numeric_value, 6)
+
+    def test_roll_up_is_incremental(self):
+        apply_retention([self.metric], now=self.now)
+        created, deleted = apply_retention([self.metric], now=self.now)[self.metric]
+
+        self.assertEqual((created, deleted), (0, 0))
+
+    def test_values_after_last_rollup_are_raw(self):
+        apply_retention([self.metric], now=self.now)
+        start = self.now - timedelta(days=1)
+
+        resolution, values = get_values(
+            self.metric, start, resolution=Resolution.HOURLY, now=self.now
+        )
+
+        self.assertEqual(resolution, Resolution.HOURLY)
+        self.assertEqual(
+            [(value.resolution, value.timestamp.hour) for value in values],
+            [
+                (Resolution.HOURLY, 9),
+                (Resolution.HOURLY, 10),
+                (Resolution.HOURLY, 11),
+                (Resolution.RAW, 12),
+                (Resolution.RAW, 12),
+            ],
+        )
+
+    def test_missing_rollups_fall_back_to_raw(self):
+        start = self.now - timedelta(days=30)
+
+        resolution, values = get_values(
+            self.metric, start, resolution=Resolution.DAILY, now=self.now
+        )
+
+        self.assertEqual(resolution, Resolution.RAW)
+        self.assertEqual(len(values), 8)
+
+
+class MetricValuesViewTests(TestCase):
+    def setUp(self):
+        self.metric = create_metric()
+        MetricValue.objects.create(metric=self.metric, numeric_value=1)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            CustomUser.objects.create_user(
+                email="admin@example.com", is_staff=True, role="ADMIN"
+            )
+        )
+        self.url = f"/api/dashboard/metrics/{self.metric.pk}/values/"
+
+    def test_retained_raw_values_are_served(self):
+        response = self.client.get(self.url, {"days": 7})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Metric-Resolution"], Resolution.RAW)
+        self.assertEqual(len(response.data), 1)
+
+    def test_invalid_numbers_are_rejected(self):
+        for params in ({"days": "week"}, {"max_points": "many"}, {"days": 0}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+
+
+class TimeBucketTests(TestCase):
+    def setUp(self):
+        self.show = create_show()
+
+    def add_sales(self, day, bookings):
+        DailySales.objects.create(
+            date=day,
+            show=self.show,
+            movie_id=self.show.movie_id,
+            theater_id=self.show.theater_id,
+            show_type=self.show.show_type,
+            bookings=bookings,
+        )
+
+    def aggregate(self, bucket, start, end):
+        return [
+            (row["label"], row["bookings"])
+            for row in aggregate_by_bucket(
+                DailySales.objects.all(),
+                "date",
+                bucket,
+                start,
+                end,
+                bookings=Sum("bookings"),
+            )
+        ]
+
+    def test_empty_buckets_are_filled(self):
+        self.add_sales(date(2025, 1, 1), 2)
+        self.add_sales(date(2025, 1, 3), 5)
+
+        self.assertEqual(
+            self.aggregate("day", date(2025, 1, 1), date(2025, 1, 4)),
+            [
+                ("2025-01-01", 2),
+                ("2025-01-02", 0),
+                ("2025-01-03", 5),
+                ("2025-01-04", 0),
+            ],
+        )
+
+    def test_partial_buckets_only_count_the_range(self):
+        # 2025-01-06 is a Monday
+        self.add_sales(date(2025, 1, 6), 1)
+        self.add_sales(date(2025, 1, 8), 2)
+        self.add_sales(date(2025, 1, 14), 4)
+        self.add_sales(date(2025, 1, 16), 8)
+
+        self.assertEqual(
+            self.aggregate("week", date(2025, 1, 8), date(2025, 1, 14)),
+            [("2025-01-06", 2), ("2025-01-13", 4)],
+        )
+        self.assertEqual(
+            self.aggregate("month", date(2025, 1, 7), date(2025, 1, 31)),
+            [("2025-01", 14)],
+        )
+
+    def test_date_end_includes_whole_day_of_datetime_field(self):
+        metric = create_metric()
+        for hour in (0, 12, 23):
+            MetricValue.objects.create(
+                metric=metric,
+                timestamp=timezone.make_aware(datetime(2025, 1, 2, hour)),
+                numeric_value=1,
+            )
+        MetricValue.objects.create(
+            metric=metric,
+            timestamp=timezone.make_aware(datetime(2025, 1, 3)),
+            numeric_value=1,
+        )
+
+        rows = aggregate_by_bucket(
+            MetricValue.objects.all(),
+            "timestamp",
+            "day",
+            date(2025, 1, 1),
+            date(2025, 1, 2),
+            count=Count("id"),
+        )
+
+        self.assertEqual(
+            [(row["label"], row["count"]) for row in rows],
+            [("2025-01-01", 0), ("2025-01-02", 3)],
+        )
+
+
+class ReportQueueTests(TestCase):
+    def setUp(self):
+        self.reports = [
+            GeneratedReport.objects.create(
+                name=f"Report {number}", status=GeneratedReport.Status.QUEUED
+            )
+            for number in range(3)
+        ]
+
+    def status(self, report):
+        report.refresh_from_db()
+        return report.status
+
+    def test_reports_are_claimed_oldest_first_and_once(self):
+        first, second, third = self.reports
+
+        self.assertEqual(claim_reports(2), [first.pk, second.pk])
+        self.assertEqual(claim_reports(2), [third.pk])
+        self.assertEqual(claim_reports(2), [])
+        self.assertEqual(self.status(first), GeneratedReport.Status.PROCESSING)
+
+    @override_settings(REPORT_JOB_TIMEOUT=60)
+    def test_stale_reports_fail_unless_excluded(self):
+        first, second, _ = self.reports
+        claim_reports(2)
+        GeneratedReport.objects.update(started_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(fail_stale_reports(exclude=[second.pk]), 1)
+        self.assertEqual(self.status(first), GeneratedReport.Status.FAILED)
+        self.assertEqual(self.status(second), GeneratedReport.Status.PROCESSING)
+
+    def test_only_processing_reports_are_failed(self):
+        first, second, _ = self.reports
+        claim_reports(1)
+
+        self.assertTrue(fail_report(first.pk, "Worker stopped"))
+        self.assertFalse(fail_report(second.pk, "Worker stopped"))
+        self.assertEqual(self.status(second), GeneratedReport.Status.QUEUED)
+
+
+class ForecastingTests(TestCase):
+    def similar_show(self, movie=1, hour=20, total_seats=100):
+        return {
+            "movie": movie,
+            "show_type": "REGULAR",
+            "weekday": 5,
+            "hour": hour,
+            "total_seats": total_seats,
+        }
+
+    def test_curve_accumulates_sales_by_lead_day(self):
+        show = {"date": date(2025, 3, 31)}
+        sales = [
+            (date(2025, 3, 31), 1),
+            (date(2025, 3, 29), 3),
+            # Sales before the longest lead are counted at it
+            (date(2025, 1, 1), 2),
+        ]
+
+        curve = _get_curve(show, sales)
+
+        self.assertEqual(curve[:4], [6, 5, 5, 2])
+        self.assertEqual(curve[MAX_LEAD_DAYS], 2)
+
+    def test_predict_uses_most_specific_key_with_enough_shows(self):
+        model = PickupModel()
+        curve = [40] + [20] * MAX_LEAD_DAYS
+        for _ in range(3):
+            model.add(self.similar_show(), curve)
+        model.add(self.similar_show(movie=2, hour=18), [10] * (MAX_LEAD_DAYS + 1))
+
+        cases = [
+            (self.similar_show(), "movie_slot", 3),
+            (self.similar_show(hour=18), "movie", 3),
+            (self.similar_show(movie=3), "slot", 3),
+            (self.similar_show(movie=3, hour=12), "all", 4),
+        ]
+        for show, level, count in cases:
+            with self.subTest(level=level):
+                self.assertEqual(model.predict(show, 10, 5)[1:], (level, count))
+
+        # Similar shows doubled their sales from lead 5
+        self.assertEqual(model.predict(self.similar_show(), 10, 5)[0], 20)
+        self.assertEqual(model.predict(self.similar_show(), 0, 5)[0], 20)
+        self.assertEqual(
+            PickupModel().predict(self.similar_show(), 10, 5), (10, None, 0)
+        )
+
+    def test_cancelled_bookings_are_not_sales(self):
+        user = CustomUser.objects.create_user(email="customer@example.com")
+        now = timezone.now()
+        upcoming = create_show(now + timedelta(days=2))
+        Show.objects.filter(pk=upcoming.pk).update(available_seats=96)
+        past = []
+        for days in (7, 14, 21):
+            show = create_show(now - timedelta(days=days))
+            Show.objects.filter(pk=show.pk).update(
+                movie=upcoming.movie, show_type=upcoming.show_type
+            )
+            past.append(show)
+        for number, (show, seats, status) in enumerate(
+            [
+                (past[0], 4, BookingStatus.CONFIRMED),
+                (past[0], 50, BookingStatus.CANCELLED),
+                (past[1], 4, BookingStatus.CONFIRMED),
+                (past[2], 4, BookingStatus.CONFIRMED),
+                (upcoming, 30, BookingStatus.CANCELLED),
+            ]
+        ):
+            Booking.objects.create(
+                user=user,
+                show=show,
+                booking_number=f"BK-FC-{number}",
+                total_seats=seats,
+                total_amount=seats * 10,
+                booking_status=status,
+            )
+
+        (forecast,) = forecast_shows(horizon_days=7, now=now)
+
+        self.assertEqual(forecast["sold"], 4)
+        self.assertEqual(forecast["basis"], "movie")
+        # The past bookings were made after their shows started, so similar
+        # shows sold 4 confirmed tickets after the upcoming show's lead
+        self.assertEqual(forecast["forecast"], 8)
+
+
+class RFMTests(TestCase):
+    today = date(2025, 6, 30)
+
+    def events(self, customers):
+        """Build events from customer -> [(days ago, amount), ...], oldest first."""
+        events = BookingEvents()
+        for customer, bookings in customers.items():
+            for days_ago, amount in bookings:
+                day = self.today - timedelta(days=days_ago)
+                events.customers.append(customer)
+                events.days.append(day.toordinal())
+                events.months.append(day.year * 12 + day.month - 1)
+                events.amounts.append(amount)
+        return events
+
+    def test_segments_use_recency_frequency_and_monetary_scores(self):
+        events = self.events(
+            {
+                1: [(days_ago, 100.0) for days_ago in range(5, 0, -1)],
+                2: [(2, 1000.0)],
+                3: [(3, 10.0)],
+                4: [(days_ago, 12.5) for days_ago in range(303, 299, -1)],
+                5: [(400, 5.0)],
+            }
+        )
+
+        rfm = {
+            row["segment"]: (row["customers"], row["average_monetary"])
+            for row in analyze(events, today=self.today)["rfm"]
+        }
+
+        self.assertEqual(
+            rfm,
+            {
+                "Champions": (1, 500.0),
+                "Loyal": (0, 0),
+                # Recent, rare but the biggest spender
+                "Big Spenders": (1, 1000.0),
+                "New": (0, 0),
+                "At Risk": (1, 50.0),
+                "Lost": (1, 5.0),
+                "Needs Attention": (1, 10.0),
+            },
+        )
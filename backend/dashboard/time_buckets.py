@@ -0,0 +1,238 @@
+"""
+Time-bucket aggregation.
+
+Charts and reports that show figures over time group rows by the hour, day,
+ISO week (starting on Monday) or month of a date or datetime field. The
+grouping is done by the database with the ``Trunc*`` functions, which Django
+translates for every backend, so nothing here depends on SQLite. Datetime
+fields are bucketed in the current time zone.
+
+Buckets without rows are filled in with zeros, so a series always has one
+point per bucket of the requested range:
+
+    rows = aggregate_by_bucket(
+        DailySales.objects.all(),
+        "date",
+        "week",
+        start,
+        end,
+        bookings=Sum("bookings"),
+        revenue=Sum("revenue"),
+    )
+    # [{"bucket": date(2025, 1, 6), "label": "2025-01-06", "bookings": 12,
+    #   "revenue": Decimal("240.00")}, ...]
+"""
+
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db.models import DateTimeField
+from django.db.models.functions import TruncDay, TruncHour, TruncMonth, TruncWeek
+from django.utils import timezone
+
+BUCKETS = {
+    "hour": TruncHour,
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+# Label format of each bucket size
+LABEL_FORMATS = {
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d",
+    "week": "%Y-%m-%d",
+    "month": "%Y-%m",
+}
+
+
+def _is_datetime_field(queryset, field):
+    output_field = queryset.all().query.resolve_ref(field).output_field
+    return isinstance(output_field, DateTimeField)
+
+
+def _truncate_date(value, bucket):
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "month":
+        return value.replace(day=1)
+    return value
+
+
+def _next_date(value, bucket):
+    if bucket == "week":
+        return value + timedelta(days=7)
+    if bucket == "month":
+        if value.month == 12:
+            return value.replace(year=value.year + 1, month=1)
+        return value.replace(month=value.month + 1)
+    return value + timedelta(days=1)
+
+
+def truncate(value, bucket):
+    """
+    Return the start of the bucket containing a date or datetime.
+
+    Datetimes are truncated in the current time zone and stay aware.
+    """
+    if not isinstance(value, datetime):
+        if bucket == "hour":
+            raise ValueError("Dates can't be bucketed by hour")
+        return _truncate_date(value, bucket)
+
+    local = timezone.localtime(value)
+    if bucket == "hour":
+        return local.replace(minute=0, second=0, microsecond=0)
+    day = _truncate_date(local.date(), bucket)
+    return timezone.make_aware(datetime.combine(day, time()))
+
+
+def next_bucket(value, bucket):
+    """Return the start of the bucket following the one starting at ``value``."""
+    if not isinstance(value, datetime):
+        return _next_date(value, bucket)
+    if bucket == "hour":
+        # Step in UTC so an hour repeated or skipped by DST is handled
+        return timezone.localtime(
+            value.astimezone(dt_timezone.utc) + timedelta(hours=1)
+        )
+    day = _next_date(timezone.localtime(value).date(), bucket)
+    return timezone.make_aware(datetime.combine(day, time()))
+
+
+def bucket_range(start, end, bucket):
+    """Return the starts of the buckets containing ``start`` through ``end``."""
+    buckets = []
+    current = truncate(start, bucket)
+    while current <= end:
+        buckets.append(current)
+        current = next_bucket(current, bucket)
+    return buckets
+
+
+def bucket_label(value, bucket):
+    """Return the chart label of a bucket."""
+    if isinstance(value, datetime):
+        value = timezone.localtime(value)
+    return value.strftime(LABEL_FORMATS[bucket])
+
+
+def _midnight(value):
+    return timezone.make_aware(datetime.combine(value, time()))
+
+
+def _bucket_queryset(queryset, field, bucket, start, end):
+    """
+    Return the buckets covering ``start`` through ``end`` and the queryset
+    filtered to that range and annotated with ``time_bucket``.
+
+    Only rows in the range are counted, so the first and last bucket may be
+    partial when the range doesn't start or end on a bucket boundary.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown time bucket {bucket!r}")
+
+    if _is_datetime_field(queryset, field):
+        if not isinstance(start, datetime):
+            start = _midnight(start)
+        if isinstance(end, datetime):
+            upper = {f"{field}__lte": end}
+        else:
+            # A date includes the whole day
+            upper = {f"{field}__lt": _midnight(end + timedelta(days=1))}
+            end = _midnight(end)
+        trunc = BUCKETS[bucket](field, tzinfo=timezone.get_current_timezone())
+    else:
+        if isinstance(start, datetime) or isinstance(end, datetime):
+            start, end = (
+                timezone.localdate(value) if isinstance(value, datetime) else value
+                for value in (start, end)
+            )
+        if bucket == "hour":
+            raise ValueError("Date fields can't be bucketed by hour")
+        upper = {f"{field}__lte": end}
+        trunc = BUCKETS[bucket](field)
+
+    buckets = bucket_range(start, end, bucket)
+    if buckets:
+        queryset = queryset.filter(**{f"{field}__gte": start}, **upper)
+    return buckets, queryset.annotate(time_bucket=trunc)
+
+
+def _bucket_value(row, buckets):
+    value = row.pop("time_bucket")
+    # Some backends return a datetime when truncating a date
+    if isinstance(value, datetime) and not isinstance(buckets[0], datetime):
+        value = value.date()
+    return value
+
+
+def _fill(buckets, bucket, totals, measures):
+    empty = dict.fromkeys(measures, 0)
+    return [
+        {
+            "bucket": value,
+            "label": bucket_label(value, bucket),
+            **{
+                name: (amount if amount is not None else 0)
+                for name, amount in totals.get(value, empty).items()
+            },
+        }
+        for value in buckets
+    ]
+
+
+def aggregate_by_bucket(queryset, field, bucket, start, end, **measures):
+    """
+    Aggregate a queryset per time bucket of ``field``.
+
+    Rows with ``field`` from ``start`` through ``end`` (inclusive) are
+    grouped by bucket and aggregated with ``measures`` (name -> aggregate
+    expression). Returns one dict per bucket, from the one containing
+    ``start`` through the one containing ``end``, in order, with ``bucket``
+    (its start), ``label`` and the measures; buckets without rows have every
+    measure set to 0. Rows outside the range are never counted, even when
+    they fall in the first or last bucket.
+
+    ``start`` and ``end`` are dates when ``field`` is a date field and
+    datetimes or dates when it is a datetime field; a date starts at its
+    midnight as ``start`` and includes the whole day as ``end``.
+    """
+    if not measures:
+        raise ValueError("At least one measure is required")
+
+    buckets, queryset = _bucket_queryset(queryset, field, bucket, start, end)
+    if not buckets:
+        return []
+
+    totals = {}
+    for row in queryset.values("time_bucket").annotate(**measures).order_by():
+        totals[_bucket_value(row, buckets)] = row
+    return _fill(buckets, bucket, totals, measures)
+
+
+def aggregate_series_by_bucket(
+    queryset, field, bucket, start, end, series, series_values=(), **measures
+):
+    """
+    Aggregate a queryset per value of ``series`` and time bucket of ``field``.
+
+    Like aggregate_by_bucket, but one query returns a gap-filled list of
+    buckets per value of the ``series`` field, as a dict. Values in
+    ``series_values`` get a series even if they have no rows.
+    """
+    if not measures:
+        raise ValueError("At least one measure is required")
+
+    buckets, queryset = _bucket_queryset(queryset, field, bucket, start, end)
+    if not buckets:
+        return {value: [] for value in series_values}
+
+    totals = {value: {} for value in series_values}
+    rows = queryset.values(series, "time_bucket").annotate(**measures).order_by()
+    for row in rows:
+        value = row.pop(series)
+        totals.setdefault(value, {})[_bucket_value(row, buckets)] = row
+    return {
+        value: _fill(buckets, bucket, series_totals, measures)
+        for value, series_totals in totals.items()
+    }
@@ -3,7 +3,9 @@ from rest_framework.routers import DefaultRouter
 
 from .charts.chart_views import (
     AdminDashboardView,
+    BatchChartView,
     BookingsOverTimeChartView,
+    CohortRetentionChartView,
     EmployeeReportView,
     GenreDistributionChartView,
     ModeratorDashboardView,
@@ -11,8 +13,11 @@ from .charts.chart_views import (
     MovieRatingsChartView,
     MovieReportView,
     ReportListView,
+    RFMSegmentsChartView,
     SalesReportView,
+    TheaterOccupancyChartView,
     TicketTypesChartView,
+    VisitIntervalsChartView,
 )
 from .views import (
     DashboardLayoutViewSet,
@@ -24,6 +29,7 @@ from .views import (
     MetricViewSet,
     ReportTemplateViewSet,
     RoleBasedDashboardView,
+    ShowForecastView,
     download_generated_report,
     generate_report_api,
 )
@@ -66,6 +72,27 @@ chart_urlpatterns = [
         MonthlyRevenueChartView.as_view(),
         name="monthly-revenue-chart",
     ),
+    path(
+        "charts/cohort-retention/",
+        CohortRetentionChartView.as_view(),
+        name="cohort-retention-chart",
+    ),
+    path(
+        "charts/visit-intervals/",
+        VisitIntervalsChartView.as_view(),
+        name="visit-intervals-chart",
+    ),
+    path(
+        "charts/rfm-segments/",
+        RFMSegmentsChartView.as_view(),
+        name="rfm-segments-chart",
+    ),
+    path("charts/batch/", BatchChartView.as_view(), name="batch-chart"),
+    path(
+        "charts/theater-occupancy/",
+        TheaterOccupancyChartView.as_view(),
+        name="theater-occupancy-chart",
+    ),
 ]
 
 urlpatterns = [
@@ -76,6 +103,7 @@ urlpatterns = [
         "dashboard-metrics/", DashboardMetricsView.as_view(), name="dashboard-metrics"
     ),
     path("role-dashboard/", RoleBasedDashboardView.as_view(), name="role-dashboard"),
+    path("forecasts/shows/", ShowForecastView.as_view(), name="show-forecasts"),
     path("generate-report/", GenerateReportView.as_view(), name="generate-report"),
     path(
         "admin-dashboard/",
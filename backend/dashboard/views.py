@@ -2,23 +2,20 @@ import logging
 import os
 from datetime import datetime, timedelta
 
-from bookings.models import Booking, Ticket
-from coupons.models import Coupon
 from django.conf import settings
-from django.db.models import Avg, Count, Sum
+from django.db.models import F
 from django.http import FileResponse, HttpResponse
+from django.urls import reverse
 from django.utils import timezone
 from django.views.generic import TemplateView
-from employees.models import EmployeeProfile, PerformanceReview
-from movies.models import Movie, Show, Theater
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from users.models import CustomUser
 from users.permissions import IsAdminOrModerator
 
+from .dashboard_cache import get_dashboard_payload
 from .models import (
     DashboardLayout,
     GeneratedReport,
@@ -26,7 +23,11 @@ from .models import (
     MetricValue,
     ReportTemplate,
 )
-from .report_generators import generate_pdf_report, generate_report_pdf
+from .forecasting import get_show_forecasts
+from .metric_registry import registry
+from .metrics import MetricCalculator
+from .report_queue import enqueue_report, get_report_status
+from .retention import get_values
 from .serializers import (
     DashboardLayoutSerializer,
     DashboardMetricsSerializer,
@@ -85,19 +86,80 @@ class MetricViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=["get"])
     def values(self, request, pk=None):
-        """Get historical values for a specific metric."""
+        """
+        Get historical values for a specific metric.
+
+        The resolution (raw, hourly, daily or monthly) is chosen from the
+        requested range unless given with ``resolution``, and at most
+        ``max_points`` values are returned.
+        """
         metric = self.get_object()
 
         # Get date range from query parameters or use default (last 30 days)
-        days = int(request.query_params.get("days", 30))
-        start_date = timezone.now() - timedelta(days=days)
+        max_points_limit = getattr(settings, "METRIC_VALUES_MAX_POINTS", 500)
+        try:
+            days = int(request.query_params.get("days", 30))
+            max_points = int(request.query_params.get("max_points", max_points_limit))
+        except ValueError:
+            return Response(
+                {"error": "days and max_points must be whole numbers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if days < 1 or max_points < 1:
+            return Response(
+                {"error": "days and max_points must be at least 1"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        max_points = min(max_points, max_points_limit)
+
+        now = timezone.now()
+        start_date = now - timedelta(days=days)
+
+        resolution = request.query_params.get("resolution")
+        if resolution is not None:
+            resolution = resolution.upper()
+            if resolution not in MetricValue.Resolution.values:
+                return Response(
+                    {"error": f"Unknown resolution: {resolution}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        values = MetricValue.objects.filter(
-            metric=metric, timestamp__gte=start_date
-        ).order_by("timestamp")
+        resolution, values = get_values(
+            metric, start_date, resolution=resolution, max_points=max_points, now=now
+        )
 
         serializer = MetricValueSerializer(values, many=True)
-        return Response(serializer.data)
+        response = Response(serializer.data)
+        response["X-Metric-Resolution"] = resolution
+        return response
+
+    @action(detail=False, methods=["get"])
+    def costs(self, request):
+        """
+        List metrics by how long their last calculation took, with its query
+        count and the registered computation behind each metric.
+        """
+        metrics = self.get_queryset().order_by(
+            F("last_calculation_ms").desc(nulls_last=True)
+        )
+
+        data = []
+        for metric in metrics:
+            definition = registry.get(metric.calculation_method)
+            data.append(
+                {
+                    "id": metric.id,
+                    "name": metric.name,
+                    "calculation_method": metric.calculation_method,
+                    "registered": definition is not None,
+                    "depends_on": definition.depends_on if definition else [],
+                    "ttl": definition.ttl if definition else None,
+                    "last_calculated_at": metric.last_calculated_at,
+                    "last_calculation_ms": metric.last_calculation_ms,
+                    "last_query_count": metric.last_query_count,
+                }
+            )
+        return Response(data)
 
     @action(detail=True, methods=["post"])
     def calculate(self, request, pk=None):
@@ -201,31 +263,19 @@ class DashboardMetricsView(APIView):
         else:  # customer
             metrics = Metric.objects.filter(for_customers=True, is_active=True)
 
-        # Get the latest value for each metric
+        metrics = metrics.select_related("latest_value")
+
         metric_values = {}
         for metric in metrics:
-            try:
-                latest_value = MetricValue.objects.filter(metric=metric).latest(
-                    "timestamp"
-                )
-
-                value_data = {
-                    "timestamp": latest_value.timestamp,
-                }
-
-                # Include the appropriate value based on display type
-                if metric.display_type in ["NUMBER", "CURRENCY", "PERCENTAGE"]:
-                    value_data["value"] = latest_value.numeric_value
-                elif metric.display_type == "TEXT":
-                    value_data["value"] = latest_value.string_value
-                elif metric.display_type in ["CHART_LINE", "CHART_BAR", "CHART_PIE"]:
-                    value_data["value"] = latest_value.json_value
-
-                metric_values[metric.id] = value_data
-
-            except MetricValue.DoesNotExist:
+            latest_value = metric.latest_value
+            if latest_value is None:
                 # No value exists for this metric
                 metric_values[metric.id] = {"timestamp": None, "value": None}
+            else:
+                metric_values[metric.id] = {
+                    "timestamp": latest_value.timestamp,
+                    "value": metric.get_value(latest_value),
+                }
 
         # Return metrics and their values
         serializer = DashboardMetricsSerializer(
@@ -238,91 +288,39 @@ class RoleBasedDashboardView(APIView):
     """
     View to provide role-specific dashboard data.
     Returns different sets of metrics based on the user's role.
+
+    Payloads are cached per role (see dashboard/dashboard_cache.py); the
+    X-Dashboard-Cache header tells whether the response was fresh from the
+    cache (HIT), a stale copy served while it is rebuilt (STALE) or built
+    for this request (MISS).
     """
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request, format=None):
         try:
-            user = request.user
-
-            # Determine role-specific metrics
-            if user.is_staff:
-                # Admin dashboard
-                response_data = self.get_admin_dashboard_data(request)
-            elif user.is_moderator:
-                # Moderator dashboard
-                response_data = self.get_moderator_dashboard_data(request)
-            elif user.is_salesman:
-                # Salesman dashboard
-                response_data = self.get_salesman_dashboard_data(request)
-            else:
-                # Customer dashboard
-                response_data = self.get_customer_dashboard_data(request)
+            role = Metric.get_dashboard_role(request.user)
+            response_data, cache_status = get_dashboard_payload(
+                role, lambda: self.get_dashboard_data(role)
+            )
 
-            return Response(response_data)
+            response = Response(response_data)
+            response["X-Dashboard-Cache"] = cache_status
+            return response
         except Exception as e:
             return Response(
                 {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def get_admin_dashboard_data(self, request):
-        """Get dashboard data for admin users"""
-        # Get metrics visible to admins
-        metrics = Metric.objects.filter(for_admins=True)
-
-        # Get the latest value for each metric
-        metrics_data = []
-        for metric in metrics:
-            latest_value = (
-                MetricValue.objects.filter(metric=metric).order_by("-timestamp").first()
-            )
-
-            metric_data = {
-                "id": metric.id,
-                "name": metric.name,
-                "description": metric.description,
-                "category": metric.category,
-                "display_type": metric.display_type,
-            }
-
-            if latest_value:
-                if metric.display_type in [
-                    Metric.DisplayType.NUMBER,
-                    Metric.DisplayType.CURRENCY,
-                    Metric.DisplayType.PERCENTAGE,
-                ]:
-                    metric_data["value"] = latest_value.numeric_value
-                elif metric.display_type == Metric.DisplayType.TEXT:
-                    metric_data["value"] = latest_value.string_value
-                elif "CHART" in metric.display_type:  # Handle all chart types
-                    metric_data["value"] = latest_value.json_value
-                metric_data["timestamp"] = latest_value.timestamp
-
-            metrics_data.append(metric_data)
+    def get_dashboard_data(self, role):
+        """Get the latest value of each metric visible to a role, by category"""
+        metrics = Metric.objects.filter(
+            **{Metric.ROLE_VISIBILITY[role]: True}
+        ).select_related("latest_value")
 
         # Organize metrics by category
         categories = {}
-        for metric in metrics_data:
-            category = metric["category"]
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(metric)
-
-        return {"role": "admin", "categories": categories}
-
-    def get_moderator_dashboard_data(self, request):
-        """Get dashboard data for moderator users"""
-        # Get metrics visible to moderators
-        metrics = Metric.objects.filter(for_moderators=True)
-
-        # Get the latest value for each metric
-        metrics_data = []
         for metric in metrics:
-            latest_value = (
-                MetricValue.objects.filter(metric=metric).order_by("-timestamp").first()
-            )
-
             metric_data = {
                 "id": metric.id,
                 "name": metric.name,
@@ -331,120 +329,43 @@ class RoleBasedDashboardView(APIView):
                 "display_type": metric.display_type,
             }
 
+            latest_value = metric.latest_value
             if latest_value:
-                if metric.display_type in [
-                    Metric.DisplayType.NUMBER,
-                    Metric.DisplayType.CURRENCY,
-                    Metric.DisplayType.PERCENTAGE,
-                ]:
-                    metric_data["value"] = latest_value.numeric_value
-                elif metric.display_type == Metric.DisplayType.TEXT:
-                    metric_data["value"] = latest_value.string_value
-                elif "CHART" in metric.display_type:  # Handle all chart types
-                    metric_data["value"] = latest_value.json_value
+                metric_data["value"] = metric.get_value(latest_value)
                 metric_data["timestamp"] = latest_value.timestamp
 
-            metrics_data.append(metric_data)
+            categories.setdefault(metric.category, []).append(metric_data)
 
-        # Organize metrics by category
-        categories = {}
-        for metric in metrics_data:
-            category = metric["category"]
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(metric)
-
-        return {"role": "moderator", "categories": categories}
-
-    def get_salesman_dashboard_data(self, request):
-        """Get dashboard data for salesman users"""
-        # Get metrics visible to salesmen
-        metrics = Metric.objects.filter(for_salesmen=True)
+        return {"role": role, "categories": categories}
 
-        # Get the latest value for each metric
-        metrics_data = []
-        for metric in metrics:
-            latest_value = (
-                MetricValue.objects.filter(metric=metric).order_by("-timestamp").first()
-            )
 
-            metric_data = {
-                "id": metric.id,
-                "name": metric.name,
-                "description": metric.description,
-                "category": metric.category,
-                "display_type": metric.display_type,
-            }
-
-            if latest_value:
-                if metric.display_type in [
-                    Metric.DisplayType.NUMBER,
-                    Metric.DisplayType.CURRENCY,
-                    Metric.DisplayType.PERCENTAGE,
-                ]:
-                    metric_data["value"] = latest_value.numeric_value
-                elif metric.display_type == Metric.DisplayType.TEXT:
-                    metric_data["value"] = latest_value.string_value
-                elif "CHART" in metric.display_type:  # Handle all chart types
-                    metric_data["value"] = latest_value.json_value
-                metric_data["timestamp"] = latest_value.timestamp
-
-            metrics_data.append(metric_data)
-
-        # Organize metrics by category
-        categories = {}
-        for metric in metrics_data:
-            category = metric["category"]
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(metric)
-
-        return {"role": "salesman", "categories": categories}
-
-    def get_customer_dashboard_data(self, request):
-        """Get dashboard data for customer users"""
-        # Get metrics visible to customers
-        metrics = Metric.objects.filter(for_customers=True)
-
-        # Get the latest value for each metric
-        metrics_data = []
-        for metric in metrics:
-            latest_value = (
-                MetricValue.objects.filter(metric=metric).order_by("-timestamp").first()
-            )
-
-            metric_data = {
-                "id": metric.id,
-                "name": metric.name,
-                "description": metric.description,
-                "category": metric.category,
-                "display_type": metric.display_type,
-            }
+class ShowForecastView(APIView):
+    """
+    API endpoint forecasting the final ticket sales of upcoming shows.
 
-            if latest_value:
-                if metric.display_type in [
-                    Metric.DisplayType.NUMBER,
-                    Metric.DisplayType.CURRENCY,
-                    Metric.DisplayType.PERCENTAGE,
-                ]:
-                    metric_data["value"] = latest_value.numeric_value
-                elif metric.display_type == Metric.DisplayType.TEXT:
-                    metric_data["value"] = latest_value.string_value
-                elif "CHART" in metric.display_type:  # Handle all chart types
-                    metric_data["value"] = latest_value.json_value
-                metric_data["timestamp"] = latest_value.timestamp
+    Covers the shows starting in the next ``days`` days (default 14, at most
+    60), optionally only those of one ``theater`` or ``movie``.
+    """
 
-            metrics_data.append(metric_data)
+    permission_classes = [IsAdminOrModerator]
 
-        # Organize metrics by category
-        categories = {}
-        for metric in metrics_data:
-            category = metric["category"]
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(metric)
+    def get(self, request):
+        try:
+            days = int(request.query_params.get("days", 14))
+        except ValueError:
+            days = 14
+        if days < 1 or days > 60:
+            days = 14
+
+        forecasts = get_show_forecasts(days)
+        for field in ("theater", "movie"):
+            value = request.query_params.get(field)
+            if value is not None:
+                forecasts = [
+                    forecast for forecast in forecasts if str(forecast[field]) == value
+                ]
 
-        return {"role": "customer", "categories": categories}
+        return Response(forecasts)
 
 
 class ReportTemplateViewSet(viewsets.ModelViewSet):
@@ -487,6 +408,15 @@ class GeneratedReportViewSet(viewsets.ReadOnlyModelViewSet):
             # Regular users can only see their own reports
             return GeneratedReport.objects.filter(generated_by=user)
 
+    @action(detail=True, methods=["get"], url_path="status", url_name="status")
+    def report_status(self, request, pk=None):
+        """Get a report's generation status and progress, for polling."""
+        report = self.get_object()
+        data = get_report_status(report)
+        if report.file:
+            data["file_url"] = request.build_absolute_uri(report.file.url)
+        return Response(data)
+
     @action(detail=True, methods=["get"])
     def download(self, request, pk=None):
         """Download the generated report file."""
@@ -541,36 +471,29 @@ class GenerateReportView(APIView):
                     or (user.is_salesman and template.for_salesmen)
                     or (user.is_customer and template.for_customers)
                 ):
-                    # Create report record
+                    # Create the report and queue it for rendering
                     report = GeneratedReport.objects.create(
                         template=template,
                         name=name,
                         parameters=parameters,
                         generated_by=user,
-                        status="PROCESSING",
+                        status="QUEUED",
                     )
+                    enqueue_report(report)
 
-                    try:
-                        # Generate the report
-                        generate_report_pdf(report)
-
-                        # Return the created report details
-                        report_serializer = GeneratedReportSerializer(
-                            report, context={"request": request}
-                        )
-                        return Response(
-                            report_serializer.data, status=status.HTTP_201_CREATED
-                        )
-
-                    except Exception as e:
-                        logger.error(f"Error generating report: {str(e)}")
-                        report.status = "FAILED"
-                        report.error_message = str(e)
-                        report.save()
-                        return Response(
-                            {"error": f"Error generating report: {str(e)}"},
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        )
+                    # Return the report details; clients poll its status
+                    # unless an identical report's file was reused
+                    report_serializer = GeneratedReportSerializer(
+                        report, context={"request": request}
+                    )
+                    return Response(
+                        report_serializer.data,
+                        status=(
+                            status.HTTP_200_OK
+                            if report.status == GeneratedReport.Status.COMPLETED
+                            else status.HTTP_202_ACCEPTED
+                        ),
+                    )
                 else:
                     return Response(
                         {
@@ -588,280 +511,6 @@ class GenerateReportView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class MetricCalculator:
-    """
-    Helper class to calculate metric values based on their calculation method.
-    This allows for complex metrics to be calculated dynamically.
-    """
-
-    def calculate_metric(self, metric):
-        """Calculate a metric value based on its category and name."""
-        if not metric.is_active:
-            return None
-
-        # Sales metrics
-        if metric.category == "SALES":
-            return self._calculate_sales_metric(metric)
-
-        # Performance metrics
-        elif metric.category == "PERFORMANCE":
-            return self._calculate_performance_metric(metric)
-
-        # Customer metrics
-        elif metric.category == "CUSTOMER":
-            return self._calculate_customer_metric(metric)
-
-        # Inventory metrics
-        elif metric.category == "INVENTORY":
-            return self._calculate_inventory_metric(metric)
-
-        # Employee metrics
-        elif metric.category == "EMPLOYEE":
-            return self._calculate_employee_metric(metric)
-
-        # System metrics
-        elif metric.category == "SYSTEM":
-            return self._calculate_system_metric(metric)
-
-        return None
-
-    def _calculate_sales_metric(self, metric):
-        """Calculate sales-related metrics."""
-        if "total_sales" in metric.name.lower():
-            # Total sales (all time)
-            total = (
-                Booking.objects.exclude(status="CANCELLED").aggregate(
-                    total=Sum("total_amount")
-                )["total"]
-                or 0
-            )
-
-            self._store_metric_value(metric, numeric_value=total)
-            return total
-
-        elif "monthly_sales" in metric.name.lower():
-            # Monthly sales
-            start_date = timezone.now().replace(
-                day=1, hour=0, minute=0, second=0, microsecond=0
-            )
-            total = (
-                Booking.objects.filter(
-                    created_at__gte=start_date, status__in=["CONFIRMED", "COMPLETED"]
-                ).aggregate(total=Sum("total_amount"))["total"]
-                or 0
-            )
-
-            self._store_metric_value(metric, numeric_value=total)
-            return total
-
-        elif "daily_sales" in metric.name.lower():
-            # Daily sales
-            today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            total = (
-                Booking.objects.filter(
-                    created_at__gte=today, status__in=["CONFIRMED", "COMPLETED"]
-                ).aggregate(total=Sum("total_amount"))["total"]
-                or 0
-            )
-
-            self._store_metric_value(metric, numeric_value=total)
-            return total
-
-        elif "tickets_sold" in metric.name.lower():
-            # Total tickets sold
-            count = Ticket.objects.count()
-
-            self._store_metric_value(metric, numeric_value=count)
-            return count
-
-        elif "coupon_usage" in metric.name.lower():
-            # Coupon usage statistics
-            coupons = Coupon.objects.annotate(usage_count=Count("usages"))
-            data = {
-                "labels": [coupon.code for coupon in coupons],
-                "data": [coupon.usage_count for coupon in coupons],
-            }
-
-            self._store_metric_value(metric, json_value=data)
-            return data
-
-        return None
-
-    def _calculate_performance_metric(self, metric):
-        """Calculate performance-related metrics."""
-        if "popular_movies" in metric.name.lower():
-            # Most popular movies by ticket sales
-            movies = Movie.objects.annotate(
-                ticket_count=Count("shows__bookings__tickets")
-            ).order_by("-ticket_count")[:5]
-
-            data = {
-                "labels": [movie.title for movie in movies],
-                "data": [movie.ticket_count for movie in movies],
-            }
-
-            self._store_metric_value(metric, json_value=data)
-            return data
-
-        elif "theater_utilization" in metric.name.lower():
-            # Theater utilization
-            theaters = Theater.objects.all()
-            utilization_data = []
-
-            for theater in theaters:
-                total_capacity = theater.capacity * theater.shows.count()
-                if total_capacity > 0:
-                    tickets_sold = Ticket.objects.filter(
-                        booking__show__theater=theater
-                    ).count()
-                    utilization = (tickets_sold / total_capacity) * 100
-                    utilization_data.append(
-                        {"theater": theater.name, "utilization": utilization}
-                    )
-
-            data = {
-                "labels": [item["theater"] for item in utilization_data],
-                "data": [item["utilization"] for item in utilization_data],
-            }
-
-            self._store_metric_value(metric, json_value=data)
-            return data
-
-        return None
-
-    def _calculate_customer_metric(self, metric):
-        """Calculate customer-related metrics."""
-        if "total_customers" in metric.name.lower():
-            # Total customer count
-            count = CustomUser.objects.filter(role="CUSTOMER").count()
-
-            self._store_metric_value(metric, numeric_value=count)
-            return count
-
-        elif "new_customers" in metric.name.lower():
-            # New customers in the last 30 days
-            start_date = timezone.now() - timedelta(days=30)
-            count = CustomUser.objects.filter(
-                role="CUSTOMER", date_joined__gte=start_date
-            ).count()
-
-            self._store_metric_value(metric, numeric_value=count)
-            return count
-
-        elif "customer_retention" in metric.name.lower():
-            # Customer retention rate (customers with > 1 booking)
-            total_customers = CustomUser.objects.filter(role="CUSTOMER").count()
-            if total_customers > 0:
-                repeat_customers = (
-                    CustomUser.objects.filter(role="CUSTOMER", bookings__isnull=False)
-                    .annotate(booking_count=Count("bookings"))
-                    .filter(booking_count__gt=1)
-                    .count()
-                )
-
-                retention_rate = (repeat_customers / total_customers) * 100
-
-                self._store_metric_value(metric, numeric_value=retention_rate)
-                return retention_rate
-
-            return 0
-
-        return None
-
-    def _calculate_inventory_metric(self, metric):
-        """Calculate inventory-related metrics."""
-        if "active_movies" in metric.name.lower():
-            # Number of active movies
-            count = Movie.objects.filter(is_active=True).count()
-
-            self._store_metric_value(metric, numeric_value=count)
-            return count
-
-        elif "upcoming_shows" in metric.name.lower():
-            # Number of upcoming shows
-            count = Show.objects.filter(start_time__gte=timezone.now()).count()
-
-            self._store_metric_value(metric, numeric_value=count)
-            return count
-
-        return None
-
-    def _calculate_employee_metric(self, metric):
-        """Calculate employee-related metrics."""
-        if "total_employees" in metric.name.lower():
-            # Total employee count
-            count = EmployeeProfile.objects.count()
-
-            self._store_metric_value(metric, numeric_value=count)
-            return count
-
-        elif "department_distribution" in metric.name.lower():
-            # Employee distribution by department
-            from employees.models import Department
-
-            departments = Department.objects.annotate(
-                employee_count=Count("positions__employees")
-            )
-
-            data = {
-                "labels": [dept.name for dept in departments],
-                "data": [dept.employee_count for dept in departments],
-            }
-
-            self._store_metric_value(metric, json_value=data)
-            return data
-
-        elif "average_salary" in metric.name.lower():
-            # Average employee salary
-            avg_salary = (
-                EmployeeProfile.objects.aggregate(avg=Avg("current_salary"))["avg"] or 0
-            )
-
-            self._store_metric_value(metric, numeric_value=avg_salary)
-            return avg_salary
-
-        elif "performance_ratings" in metric.name.lower():
-            # Average performance ratings
-            avg_rating = (
-                PerformanceReview.objects.aggregate(avg=Avg("overall_rating"))["avg"]
-                or 0
-            )
-
-            self._store_metric_value(metric, numeric_value=avg_rating)
-            return avg_rating
-
-        return None
-
-    def _calculate_system_metric(self, metric):
-        """Calculate system-related metrics."""
-        if "active_users" in metric.name.lower():
-            # Count of active users
-            count = CustomUser.objects.filter(is_active=True).count()
-
-            self._store_metric_value(metric, numeric_value=count)
-            return count
-
-        elif "admin_users" in metric.name.lower():
-            # Count of admin users
-            count = CustomUser.objects.filter(role="ADMIN").count()
-
-            self._store_metric_value(metric, numeric_value=count)
-            return count
-
-        return None
-
-    def _store_metric_value(
-        self, metric, numeric_value=None, string_value=None, json_value=None
-    ):
-        """Store the calculated metric value in the database."""
-        MetricValue.objects.create(
-            metric=metric,
-            numeric_value=numeric_value,
-            string_value=string_value,
-            json_value=json_value,
-        )
-
-
 class EmployeePerformanceDashboardView(TemplateView):
     """
     View to render the employee performance dashboard with advanced visualizations.
@@ -911,18 +560,6 @@ def generate_report_api(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Generate a temporary file path for the report
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{report_type}_report_{timestamp}.pdf"
-
-        # Create reports directory if it doesn't exist
-        reports_dir = os.path.join(settings.MEDIA_ROOT, "reports")
-        os.makedirs(reports_dir, exist_ok=True)
-
-        # Full path for the report file
-        report_path = os.path.join(reports_dir, filename)
-
-        # Generate the report
         report_data = {
             "title": title,
             "type": report_type,
@@ -930,25 +567,38 @@ def generate_report_api(request):
             "end_date": end_date,
             "include_charts": include_charts,
             "sections": sections,
-            "user": request.user.username,
+            "user": request.user.email,
             "generated_at": datetime.now().isoformat(),
         }
 
-        # Generate PDF report
-        generate_pdf_report(report_data, report_path)
+        # Queue the report; it has no template, its parameters are the data
+        report = GeneratedReport.objects.create(
+            name=title,
+            parameters=report_data,
+            generated_by=request.user,
+            status="QUEUED",
+        )
+        enqueue_report(report)
+        completed = report.status == GeneratedReport.Status.COMPLETED
 
         # Return the report information
         return Response(
             {
                 "success": True,
-                "message": "Report generated successfully",
+                "message": (
+                    "Report generated" if completed else "Report queued for generation"
+                ),
                 "report": {
-                    "filename": filename,
-                    "url": f"/media/reports/{filename}",
+                    "id": report.id,
                     "type": report_type,
-                    "generated_at": datetime.now().isoformat(),
+                    "status": report.status,
+                    "progress": report.progress,
+                    "status_url": request.build_absolute_uri(
+                        reverse("generated-report-status", args=[report.id])
+                    ),
                 },
-            }
+            },
+            status=status.HTTP_200_OK if completed else status.HTTP_202_ACCEPTED,
         )
 
     except Exception as e:
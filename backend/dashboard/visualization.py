@@ -9,10 +9,15 @@ from django.core.cache import cache
 from django.db.models import Avg, Count, Sum
 from django.utils import timezone
 
-from bookings.models import Booking, Ticket
+from bookings.archive import BookingHistory
+from bookings.models import DailySales
 from movies.models import Movie
 from reviews.models import Review
 
+from .cohorts import get_customer_analytics
+from .occupancy import get_occupancy_rows, summarize
+from .time_buckets import aggregate_by_bucket
+
 
 def random_rgb():
     """Generate a random RGB color."""
@@ -31,6 +36,11 @@ def get_pie_chart_colors(count):
     return background_colors, border_colors
 
 
+def chart_cache_key(chart, *params):
+    """Return the cache key of a chart's data for the given parameters."""
+    return "_".join([f"{chart}_chart_data", *map(str, params)])
+
+
 def get_movie_ratings_chart_data():
     """
     Generate data for a chart showing movie ratings.
@@ -38,7 +48,7 @@ def get_movie_ratings_chart_data():
     Returns:
         dict: Chart.js formatted data for movie ratings
     """
-    cache_key = "movie_ratings_chart_data"
+    cache_key = chart_cache_key("movie_ratings")
     cached_data = cache.get(cache_key)
 
     if cached_data:
@@ -108,50 +118,30 @@ def get_bookings_over_time_chart_data(days=30):
     Returns:
         dict: Chart.js formatted data for bookings over time
     """
-    cache_key = f"bookings_over_time_chart_data_{days}"
+    cache_key = chart_cache_key("bookings_over_time", days)
     cached_data = cache.get(cache_key)
 
     if cached_data:
         return cached_data
 
     # Calculate date range
-    end_date = timezone.now().date()
+    end_date = timezone.localdate()
     start_date = end_date - timedelta(days=days - 1)
 
-    # Generate date labels
-    date_labels = []
-    current_date = start_date
-    while current_date <= end_date:
-        date_labels.append(current_date.strftime("%Y-%m-%d"))
-        current_date += timedelta(days=1)
-
     # Get bookings by day
-    bookings_by_day = (
-        Booking.objects.filter(
-            created_at__date__gte=start_date, created_at__date__lte=end_date
-        )
-        .extra({"booking_date": "date(created_at)"})
-        .values("booking_date")
-        .annotate(count=Count("id"), revenue=Sum("total_price"))
-        .order_by("booking_date")
+    bookings_by_day = aggregate_by_bucket(
+        DailySales.objects.all(),
+        "date",
+        "day",
+        start_date,
+        end_date,
+        count=Sum("bookings"),
+        revenue=Sum("revenue"),
     )
 
-    # Convert to dict for faster lookup
-    bookings_dict = {
-        item["booking_date"].strftime("%Y-%m-%d"): item for item in bookings_by_day
-    }
-
-    # Prepare datasets
-    booking_counts = []
-    booking_revenues = []
-
-    for date_label in date_labels:
-        if date_label in bookings_dict:
-            booking_counts.append(bookings_dict[date_label]["count"])
-            booking_revenues.append(float(bookings_dict[date_label]["revenue"] or 0))
-        else:
-            booking_counts.append(0)
-            booking_revenues.append(0)
+    date_labels = [day["label"] for day in bookings_by_day]
+    booking_counts = [day["count"] for day in bookings_by_day]
+    booking_revenues = [float(day["revenue"]) for day in bookings_by_day]
 
     chart_data = {
         "type": "line",
@@ -208,24 +198,21 @@ def get_genre_distribution_chart_data():
     Returns:
         dict: Chart.js formatted data for genre distribution
     """
-    cache_key = "genre_distribution_chart_data"
+    cache_key = chart_cache_key("genre_distribution")
     cached_data = cache.get(cache_key)
 
     if cached_data:
         return cached_data
 
     # Get bookings by genre
+    # A movie with several genres counts towards each of them
     genre_data = (
-        Movie.objects.values("genre")
-        .annotate(
-            movie_count=Count("id", distinct=True),
-            booking_count=Count("shows__booking", distinct=True),
-            revenue=Sum("shows__booking__total_price"),
-        )
+        DailySales.objects.values("movie__genres__name")
+        .annotate(booking_count=Sum("bookings"), revenue=Sum("gross_amount"))
         .order_by("-booking_count")
     )
 
-    labels = [item["genre"] or "Unknown" for item in genre_data]
+    labels = [item["movie__genres__name"] or "Unknown" for item in genre_data]
     booking_counts = [item["booking_count"] or 0 for item in genre_data]
     revenues = [float(item["revenue"] or 0) for item in genre_data]
 
@@ -271,21 +258,20 @@ def get_ticket_types_chart_data():
     Returns:
         dict: Chart.js formatted data for ticket types
     """
-    cache_key = "ticket_types_chart_data"
+    cache_key = chart_cache_key("ticket_types")
     cached_data = cache.get(cache_key)
 
     if cached_data:
         return cached_data
 
-    # Get tickets by type
-    ticket_data = (
-        Ticket.objects.values("seat_category")
-        .annotate(count=Count("id"), revenue=Sum("price"))
-        .order_by("-count")
+    # Get tickets by type, archived bookings included
+    ticket_data = sorted(
+        BookingHistory().aggregate_tickets("seat_category"),
+        key=lambda item: -item["tickets"],
     )
 
     labels = [item["seat_category"] for item in ticket_data]
-    ticket_counts = [item["count"] for item in ticket_data]
+    ticket_counts = [item["tickets"] for item in ticket_data]
     revenues = [float(item["revenue"] or 0) for item in ticket_data]
 
     background_colors, border_colors = get_pie_chart_colors(len(labels))
@@ -333,57 +319,33 @@ def get_monthly_revenue_chart_data(months=12):
     Returns:
         dict: Chart.js formatted data for monthly revenue
     """
-    cache_key = f"monthly_revenue_chart_data_{months}"
+    cache_key = chart_cache_key("monthly_revenue", months)
     cached_data = cache.get(cache_key)
 
     if cached_data:
         return cached_data
 
     # Calculate date range
-    end_date = timezone.now().date().replace(day=1)
-    start_date = (end_date - timedelta(days=1)).replace(day=1)
+    end_date = timezone.localdate()
+    start_date = (end_date.replace(day=1) - timedelta(days=1)).replace(day=1)
     for _ in range(months - 1):
         start_date = (start_date - timedelta(days=1)).replace(day=1)
 
-    # Generate month labels
-    month_labels = []
-    current_date = start_date
-    while current_date <= end_date:
-        month_labels.append(current_date.strftime("%Y-%m"))
-        next_month = current_date.month + 1
-        next_year = current_date.year
-        if next_month > 12:
-            next_month = 1
-            next_year += 1
-        current_date = current_date.replace(year=next_year, month=next_month)
-
-    # Get revenue by month
-    bookings_by_month = (
-        Booking.objects.filter(created_at__date__gte=start_date)
-        .extra({"month": "strftime('%%Y-%%m', created_at)"})
-        .values("month")
-        .annotate(
-            count=Count("id"),
-            gross_revenue=Sum("total_price"),
-            net_revenue=Sum("subtotal"),
-        )
-        .order_by("month")
+    # Get revenue by month: gross is every booking made, net only what was
+    # confirmed and not refunded
+    revenue_by_month = aggregate_by_bucket(
+        DailySales.objects.all(),
+        "date",
+        "month",
+        start_date,
+        end_date,
+        gross_revenue=Sum("gross_amount"),
+        net_revenue=Sum("revenue"),
     )
 
-    # Convert to dict for faster lookup
-    revenue_dict = {item["month"]: item for item in bookings_by_month}
-
-    # Prepare datasets
-    gross_revenues = []
-    net_revenues = []
-
-    for month in month_labels:
-        if month in revenue_dict:
-            gross_revenues.append(float(revenue_dict[month]["gross_revenue"] or 0))
-            net_revenues.append(float(revenue_dict[month]["net_revenue"] or 0))
-        else:
-            gross_revenues.append(0)
-            net_revenues.append(0)
+    month_labels = [month["label"] for month in revenue_by_month]
+    gross_revenues = [float(month["gross_revenue"]) for month in revenue_by_month]
+    net_revenues = [float(month["net_revenue"]) for month in revenue_by_month]
 
     chart_data = {
         "type": "bar",
@@ -420,3 +382,235 @@ def get_monthly_revenue_chart_data(months=12):
     cache.set(cache_key, chart_data, 3600)
 
     return chart_data
+
+
+def get_theater_occupancy_chart_data(days=30, group_by="theater"):
+    """
+    Generate data for a chart showing seat utilization of past shows.
+
+    Args:
+        days: Number of days of shows to include
+        group_by: Dimension to break utilization down by (theater, show_type,
+            weekday or hour)
+
+    Returns:
+        dict: Chart.js formatted data for theater occupancy
+    """
+    cache_key = chart_cache_key("theater_occupancy", days, group_by)
+    cached_data = cache.get(cache_key)
+
+    if cached_data:
+        return cached_data
+
+    now = timezone.now()
+    rows = get_occupancy_rows(start=now - timedelta(days=days), end=now)
+    groups = summarize(rows, group_by)
+
+    chart_data = {
+        "type": "bar",
+        "data": {
+            "labels": [group["label"] for group in groups],
+            "datasets": [
+                {
+                    "label": "Utilization (%)",
+                    "data": [group["utilization"] for group in groups],
+                    "backgroundColor": "rgba(153, 102, 255, 0.5)",
+                    "borderColor": "rgba(153, 102, 255, 1)",
+                    "borderWidth": 1,
+                    "yAxisID": "y",
+                },
+                {
+                    "label": "Shows",
+                    "data": [group["shows"] for group in groups],
+                    "type": "line",
+                    "backgroundColor": "rgba(255, 159, 64, 0.2)",
+                    "borderColor": "rgba(255, 159, 64, 1)",
+                    "borderWidth": 1,
+                    "yAxisID": "y1",
+                },
+            ],
+        },
+        "options": {
+            "scales": {
+                "y": {
+                    "beginAtZero": True,
+                    "max": 100,
+                    "position": "left",
+                    "title": {"display": True, "text": "Seats Sold (%)"},
+                },
+                "y1": {
+                    "beginAtZero": True,
+                    "position": "right",
+                    "title": {"display": True, "text": "Shows"},
+                    "grid": {"drawOnChartArea": False},
+                },
+            }
+        },
+    }
+
+    # Cache for 1 hour
+    cache.set(cache_key, chart_data, 3600)
+
+    return chart_data
+
+
+def get_cohort_retention_chart_data(months=12):
+    """
+    Generate data for a chart showing monthly cohort retention curves.
+
+    Args:
+        months: Number of most recent acquisition cohorts to include
+
+    Returns:
+        dict: Chart.js formatted data for cohort retention
+    """
+    cache_key = chart_cache_key("cohort_retention", months)
+    cached_data = cache.get(cache_key)
+
+    if cached_data:
+        return cached_data
+
+    cohorts = get_customer_analytics()["cohorts"][-months:]
+    length = max((len(cohort["retention"]) for cohort in cohorts), default=0)
+
+    chart_data = {
+        "type": "line",
+        "data": {
+            "labels": [f"Month {offset}" for offset in range(length)],
+            "datasets": [
+                {
+                    "label": f"{cohort['cohort']} ({cohort['customers']} customers)",
+                    "data": cohort["retention"],
+                    "borderColor": random_rgba(1),
+                    "fill": False,
+                }
+                for cohort in cohorts
+            ],
+        },
+        "options": {
+            "scales": {
+                "y": {
+                    "beginAtZero": True,
+                    "max": 100,
+                    "title": {"display": True, "text": "Customers Returning (%)"},
+                }
+            }
+        },
+    }
+
+    # Cache for 1 hour
+    cache.set(cache_key, chart_data, 3600)
+
+    return chart_data
+
+
+def get_visit_intervals_chart_data():
+    """
+    Generate data for a chart showing the time between customer visits.
+
+    Returns:
+        dict: Chart.js formatted data for visit intervals
+    """
+    cache_key = chart_cache_key("visit_intervals")
+    cached_data = cache.get(cache_key)
+
+    if cached_data:
+        return cached_data
+
+    intervals = get_customer_analytics()["visit_intervals"]
+
+    chart_data = {
+        "type": "bar",
+        "data": {
+            "labels": intervals["labels"],
+            "datasets": [
+                {
+                    "label": "Repeat Visits",
+                    "data": intervals["counts"],
+                    "backgroundColor": "rgba(75, 192, 192, 0.5)",
+                    "borderColor": "rgba(75, 192, 192, 1)",
+                    "borderWidth": 1,
+                }
+            ],
+        },
+        "options": {
+            "scales": {
+                "y": {
+                    "beginAtZero": True,
+                    "title": {"display": True, "text": "Visits"},
+                }
+            }
+        },
+        "summary": {
+            "visits": intervals["visits"],
+            "mean_days": intervals["mean_days"],
+            "median_days": intervals["median_days"],
+        },
+    }
+
+    # Cache for 1 hour
+    cache.set(cache_key, chart_data, 3600)
+
+    return chart_data
+
+
+def get_rfm_segments_chart_data():
+    """
+    Generate data for a chart showing customers by RFM segment.
+
+    Returns:
+        dict: Chart.js formatted data for RFM segments
+    """
+    cache_key = chart_cache_key("rfm_segments")
+    cached_data = cache.get(cache_key)
+
+    if cached_data:
+        return cached_data
+
+    segments = get_customer_analytics()["rfm"]
+
+    chart_data = {
+        "type": "bar",
+        "data": {
+            "labels": [segment["segment"] for segment in segments],
+            "datasets": [
+                {
+                    "label": "Customers",
+                    "data": [segment["customers"] for segment in segments],
+                    "backgroundColor": "rgba(54, 162, 235, 0.5)",
+                    "borderColor": "rgba(54, 162, 235, 1)",
+                    "borderWidth": 1,
+                    "yAxisID": "y",
+                },
+                {
+                    "label": "Average Spend",
+                    "data": [segment["average_monetary"] for segment in segments],
+                    "type": "line",
+                    "backgroundColor": "rgba(255, 99, 132, 0.2)",
+                    "borderColor": "rgba(255, 99, 132, 1)",
+                    "borderWidth": 1,
+                    "yAxisID": "y1",
+                },
+            ],
+        },
+        "options": {
+            "scales": {
+                "y": {
+                    "beginAtZero": True,
+                    "position": "left",
+                    "title": {"display": True, "text": "Customers"},
+                },
+                "y1": {
+                    "beginAtZero": True,
+                    "position": "right",
+                    "title": {"display": True, "text": "Average Spend"},
+                    "grid": {"drawOnChartArea": False},
+                },
+            }
+        },
+    }
+
+    # Cache for 1 hour
+    cache.set(cache_key, chart_data, 3600)
+
+    return chart_data
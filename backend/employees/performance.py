@@ -0,0 +1,210 @@
+"""
+Employee performance analytics.
+
+Trends are read with one grouped query over PerformanceMetric, however many
+metrics, employees and days they cover: rows are grouped by employee (when
+several are compared) and by day, week or month of ``metric_date``, and
+every metric is aggregated in the same query. Buckets without metrics are
+filled in with zeros (see dashboard/time_buckets.py).
+
+The leaderboard aggregates every employee's metrics over a window in one
+query, then ranks them in Python: each employee gets a percentile rank per
+metric and is ranked by the average of those. Unlike trends, the leaderboard
+averages every metric, revenue included, as the comparison endpoint always
+has. Leaderboards are cached per metric set and window until a
+PerformanceMetric is written.
+"""
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Sum
+
+from dashboard.time_buckets import aggregate_by_bucket, aggregate_series_by_bucket
+from xcounter.cache_utils import bump_version_stamp, get_version_stamp
+
+from .models import PerformanceMetric
+
+PERFORMANCE_STAMP = "employee_performance"
+LEADERBOARD_CACHE_TIMEOUT = 60 * 15
+
+METRICS = (
+    "bookings_processed",
+    "revenue_generated",
+    "customer_satisfaction",
+    "response_time_minutes",
+    "task_completion_rate",
+)
+
+# Metrics that add up over a period; the others are averaged
+SUMMED_METRICS = ("revenue_generated",)
+
+# Metrics where a lower value is better
+LOWER_IS_BETTER = ("response_time_minutes",)
+
+TREND_BUCKETS = ("day", "week", "month")
+
+
+def get_default_bucket(days):
+    """Return the trend bucket size for a range of ``days`` days."""
+    if days <= 90:
+        return "day"
+    if days <= 366:
+        return "week"
+    return "month"
+
+
+def get_metric_aggregate(metric):
+    """Return the aggregate of a metric over a period."""
+    return (Sum if metric in SUMMED_METRICS else Avg)(metric)
+
+
+def get_trends(metrics, start_date, end_date, bucket="day", employee_ids=None):
+    """
+    Return performance trends as a list of series.
+
+    There is one series per metric, or per employee and metric when more
+    than one employee id is given; ``employee_ids`` of None or empty covers
+    all employees. Each series is a dict with ``employee_id``, ``metric``
+    and ``data``, a list of ``{"date", "value", "count"}`` per bucket.
+    """
+    queryset = PerformanceMetric.objects.all()
+    if employee_ids:
+        queryset = queryset.filter(employee__in=employee_ids)
+
+    # Annotations can't share names with model fields
+    measures = {f"{metric}_value": get_metric_aggregate(metric) for metric in metrics}
+    measures["count"] = Count("id")
+
+    if employee_ids and len(employee_ids) > 1:
+        rows_by_employee = aggregate_series_by_bucket(
+            queryset,
+            "metric_date",
+            bucket,
+            start_date,
+            end_date,
+            "employee",
+            series_values=employee_ids,
+            **measures,
+        )
+    else:
+        rows_by_employee = {
+            employee_ids[0] if employee_ids else None: aggregate_by_bucket(
+                queryset, "metric_date", bucket, start_date, end_date, **measures
+            )
+        }
+
+    return [
+        {
+            "employee_id": employee_id,
+            "metric": metric,
+            "data": [
+                {
+                    "date": row["bucket"].isoformat(),
+                    "value": float(row[f"{metric}_value"]),
+                    "count": row["count"],
+                }
+                for row in rows
+            ],
+        }
+        for employee_id, rows in rows_by_employee.items()
+        for metric in metrics
+    ]
+
+
+def bump_performance_version():
+    """Invalidate cached leaderboards once the current transaction commits."""
+    bump_version_stamp(PERFORMANCE_STAMP)
+
+
+def get_percentile_ranks(values, lower_is_better=False):
+    """
+    Return the percentile rank of each value: the percentage of the other
+    values it is better than. Equal values get the same rank.
+    """
+    if len(values) < 2:
+        return [100.0] * len(values)
+    ordered = sorted(values, reverse=lower_is_better)
+    ranks = {}
+    for index, value in enumerate(ordered):
+        # The first of equal values is only better than those before it
+        ranks.setdefault(value, round(index / (len(values) - 1) * 100, 2))
+    return [ranks[value] for value in values]
+
+
+def build_leaderboard(metrics, start_date, end_date):
+    """
+    Rank every employee with metrics between ``start_date`` and ``end_date``.
+
+    Returns a list of dicts, best first, with the employee's ``rank``,
+    ``score`` (average percentile rank over ``metrics``), ``values`` (the
+    average of each metric) and ``percentiles`` per metric and
+    ``metrics_count``. Ranks are shared by equal scores.
+    """
+    rows = list(
+        PerformanceMetric.objects.filter(
+            metric_date__gte=start_date, metric_date__lte=end_date
+        )
+        .values(
+            "employee",
+            "employee__user__email",
+            "employee__user__first_name",
+            "employee__user__last_name",
+        )
+        .annotate(
+            metrics_count=Count("id"),
+            **{f"{metric}_value": Avg(metric) for metric in metrics},
+        )
+        .order_by()
+    )
+
+    percentiles = {
+        metric: get_percentile_ranks(
+            [float(row[f"{metric}_value"]) for row in rows],
+            lower_is_better=metric in LOWER_IS_BETTER,
+        )
+        for metric in metrics
+    }
+
+    leaderboard = []
+    for index, row in enumerate(rows):
+        name = (
+            f"{row['employee__user__first_name']} {row['employee__user__last_name']}"
+        ).strip()
+        employee_percentiles = {
+            metric: percentiles[metric][index] for metric in metrics
+        }
+        leaderboard.append(
+            {
+                "employee_id": row["employee"],
+                "employee_name": name or row["employee__user__email"],
+                "values": {metric: float(row[f"{metric}_value"]) for metric in metrics},
+                "percentiles": employee_percentiles,
+                "score": round(sum(employee_percentiles.values()) / len(metrics), 2),
+                "metrics_count": row["metrics_count"],
+            }
+        )
+
+    leaderboard.sort(key=lambda entry: (-entry["score"], entry["employee_id"]))
+    for index, entry in enumerate(leaderboard):
+        if index and entry["score"] == leaderboard[index - 1]["score"]:
+            entry["rank"] = leaderboard[index - 1]["rank"]
+        else:
+            entry["rank"] = index + 1
+    return leaderboard
+
+
+def get_leaderboard(metrics, start_date, end_date):
+    """Return build_leaderboard(...), cached until performance metrics change."""
+    cache_key = ":".join(
+        [
+            "performance_leaderboard",
+            get_version_stamp(PERFORMANCE_STAMP),
+            ",".join(metrics),
+            start_date.isoformat(),
+            end_date.isoformat(),
+        ]
+    )
+    leaderboard = cache.get(cache_key)
+    if leaderboard is None:
+        leaderboard = build_leaderboard(metrics, start_date, end_date)
+        cache.set(cache_key, leaderboard, LEADERBOARD_CACHE_TIMEOUT)
+    return leaderboard
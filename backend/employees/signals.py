@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    Assignment,
+    Department,
+    EmployeeProfile,
+    Leave,
+    PerformanceMetric,
+    PerformanceReview,
+    Position,
+)
+from .performance import bump_performance_version
+from .stats import bump_employee_stats_version
+
+
+@receiver(post_save, sender=PerformanceMetric)
+@receiver(post_delete, sender=PerformanceMetric)
+def invalidate_performance_leaderboards(sender, **kwargs):
+    bump_performance_version()
+
+
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_delete, sender=EmployeeProfile)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+@receiver(post_save, sender=Leave)
+@receiver(post_delete, sender=Leave)
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+@receiver(post_save, sender=PerformanceReview)
+@receiver(post_delete, sender=PerformanceReview)
+def invalidate_employee_stats(sender, **kwargs):
+    bump_employee_stats_version()
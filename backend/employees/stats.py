@@ -0,0 +1,133 @@
+"""
+HR statistics snapshot.
+
+The employee statistics shown on the HR dashboard are computed with one
+aggregate query per model, counting every breakdown with conditional
+aggregates, and cached as a whole. The snapshot is rebuilt after any
+employee, department, position, leave, assignment or performance review is
+written, and at least once a day since some figures depend on the date.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, DurationField, F, Max, Min, Q, Sum
+from django.utils import timezone
+
+from xcounter.cache_utils import bump_version_stamp, get_version_stamp
+
+from .models import (
+    Assignment,
+    Department,
+    EmployeeProfile,
+    Leave,
+    PerformanceReview,
+)
+
+EMPLOYEE_STATS_STAMP = "employee_stats"
+EMPLOYEE_STATS_CACHE_TIMEOUT = 60 * 60
+
+OPEN_ASSIGNMENT_STATUSES = ("NOT_STARTED", "IN_PROGRESS", "ON_HOLD")
+
+
+def bump_employee_stats_version():
+    """Invalidate the cached snapshot once the current transaction commits."""
+    bump_version_stamp(EMPLOYEE_STATS_STAMP)
+
+
+def build_employee_stats(today=None):
+    """Compute the employee statistics as of ``today``."""
+    today = today or timezone.now().date()
+
+    employees = EmployeeProfile.objects.aggregate(
+        total=Count("id"),
+        average=Avg("current_salary"),
+        min=Min("current_salary"),
+        max=Max("current_salary"),
+        sum=Sum("current_salary"),
+    )
+
+    department_distribution = dict(
+        Department.objects.annotate(employees=Count("positions__employees"))
+        .order_by()
+        .values_list("name", "employees")
+    )
+
+    this_year = Q(review_date__gte=today.replace(month=1, day=1))
+    reviews = PerformanceReview.objects.aggregate(
+        count=Count("id", filter=this_year),
+        average=Avg("overall_rating", filter=this_year),
+        above=Count("id", filter=this_year & Q(overall_rating__gte=4)),
+        below=Count("id", filter=this_year & Q(overall_rating__lte=2)),
+    )
+
+    # Leave lengths include both the start and end day
+    approved_this_year = Q(status="APPROVED", start_date__year=today.year)
+    leaves = Leave.objects.aggregate(
+        pending=Count("id", filter=Q(status="PENDING")),
+        approved=Count("id", filter=Q(status="APPROVED")),
+        rejected=Count("id", filter=Q(status="REJECTED")),
+        approved_this_year=Count("id", filter=approved_this_year),
+        approved_span=Sum(
+            F("end_date") - F("start_date"),
+            output_field=DurationField(),
+            filter=approved_this_year,
+        ),
+    )
+
+    active = ~Q(status__in=["COMPLETED", "CANCELLED"])
+    assignments = Assignment.objects.aggregate(
+        total=Count("id"),
+        active=Count("id", filter=active),
+        high_priority=Count("id", filter=active & Q(priority="HIGH")),
+        overdue=Count(
+            "id",
+            filter=Q(end_date__lt=today, status__in=OPEN_ASSIGNMENT_STATUSES),
+        ),
+        completed=Count("id", filter=Q(status="COMPLETED")),
+    )
+
+    return {
+        "total_employees": employees["total"],
+        "department_distribution": department_distribution,
+        "salary_stats": {
+            "average": employees["average"] or 0,
+            "min": employees["min"] or 0,
+            "max": employees["max"] or 0,
+            "total": employees["sum"] or 0,
+        },
+        "performance_stats": {
+            "reviews_this_year": reviews["count"],
+            "average_rating": reviews["average"] or 0,
+            "employees_above_expectations": reviews["above"],
+            "employees_below_expectations": reviews["below"],
+        },
+        "leave_stats": {
+            "pending_requests": leaves["pending"],
+            "approved_requests": leaves["approved"],
+            "rejected_requests": leaves["rejected"],
+            "total_days_approved": (leaves["approved_span"] or timedelta()).days
+            + leaves["approved_this_year"],
+        },
+        "assignment_stats": {
+            "total_active": assignments["active"],
+            "high_priority": assignments["high_priority"],
+            "overdue": assignments["overdue"],
+            "completion_rate": assignments["completed"]
+            / (assignments["total"] or 1)
+            * 100,
+        },
+    }
+
+
+def get_employee_stats():
+    """Return the cached employee statistics, computing them if needed."""
+    today = timezone.now().date()
+    cache_key = (
+        f"employee_stats:{get_version_stamp(EMPLOYEE_STATS_STAMP)}:{today.isoformat()}"
+    )
+    stats = cache.get(cache_key)
+    if stats is None:
+        stats = build_employee_stats(today)
+        cache.set(cache_key, stats, EMPLOYEE_STATS_CACHE_TIMEOUT)
+    return stats
@@ -1,3 +1,100 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import CustomUser
+
+from .models import EmployeeProfile, PerformanceMetric
+from .performance import build_leaderboard, get_leaderboard
+
+
+class LeaderboardTests(TestCase):
+    url = "/api/employees/performance-metrics/comparison/"
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.first = self.create_employee("first@example.com")
+        self.second = self.create_employee("second@example.com")
+
+    def create_employee(self, email):
+        user = CustomUser.objects.create_user(email=email)
+        return EmployeeProfile.objects.create(user=user)
+
+    def record(self, employee, days_ago, **values):
+        return PerformanceMetric.objects.create(
+            employee=employee,
+            metric_date=self.today - timedelta(days=days_ago),
+            **values,
+        )
+
+    def test_values_are_averages(self):
+        self.record(self.first, 1, revenue_generated=Decimal("100.00"))
+        self.record(self.first, 2, revenue_generated=Decimal("300.00"))
+        self.record(self.second, 1, revenue_generated=Decimal("250.00"))
+
+        leaderboard = build_leaderboard(
+            ["revenue_generated"], self.today - timedelta(days=30), self.today
+        )
+
+        self.assertEqual(
+            [(entry["employee_id"], entry["rank"]) for entry in leaderboard],
+            [(self.second.pk, 1), (self.first.pk, 2)],
+        )
+        self.assertEqual(leaderboard[1]["values"]["revenue_generated"], 200.0)
+        self.assertEqual(leaderboard[1]["metrics_count"], 2)
+
+    def test_lower_is_better_and_ties_share_rank(self):
+        third = self.create_employee("third@example.com")
+        self.record(self.first, 1, response_time_minutes=10)
+        self.record(self.second, 1, response_time_minutes=10)
+        self.record(third, 1, response_time_minutes=30)
+
+        leaderboard = build_leaderboard(
+            ["response_time_minutes"], self.today - timedelta(days=30), self.today
+        )
+
+        self.assertEqual(
+            [(entry["employee_id"], entry["rank"]) for entry in leaderboard],
+            [(self.first.pk, 1), (self.second.pk, 1), (third.pk, 3)],
+        )
+
+    def test_new_metric_invalidates_cached_leaderboard(self):
+        start = self.today - timedelta(days=30)
+        self.record(self.first, 1)
+        self.assertEqual(
+            len(get_leaderboard(["bookings_processed"], start, self.today)), 1
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record(self.second, 1)
+
+        self.assertEqual(
+            len(get_leaderboard(["bookings_processed"], start, self.today)), 2
+        )
+
+    def test_comparison_value_is_average(self):
+        admin = CustomUser.objects.create_user(
+            email="admin@example.com", is_staff=True, role="ADMIN"
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        self.record(self.first, 1, revenue_generated=Decimal("100.00"))
+        self.record(self.first, 2, revenue_generated=Decimal("300.00"))
+
+        response = client.get(self.url, {"metric": "revenue_generated"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"][0]["value"], 200.0)
+
+    def test_comparison_rejects_bad_parameters(self):
+        admin = CustomUser.objects.create_user(
+            email="admin@example.com", is_staff=True, role="ADMIN"
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
 
-# Create your tests here.
+        self.assertEqual(client.get(self.url, {"days": "x"}).status_code, 400)
+        self.assertEqual(client.get(self.url, {"metric": "salary"}).status_code, 400)
@@ -1,6 +1,3 @@
-from decimal import Decimal
-
-from django.db.models import Avg, Max, Min, Sum
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
@@ -35,6 +32,14 @@ from .serializers import (
     SalaryHistorySerializer,
     SalaryUpdateSerializer,
 )
+from .performance import (
+    METRICS,
+    TREND_BUCKETS,
+    get_default_bucket,
+    get_leaderboard,
+    get_trends,
+)
+from .stats import get_employee_stats
 
 
 class IsAdminOrManager(IsAuthenticated):
@@ -364,85 +369,7 @@ class EmployeeStatsViewSet(viewsets.ViewSet):
 
     def list(self, request):
         """Get overall employee statistics."""
-        # Count total employees
-        total_employees = EmployeeProfile.objects.count()
-
-        # Department distribution
-        department_distribution = {}
-        departments = Department.objects.all()
-        for dept in departments:
-            count = EmployeeProfile.objects.filter(position__department=dept).count()
-            department_distribution[dept.name] = count
-
-        # Salary statistics
-        salary_stats = {
-            "average": EmployeeProfile.objects.aggregate(avg=Avg("current_salary"))[
-                "avg"
-            ]
-            or 0,
-            "min": EmployeeProfile.objects.aggregate(min=Min("current_salary"))["min"]
-            or 0,
-            "max": EmployeeProfile.objects.aggregate(max=Max("current_salary"))["max"]
-            or 0,
-            "total": EmployeeProfile.objects.aggregate(sum=Sum("current_salary"))["sum"]
-            or 0,
-        }
-
-        # Performance statistics
-        latest_reviews = PerformanceReview.objects.filter(
-            review_date__gte=timezone.now().date().replace(month=1, day=1)
-        )
-        performance_stats = {
-            "reviews_this_year": latest_reviews.count(),
-            "average_rating": latest_reviews.aggregate(avg=Avg("overall_rating"))["avg"]
-            or 0,
-            "employees_above_expectations": latest_reviews.filter(
-                overall_rating__gte=4
-            ).count(),
-            "employees_below_expectations": latest_reviews.filter(
-                overall_rating__lte=2
-            ).count(),
-        }
-
-        # Leave statistics
-        current_year = timezone.now().year
-        leave_stats = {
-            "pending_requests": Leave.objects.filter(status="PENDING").count(),
-            "approved_requests": Leave.objects.filter(status="APPROVED").count(),
-            "rejected_requests": Leave.objects.filter(status="REJECTED").count(),
-            "total_days_approved": Leave.objects.filter(
-                status="APPROVED", start_date__year=current_year
-            ).aggregate(days=Sum("days_requested"))["days"]
-            or 0,
-        }
-
-        # Assignment statistics
-        assignment_stats = {
-            "total_active": Assignment.objects.exclude(
-                status__in=["COMPLETED", "CANCELLED"]
-            ).count(),
-            "high_priority": Assignment.objects.filter(priority="HIGH")
-            .exclude(status__in=["COMPLETED", "CANCELLED"])
-            .count(),
-            "overdue": Assignment.objects.filter(
-                end_date__lt=timezone.now().date(),
-                status__in=["NOT_STARTED", "IN_PROGRESS", "ON_HOLD"],
-            ).count(),
-            "completion_rate": Assignment.objects.filter(status="COMPLETED").count()
-            / (Assignment.objects.count() or 1)
-            * 100,
-        }
-
-        serializer = EmployeeStatsSerializer(
-            data={
-                "total_employees": total_employees,
-                "department_distribution": department_distribution,
-                "salary_stats": salary_stats,
-                "performance_stats": performance_stats,
-                "leave_stats": leave_stats,
-                "assignment_stats": assignment_stats,
-            }
-        )
+        serializer = EmployeeStatsSerializer(data=get_employee_stats())
 
         serializer.is_valid()  # We're constructing this manually, so it's always valid
         return Response(serializer.data)
@@ -485,23 +412,39 @@ class PerformanceMetricViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"])
     def trends(self, request):
-        """Get performance trends over time for visualization."""
+        """
+        Get performance trends over time for visualization.
+
+        ``metric`` and ``employee_id`` accept comma-separated lists; ``bucket``
+        is day, week or month and defaults to one suited to ``days``.
+        """
+        metrics = request.query_params.get("metric", "customer_satisfaction")
+        metrics = metrics.split(",")
         employee_id = request.query_params.get("employee_id")
-        metric = request.query_params.get("metric", "customer_satisfaction")
-        days = int(request.query_params.get("days", 30))
-
-        # Validate metric
-        valid_metrics = [
-            "bookings_processed",
-            "revenue_generated",
-            "customer_satisfaction",
-            "response_time_minutes",
-            "task_completion_rate",
-        ]
 
-        if metric not in valid_metrics:
+        # Validate metrics
+        invalid_metrics = [metric for metric in metrics if metric not in METRICS]
+        if invalid_metrics:
+            return Response(
+                {"error": f"Invalid metric. Choose from {list(METRICS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            days = int(request.query_params.get("days", 30))
+            employee_ids = (
+                [int(value) for value in employee_id.split(",")] if employee_id else []
+            )
+        except ValueError:
+            return Response(
+                {"error": "days and employee_id must be integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        bucket = request.query_params.get("bucket") or get_default_bucket(days)
+        if bucket not in TREND_BUCKETS:
             return Response(
-                {"error": f"Invalid metric. Choose from {valid_metrics}"},
+                {"error": f"Invalid bucket. Choose from {list(TREND_BUCKETS)}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
@@ -509,75 +452,46 @@ class PerformanceMetricViewSet(viewsets.ModelViewSet):
         end_date = timezone.now().date()
         start_date = end_date - timezone.timedelta(days=days)
 
-        # Build queryset
-        queryset = PerformanceMetric.objects.filter(
-            metric_date__gte=start_date, metric_date__lte=end_date
-        )
-
-        if employee_id:
-            queryset = queryset.filter(employee_id=employee_id)
-
-        # Group by date and calculate averages
-        data = []
-        dates = []
-        current_date = start_date
-        while current_date <= end_date:
-            dates.append(current_date)
-            current_date += timezone.timedelta(days=1)
-
-        for date in dates:
-            day_metrics = queryset.filter(metric_date=date)
-            if day_metrics.exists():
-                if metric == "revenue_generated":
-                    value = (
-                        day_metrics.aggregate(Sum(metric))["revenue_generated__sum"]
-                        or 0
-                    )
-                else:
-                    value = day_metrics.aggregate(Avg(metric))[f"{metric}__avg"] or 0
-
-                # Convert to float for serialization
-                value = float(value) if isinstance(value, Decimal) else value
-
-                data.append(
-                    {
-                        "date": date.isoformat(),
-                        "value": value,
-                        "count": day_metrics.count(),
-                    }
-                )
-            else:
-                data.append({"date": date.isoformat(), "value": 0, "count": 0})
+        series = get_trends(metrics, start_date, end_date, bucket, employee_ids)
 
         return Response(
             {
-                "metric": metric,
+                "metric": ",".join(metrics),
                 "employee_id": employee_id,
+                "bucket": bucket,
                 "start_date": start_date.isoformat(),
                 "end_date": end_date.isoformat(),
-                "data": data,
+                # The first series, for clients reading a single trend
+                "data": series[0]["data"],
+                "series": series,
             }
         )
 
     @action(detail=False, methods=["get"])
     def comparison(self, request):
-        """Compare metrics across employees for visualization."""
-        metric = request.query_params.get("metric", "customer_satisfaction")
-        days = int(request.query_params.get("days", 30))
-        limit = int(request.query_params.get("limit", 10))
-
-        # Validate metric
-        valid_metrics = [
-            "bookings_processed",
-            "revenue_generated",
-            "customer_satisfaction",
-            "response_time_minutes",
-            "task_completion_rate",
-        ]
+        """
+        Compare metrics across employees for visualization.
+
+        ``metric`` accepts a comma-separated list; employees are ranked by
+        their average percentile rank over the metrics.
+        """
+        metrics = request.query_params.get("metric", "customer_satisfaction")
+        metrics = metrics.split(",")
+
+        # Validate metrics
+        invalid_metrics = [metric for metric in metrics if metric not in METRICS]
+        if invalid_metrics:
+            return Response(
+                {"error": f"Invalid metric. Choose from {list(METRICS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        if metric not in valid_metrics:
+        try:
+            days = int(request.query_params.get("days", 30))
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
             return Response(
-                {"error": f"Invalid metric. Choose from {valid_metrics}"},
+                {"error": "days and limit must be integers"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
@@ -585,47 +499,20 @@ class PerformanceMetricViewSet(viewsets.ModelViewSet):
         end_date = timezone.now().date()
         start_date = end_date - timezone.timedelta(days=days)
 
-        # Get top performers based on the metric
-        top_employees = (
-            EmployeeProfile.objects.filter(
-                performance_metrics__metric_date__gte=start_date,
-                performance_metrics__metric_date__lte=end_date,
-            )
-            .annotate(avg_value=Avg(f"performance_metrics__{metric}"))
-            .order_by(
-                "-avg_value" if metric != "response_time_minutes" else "avg_value"
-            )[:limit]
-        )
+        leaderboard = get_leaderboard(metrics, start_date, end_date)
 
-        # Prepare comparison data
-        comparison_data = []
-        for employee in top_employees:
-            avg_value = employee.avg_value
-            metrics_count = employee.performance_metrics.filter(
-                metric_date__gte=start_date, metric_date__lte=end_date
-            ).count()
-
-            if avg_value is not None:
-                # Convert to float for serialization
-                avg_value = (
-                    float(avg_value) if isinstance(avg_value, Decimal) else avg_value
-                )
-
-                comparison_data.append(
-                    {
-                        "employee_id": employee.id,
-                        "employee_name": employee.user.get_full_name()
-                        or employee.user.email,
-                        "value": avg_value,
-                        "metrics_count": metrics_count,
-                    }
-                )
+        comparison_data = [
+            # "value" is the first metric, for clients comparing one
+            {**entry, "value": entry["values"][metrics[0]]}
+            for entry in leaderboard[:limit]
+        ]
 
         return Response(
             {
-                "metric": metric,
+                "metric": ",".join(metrics),
                 "start_date": start_date.isoformat(),
                 "end_date": end_date.isoformat(),
+                "employees": len(leaderboard),
                 "data": comparison_data,
             }
         )
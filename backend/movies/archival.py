@@ -0,0 +1,59 @@
+"""
+Archival of expired shows.
+
+Expired shows are processed in primary-key order, one bounded chunk at a
+time. Each chunk is a single UPDATE (or DELETE) in its own transaction, so
+memory use doesn't grow with the number of shows and an interrupted run can
+be resumed: archived shows no longer match, and ``start_after`` skips
+everything up to the last reported id.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from .etags import bump_catalog_version
+from .models import Show
+
+
+def expired_shows(cutoff, include_archived=False):
+    """Return shows that ended before the cutoff."""
+    queryset = Show.objects.filter(end_time__lt=cutoff)
+    if not include_archived:
+        queryset = queryset.filter(is_archived=False)
+    return queryset
+
+
+def process_expired_shows(cutoff, chunk_size=1000, delete=False, start_after=0):
+    """
+    Archive or delete expired shows chunk by chunk.
+
+    Archiving also deactivates the show so it drops out of the public API.
+    Deleting cascades to the shows' bookings and tickets.
+
+    Yields ``(processed, last_id)`` after each chunk is committed.
+    """
+    queryset = expired_shows(cutoff, include_archived=delete)
+    last_id = start_after
+
+    while True:
+        ids = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+
+        with transaction.atomic():
+            chunk = Show.objects.filter(id__in=ids)
+            if delete:
+                chunk.delete()
+            else:
+                chunk.update(
+                    is_archived=True, is_active=False, updated_at=timezone.now()
+                )
+            # Bulk UPDATE/DELETE of shows bypasses the catalog signals
+            bump_catalog_version("show")
+
+        last_id = ids[-1]
+        yield len(ids), last_id
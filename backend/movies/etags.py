@@ -0,0 +1,79 @@
+"""
+Conditional GET support for the public catalog API.
+
+Each catalog model has a version stamp (see xcounter.cache_utils) that is
+replaced whenever a row of that model is written. A viewset's ETag is derived
+from the stamps of every model its payload contains, so a matching
+If-None-Match can be answered with 304 from the stamps alone. Stamps are read
+from a cache every worker shares, so every worker sees a change as soon as it
+commits and a 304 doesn't touch the database.
+"""
+
+import hashlib
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from xcounter.cache_utils import bump_version_stamp, get_version_stamps
+
+CATALOG_MODELS = ("genre", "movie", "theater", "show")
+
+
+def catalog_stamp_name(model_name):
+    return f"catalog:{model_name}"
+
+
+def bump_catalog_version(*model_names):
+    """Invalidate ETags for every endpoint that includes these models."""
+    bump_version_stamp(*(catalog_stamp_name(name) for name in model_names))
+
+
+class CatalogETagMixin:
+    """
+    Adds strong ETags and 304 responses to a viewset's list and retrieve.
+
+    Set ``catalog_dependencies`` to the catalog models the payload includes.
+    Override ``get_etag_variant`` when the payload depends on who is asking.
+    """
+
+    catalog_dependencies = ()
+
+    def get_etag_variant(self, request):
+        """Return a token for the audience-specific version of the payload."""
+        return "public"
+
+    def get_catalog_etag(self, request):
+        stamps = get_version_stamps(
+            *(catalog_stamp_name(name) for name in self.catalog_dependencies)
+        )
+        raw = "|".join(
+            [*stamps, self.get_etag_variant(request), request.get_full_path()]
+        )
+        return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_catalog_etag(request)
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+
+        if etag in if_none_match or "*" in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response["ETag"] = etag
+        if self.get_etag_variant(request) == "public":
+            patch_cache_control(response, public=True, no_cache=True)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Authorization", "Cookie"))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
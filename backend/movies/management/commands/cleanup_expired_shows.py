@@ -1,20 +1,32 @@
 import datetime
+import logging
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 
-from movies.models import Show
+from movies.archival import expired_shows, process_expired_shows
+
+logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = "Cleans up expired shows that are older than the specified number of days"
+    """
+    Management command to cleanup expired shows.
+
+    Shows are archived or deleted in bounded chunks so the command can run
+    against years of history without loading it into memory. Progress is
+    reported after every chunk; pass the last reported id to --start-after
+    to resume an interrupted run.
+    """
+
+    help = "Archives or deletes shows that ended more than the specified number of days ago"
 
     def add_arguments(self, parser):
         parser.add_argument(
             "--days",
             type=int,
             default=30,
-            help="Shows older than this many days will be marked as archived",
+            help="Shows older than this many days will be marked as archived (default: 30)",
         )
         parser.add_argument(
             "--delete",
@@ -26,54 +38,77 @@ class Command(BaseCommand):
             action="store_true",
             help="Perform a dry run without making any changes",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of shows to process per transaction (default: 1000)",
+        )
+        parser.add_argument(
+            "--start-after",
+            type=int,
+            default=0,
+            help="Resume after this show id (the last id reported by a previous run)",
+        )
 
     def handle(self, *args, **options):
         days = options["days"]
-        delete = options["delete"]
-        dry_run = options.get("dry_run", False)
+        delete_shows = options["delete"]
+        dry_run = options["dry_run"]
+        chunk_size = options["chunk_size"]
+        start_after = options["start_after"]
+
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1")
 
         # Calculate the cutoff date
         cutoff_date = timezone.now() - datetime.timedelta(days=days)
 
-        # Get expired shows
-        expired_shows = Show.objects.filter(start_time__lt=cutoff_date)
+        # Shows that ended before the cutoff date
+        count = (
+            expired_shows(cutoff_date, include_archived=delete_shows)
+            .filter(id__gt=start_after)
+            .count()
+        )
 
-        count = expired_shows.count()
+        action = "delete" if delete_shows else "archive"
+        self.stdout.write(
+            f"Found {count} expired shows older than {days} days to {action}"
+        )
 
         if count == 0:
-            self.stdout.write(
-                self.style.SUCCESS(f"No expired shows found older than {days} days.")
-            )
+            self.stdout.write(self.style.SUCCESS("No expired shows to process."))
             return
 
         if dry_run:
-            if delete:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"DRY RUN: Would delete {count} shows older than {days} days."
-                    )
-                )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(
-                        f"DRY RUN: Would archive {count} shows older than {days} days."
-                    )
-                )
-            return
-
-        if delete:
-            # Delete expired shows
-            expired_shows.delete()
             self.stdout.write(
-                self.style.SUCCESS(
-                    f"Successfully deleted {count} shows older than {days} days."
+                self.style.WARNING(
+                    f"DRY RUN: Would {action} {count} shows in chunks of {chunk_size}."
                 )
             )
-        else:
-            # Mark expired shows as archived
-            expired_shows.update(is_archived=True)
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"Successfully archived {count} shows older than {days} days."
+            return
+
+        processed = 0
+        last_id = start_after
+        try:
+            for chunk_count, last_id in process_expired_shows(
+                cutoff_date,
+                chunk_size=chunk_size,
+                delete=delete_shows,
+                start_after=start_after,
+            ):
+                processed += chunk_count
+                self.stdout.write(
+                    f"Processed {processed}/{count} shows (last id {last_id})"
                 )
+                self.stdout.flush()
+        except Exception as e:
+            logger.error(f"Error processing expired shows: {str(e)}")
+            raise CommandError(
+                f"Failed to process expired shows after {processed} shows: {str(e)}. "
+                f"Resume with --start-after {last_id}"
             )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully processed {processed} expired shows.")
+        )
@@ -1,14 +1,16 @@
 import csv
 import json
 import os
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
 
 from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.db.models import Count, Sum
 from django.utils import timezone
 
-from bookings.models import Booking, Ticket
+from bookings.models import DailySales, Ticket
+from dashboard.time_buckets import aggregate_by_bucket
 from dashboard.visualization import (
     get_bookings_over_time_chart_data,
     get_genre_distribution_chart_data,
@@ -16,7 +18,7 @@ from dashboard.visualization import (
     get_movie_ratings_chart_data,
     get_ticket_types_chart_data,
 )
-from movies.models import Movie, Show
+from movies.models import Genre, Movie, Show
 
 
 class Command(BaseCommand):
@@ -92,6 +94,13 @@ class Command(BaseCommand):
             self.style.SUCCESS(f"Reports generated successfully in {output_dir}")
         )
 
+    def get_sales(self, start_date, end_date):
+        """Return the daily sales rows for bookings made in the given period"""
+        return DailySales.objects.filter(
+            date__gte=timezone.localdate(start_date),
+            date__lt=timezone.localdate(end_date),
+        )
+
     def generate_movie_report(
         self, start_date, end_date, output_format, output_dir, include_charts=False
     ):
@@ -100,35 +109,48 @@ class Command(BaseCommand):
 
         # Get shows in date range
         shows = Show.objects.filter(start_time__gte=start_date, start_time__lt=end_date)
+        show_counts = dict(
+            shows.values("movie")
+            .annotate(count=Count("id"))
+            .values_list("movie", "count")
+        )
 
         # Aggregate data by movie
         movie_stats = (
-            shows.values("movie")
-            .annotate(
-                show_count=Count("id"),
-                tickets_sold=Count("booking__ticket"),
-                revenue=Sum("booking__total_price"),
+            DailySales.objects.filter(
+                show__start_time__gte=start_date, show__start_time__lt=end_date
             )
+            .values("movie")
+            .annotate(tickets_sold=Sum("tickets"), revenue=Sum("gross_amount"))
             .order_by("-tickets_sold")
         )
+        movies = Movie.objects.in_bulk(show_counts.keys())
+        genres = defaultdict(list)
+        for movie_id, name in Genre.objects.filter(movies__in=movies).values_list(
+            "movies", "name"
+        ):
+            genres[movie_id].append(name)
 
-        # Enrich with movie details
+        # Enrich with movie details, including movies that sold nothing
+        sold = {stat["movie"]: stat for stat in movie_stats}
         report_data = []
-        for stat in movie_stats:
-            try:
-                movie = Movie.objects.get(id=stat["movie"])
-                report_data.append(
-                    {
-                        "movie_id": movie.id,
-                        "title": movie.title,
-                        "genre": movie.genre,
-                        "show_count": stat["show_count"] or 0,
-                        "tickets_sold": stat["tickets_sold"] or 0,
-                        "revenue": stat["revenue"] or 0,
-                    }
-                )
-            except Movie.DoesNotExist:
-                continue
+        for movie_id in sorted(
+            movies,
+            key=lambda movie_id: sold.get(movie_id, {}).get("tickets_sold") or 0,
+            reverse=True,
+        ):
+            movie = movies[movie_id]
+            stat = sold.get(movie_id, {})
+            report_data.append(
+                {
+                    "movie_id": movie.id,
+                    "title": movie.title,
+                    "genre": ", ".join(genres[movie.id]) or "Unknown",
+                    "show_count": show_counts.get(movie.id, 0),
+                    "tickets_sold": stat.get("tickets_sold") or 0,
+                    "revenue": stat.get("revenue") or 0,
+                }
+            )
 
         # Output the report
         filename = f'movie_report_{start_date.strftime("%Y_%m")}.{output_format}'
@@ -189,21 +211,28 @@ class Command(BaseCommand):
         self.stdout.write("Generating booking report...")
 
         # Get bookings in date range
-        bookings = Booking.objects.filter(
-            created_at__gte=start_date, created_at__lt=end_date
-        )
+        sales = self.get_sales(start_date, end_date)
 
         # Summary statistics
-        total_bookings = bookings.count()
-        total_tickets = Ticket.objects.filter(booking__in=bookings).count()
-        total_revenue = bookings.aggregate(Sum("total_price"))["total_price__sum"] or 0
-
-        # Bookings by day
-        daily_bookings = (
-            bookings.extra({"day": "date(created_at)"})
-            .values("day")
-            .annotate(count=Count("id"), revenue=Sum("total_price"))
-            .order_by("day")
+        totals = sales.aggregate(
+            bookings=Sum("bookings"),
+            tickets=Sum("tickets"),
+            revenue=Sum("gross_amount"),
+        )
+        total_bookings = totals["bookings"] or 0
+        total_tickets = totals["tickets"] or 0
+        total_revenue = totals["revenue"] or 0
+
+        # Bookings by day, including the days without any
+        daily_bookings = aggregate_by_bucket(
+            DailySales.objects.all(),
+            "date",
+            "day",
+            timezone.localdate(start_date),
+            timezone.localdate(end_date) - timedelta(days=1),
+            count=Sum("bookings"),
+            tickets=Sum("tickets"),
+            revenue=Sum("gross_amount"),
         )
 
         # Output the report
@@ -218,12 +247,10 @@ class Command(BaseCommand):
                 for day in daily_bookings:
                     writer.writerow(
                         {
-                            "date": day["day"],
+                            "date": day["bucket"],
                             "booking_count": day["count"],
-                            "tickets": Ticket.objects.filter(
-                                booking__in=bookings.filter(created_at__date=day["day"])
-                            ).count(),
-                            "revenue": day["revenue"] or 0,
+                            "tickets": day["tickets"],
+                            "revenue": day["revenue"],
                         }
                     )
         else:  # text format
@@ -242,11 +269,8 @@ class Command(BaseCommand):
                 f.write("-" * 80 + "\n")
 
                 for day in daily_bookings:
-                    ticket_count = Ticket.objects.filter(
-                        booking__in=bookings.filter(created_at__date=day["day"])
-                    ).count()
                     f.write(
-                        f'{day["day"]:<12} {day["count"]:<10} {ticket_count:<10} ${day["revenue"] or 0:<10.2f}\n'
+                        f'{day["label"]:<12} {day["count"]:<10} {day["tickets"]:<10} ${day["revenue"]:<10.2f}\n'
                     )
 
         self.stdout.write(self.style.SUCCESS(f"Booking report saved to {filepath}"))
@@ -271,36 +295,35 @@ class Command(BaseCommand):
         self.stdout.write("Generating revenue report...")
 
         # Get bookings in date range
-        bookings = Booking.objects.filter(
-            created_at__gte=start_date, created_at__lt=end_date
-        )
+        sales = self.get_sales(start_date, end_date)
 
-        # Calculate revenue statistics
-        total_revenue = bookings.aggregate(Sum("total_price"))["total_price__sum"] or 0
-        ticket_revenue = bookings.aggregate(Sum("subtotal"))["subtotal__sum"] or 0
-        discount_amount = bookings.aggregate(Sum("discount"))["discount__sum"] or 0
-
-        # Tickets by type
-        ticket_types = {}
-        for ticket in Ticket.objects.filter(booking__in=bookings).select_related(
-            "ticket_type"
-        ):
-            ticket_type_name = (
-                ticket.ticket_type.name if ticket.ticket_type else "Unknown"
+        # Calculate revenue statistics. Ticket revenue is the value of the
+        # tickets before discounts.
+        totals = sales.aggregate(
+            total_revenue=Sum("gross_amount"), discount_amount=Sum("discount_amount")
+        )
+        total_revenue = totals["total_revenue"] or 0
+        discount_amount = totals["discount_amount"] or 0
+        ticket_revenue = total_revenue + discount_amount
+
+        # Tickets by type (seat categories aren't part of the daily sales
+        # table, so these come from the tickets themselves)
+        ticket_types = {
+            row["seat_category"]: row
+            for row in Ticket.objects.filter(
+                booking__created_at__gte=start_date, booking__created_at__lt=end_date
             )
-            if ticket_type_name not in ticket_types:
-                ticket_types[ticket_type_name] = {"count": 0, "revenue": 0}
-            ticket_types[ticket_type_name]["count"] += 1
-            ticket_types[ticket_type_name]["revenue"] += ticket.price
+            .values("seat_category")
+            .annotate(count=Count("id"), revenue=Sum("price"))
+        }
 
         # Revenue by payment method
-        payment_methods = {}
-        for booking in bookings:
-            method = booking.payment_method or "Unknown"
-            if method not in payment_methods:
-                payment_methods[method] = {"count": 0, "revenue": 0}
-            payment_methods[method]["count"] += 1
-            payment_methods[method]["revenue"] += booking.total_price
+        payment_methods = {
+            row["payment_method"] or "Unknown": row
+            for row in sales.values("payment_method").annotate(
+                count=Sum("bookings"), revenue=Sum("gross_amount")
+            )
+        }
 
         # Output the report
         filename = f'revenue_report_{start_date.strftime("%Y_%m")}.{output_format}'
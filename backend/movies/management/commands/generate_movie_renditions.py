@@ -0,0 +1,78 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from movies.renditions import (
+    generate_movie_renditions,
+    movies_with_images,
+    needs_renditions,
+)
+
+
+class Command(BaseCommand):
+    """
+    Management command rendering poster and backdrop renditions.
+
+    New uploads are rendered after they are saved; this renders the images
+    still without current renditions, e.g. after a failed render or a
+    restart. Run it from cron (e.g. hourly) or with --loop to catch up, or
+    with --all to render every image again after the sizes changed.
+    """
+
+    help = "Generates poster and backdrop renditions for movies missing them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--movie",
+            type=int,
+            action="append",
+            dest="movie_ids",
+            help="Only process the movie with this ID (can be repeated)",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Render every image again, even if its renditions are current",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and check for new images every --interval seconds",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=60,
+            help="Seconds between checks when running with --loop (default: 60)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # Like a request, each run drops connections that have gone
+            # stale or outlived CONN_MAX_AGE
+            close_old_connections()
+            self.run_once(options["movie_ids"], options["all"])
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    def run_once(self, movie_ids, render_all):
+        movies = movies_with_images().only(
+            "id", "title", "poster_image", "backdrop_image", "renditions"
+        )
+        if movie_ids:
+            movies = movies.filter(id__in=movie_ids)
+
+        count = 0
+        for movie in movies.iterator():
+            if not render_all and not needs_renditions(movie):
+                continue
+            if generate_movie_renditions(movie, force=render_all):
+                count += 1
+                self.stdout.write(f"Rendered: Movie #{movie.id} - {movie.title}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully generated renditions for {count} movies.")
+        )
+        self.stdout.flush()
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='show',
+            index=models.Index(fields=['theater', 'start_time'], name='movies_show_theater_527745_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0002_show_theater_start_time_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="show",
+            name="is_archived",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="show",
+            index=models.Index(
+                fields=["is_archived", "end_time"],
+                name="movies_show_is_arch_11d1fb_idx",
+            ),
+        ),
+    ]
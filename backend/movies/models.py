@@ -24,6 +24,9 @@ class Movie(models.Model):
     backdrop_image = models.ImageField(
         upload_to="movie_backdrops/", blank=True, null=True
     )
+    # Stored renditions of the images, written by generate_movie_renditions
+    # (see movies/renditions.py)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     trailer_url = models.URLField(blank=True, null=True)
     rating = models.DecimalField(
         max_digits=3,
@@ -85,6 +88,8 @@ class Show(models.Model):
     total_seats = models.PositiveIntegerField()
     available_seats = models.PositiveIntegerField()
     is_active = models.BooleanField(default=True)
+    # Set by the cleanup_expired_shows command once a show is long over
+    is_archived = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -102,4 +107,6 @@ class Show(models.Model):
         indexes = [
             models.Index(fields=["start_time", "is_active"]),
             models.Index(fields=["movie", "start_time"]),
+            models.Index(fields=["theater", "start_time"]),
+            models.Index(fields=["is_archived", "end_time"]),
         ]
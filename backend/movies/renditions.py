@@ -0,0 +1,262 @@
+"""
+Poster and backdrop renditions.
+
+Movie images are uploaded at full size. Renditions are resized copies at a set
+of named sizes, written next to the originals under ``MEDIA_ROOT/renditions``.
+Each rendition path contains a hash of the source file contents, so a new
+upload gets new URLs automatically and old renditions never go stale.
+
+Renditions are never rendered while serving a request or saving a movie.
+When a movie is saved with a new or removed image, its renditions are
+rendered in a background thread once the save commits (or right after the
+commit with MOVIE_RENDITIONS_ASYNC = False), and their names are stored on
+``Movie.renditions``; the renditions of the image it replaced are deleted.
+The generate_movie_renditions command renders whatever is still missing,
+e.g. after a failed render or a restart. Serializers only turn the stored
+names into URLs, and leave them out while an image's renditions are missing or
+were made from a previous upload; clients then use the original image.
+"""
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from .etags import bump_catalog_version
+from .models import Movie
+
+logger = logging.getLogger(__name__)
+
+# Named bounding boxes (width, height) per image field
+RENDITION_SIZES = getattr(
+    settings,
+    "MOVIE_RENDITION_SIZES",
+    {
+        "poster_image": {
+            "thumb": (92, 138),
+            "card": (342, 513),
+            "large": (780, 1170),
+        },
+        "backdrop_image": {
+            "small": (480, 270),
+            "medium": (1280, 720),
+        },
+    },
+)
+
+# Output formats and the Pillow encoder options used for each
+RENDITION_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+RENDITION_ROOT = "renditions"
+
+IMAGE_FIELDS = ("poster_image", "backdrop_image")
+
+# Renders new uploads in the background, one at a time per process
+_executor = None
+
+
+def _content_hash(image_file):
+    """Return a short hash of an image file's contents."""
+    hasher = hashlib.sha256()
+    with default_storage.open(image_file.name, "rb") as source:
+        for chunk in iter(lambda: source.read(64 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()[:16]
+
+
+def rendition_name(image_file, field_name, size_name, fmt, digest=None):
+    """Build the storage name of a rendition."""
+    digest = digest or _content_hash(image_file)
+    stem = os.path.splitext(os.path.basename(image_file.name))[0]
+    return (
+        f"{RENDITION_ROOT}/{field_name}/{digest[:2]}/"
+        f"{stem}-{digest}-{size_name}.{fmt}"
+    )
+
+
+def _render(image_file, size, fmt):
+    """Resize an image into the given bounding box and encode it."""
+    pil_format, options = RENDITION_FORMATS[fmt]
+    with default_storage.open(image_file.name, "rb") as source:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail(size, Image.LANCZOS)
+            if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            elif image.mode not in ("RGB", "RGBA", "L"):
+                image = image.convert("RGBA")
+            output = BytesIO()
+            image.save(output, pil_format, **options)
+    return output.getvalue()
+
+
+def render_image(image_file, field_name):
+    """
+    Create every rendition of an image that doesn't exist yet.
+
+    Returns ``{size: {format: storage name}}``, or None when the original
+    can't be read.
+    """
+    try:
+        digest = _content_hash(image_file)
+        names = {}
+        for size_name, size in RENDITION_SIZES[field_name].items():
+            names[size_name] = {}
+            for fmt in RENDITION_FORMATS:
+                name = rendition_name(image_file, field_name, size_name, fmt, digest)
+                if not default_storage.exists(name):
+                    default_storage.save(
+                        name, ContentFile(_render(image_file, size, fmt))
+                    )
+                names[size_name][fmt] = name
+        return names
+    except (OSError, KeyError) as e:
+        logger.warning(f"Could not create renditions of {image_file.name}: {e}")
+        return None
+
+
+def _stored_renditions(movie, field_name):
+    """Return the stored renditions of an image, if they are for its upload."""
+    image_file = getattr(movie, field_name)
+    stored = (movie.renditions or {}).get(field_name)
+    if not image_file or not stored or stored.get("source") != image_file.name:
+        return None
+    return stored["files"]
+
+
+def stored_rendition_names(renditions):
+    """Return the storage names of every rendition in ``Movie.renditions``."""
+    return {
+        name
+        for stored in (renditions or {}).values()
+        for formats in stored["files"].values()
+        for name in formats.values()
+    }
+
+
+def delete_renditions(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError as e:
+            logger.warning(f"Could not delete rendition {name}: {e}")
+
+
+def needs_renditions(movie):
+    """
+    Return whether a movie's stored renditions don't match its images: an
+    image has no current renditions, or a removed image still has some.
+    """
+    for field_name in IMAGE_FIELDS:
+        if getattr(movie, field_name):
+            if _stored_renditions(movie, field_name) is None:
+                return True
+        elif (movie.renditions or {}).get(field_name):
+            return True
+    return False
+
+
+def movies_with_images():
+    return Movie.objects.exclude(
+        Q(poster_image="") | Q(poster_image__isnull=True),
+        Q(backdrop_image="") | Q(backdrop_image__isnull=True),
+    )
+
+
+def generate_movie_renditions(movie, force=False):
+    """
+    Render a movie's images and store the rendition names on the movie.
+
+    Images whose stored renditions are current are skipped unless ``force``
+    is set. Renditions that are no longer stored, such as those of a
+    replaced image, are deleted. Returns whether anything was stored.
+    """
+    renditions = {}
+    for field_name in IMAGE_FIELDS:
+        image_file = getattr(movie, field_name)
+        if not image_file:
+            continue
+        if not force and _stored_renditions(movie, field_name) is not None:
+            renditions[field_name] = movie.renditions[field_name]
+            continue
+        files = render_image(image_file, field_name)
+        if files is not None:
+            renditions[field_name] = {"source": image_file.name, "files": files}
+
+    if renditions == (movie.renditions or {}):
+        return False
+
+    # update() doesn't send post_save, so bump the catalog version here
+    Movie.objects.filter(pk=movie.pk).update(renditions=renditions)
+    previous = movie.renditions
+    movie.renditions = renditions
+    bump_catalog_version("movie")
+    delete_renditions(
+        stored_rendition_names(previous) - stored_rendition_names(renditions)
+    )
+    return True
+
+
+def render_movie(movie_id):
+    """Render the images of a movie that need it, if it still exists."""
+    movie = Movie.objects.filter(pk=movie_id).first()
+    if movie is not None and needs_renditions(movie):
+        generate_movie_renditions(movie)
+
+
+def _render_in_background(movie_id):
+    try:
+        render_movie(movie_id)
+    except Exception:
+        logger.exception(f"Could not render renditions of movie #{movie_id}")
+    finally:
+        # Connections opened by this thread aren't closed by any request
+        connections.close_all()
+
+
+def schedule_movie_renditions(movie_id):
+    """Render a movie's images off-request once the current transaction commits."""
+
+    def schedule():
+        global _executor
+        if not getattr(settings, "MOVIE_RENDITIONS_ASYNC", True):
+            render_movie(movie_id)
+            return
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="movie-renditions"
+            )
+        _executor.submit(_render_in_background, movie_id)
+
+    transaction.on_commit(schedule)
+
+
+def get_rendition_urls(movie, field_name, request=None):
+    """
+    Return ``{size: {format: url}}`` for the stored renditions of a movie
+    image, or ``{}`` when it has none for its current upload.
+    """
+    files = _stored_renditions(movie, field_name)
+    if files is None:
+        return {}
+
+    urls = {}
+    for size_name, formats in files.items():
+        urls[size_name] = {}
+        for fmt, name in formats.items():
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            urls[size_name][fmt] = url
+    return urls
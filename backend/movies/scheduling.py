@@ -0,0 +1,250 @@
+"""
+Show scheduling conflict detection.
+
+Shows in the same theater may not overlap, and consecutive shows must leave
+a cleaning buffer (SHOW_CLEANING_BUFFER_MINUTES) between the end of one and
+the start of the next.
+
+Recurring schedules are expanded from a template in memory, validated in one
+sweep and written with a single batched INSERT.
+
+Conflicts are found with a per-theater sweep over shows sorted by start time.
+A heap holds the shows still "occupying" the theater (end time plus buffer),
+so each show is pushed and popped once: O(n log n) for n shows, plus the
+number of conflicts reported.
+"""
+
+import heapq
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .etags import bump_catalog_version
+from .models import Show, Theater
+
+# A show, existing or proposed, reduced to what the sweep needs.
+# ``key`` is the show's pk for existing shows or the position in the
+# proposed list for shows that haven't been saved yet.
+ScheduleSlot = namedtuple(
+    "ScheduleSlot", ["key", "theater_id", "start_time", "end_time", "is_existing"]
+)
+
+
+def get_cleaning_buffer():
+    """Return the minimum gap required between two shows in a theater."""
+    return timedelta(minutes=getattr(settings, "SHOW_CLEANING_BUFFER_MINUTES", 15))
+
+
+def _slot_ref(slot):
+    if slot.is_existing:
+        return {"show_id": slot.key}
+    return {"index": slot.key}
+
+
+def _describe_conflict(earlier, later):
+    """
+    Build the response entry for two conflicting slots.
+
+    The proposed slot is always reported as ``show`` so clients can tell which
+    of their shows needs to move.
+    """
+    kind = "overlap" if later.start_time < earlier.end_time else "cleaning_buffer"
+    show, other = (earlier, later) if later.is_existing else (later, earlier)
+    return {
+        "theater_id": earlier.theater_id,
+        "type": kind,
+        "show": _slot_ref(show),
+        "conflicts_with": _slot_ref(other),
+        "start_time": show.start_time,
+        "end_time": show.end_time,
+        "conflicting_start_time": other.start_time,
+        "conflicting_end_time": other.end_time,
+    }
+
+
+def find_conflicts(slots, buffer=None):
+    """
+    Return every pair of conflicting slots.
+
+    Pairs where both slots are existing shows are skipped: they are already
+    in the schedule and are not what is being validated.
+    """
+    if buffer is None:
+        buffer = get_cleaning_buffer()
+
+    by_theater = defaultdict(list)
+    for slot in slots:
+        by_theater[slot.theater_id].append(slot)
+
+    conflicts = []
+    for theater_slots in by_theater.values():
+        theater_slots.sort(key=lambda slot: (slot.start_time, slot.end_time))
+
+        # (end_time + buffer, sequence, slot) for shows still occupying the theater
+        active = []
+        for sequence, slot in enumerate(theater_slots):
+            while active and active[0][0] <= slot.start_time:
+                heapq.heappop(active)
+
+            for _, _, other in active:
+                if slot.is_existing and other.is_existing:
+                    continue
+                conflicts.append(_describe_conflict(other, slot))
+
+            heapq.heappush(active, (slot.end_time + buffer, sequence, slot))
+
+    conflicts.sort(
+        key=lambda conflict: (conflict["theater_id"], conflict["start_time"])
+    )
+    return conflicts
+
+
+def existing_slots(theater_ids, window_start, window_end, exclude_ids=(), buffer=None):
+    """
+    Load active shows in the given theaters that could conflict with a show
+    between window_start and window_end.
+    """
+    if buffer is None:
+        buffer = get_cleaning_buffer()
+
+    shows = (
+        Show.objects.filter(
+            theater_id__in=theater_ids,
+            is_active=True,
+            start_time__lt=window_end + buffer,
+            end_time__gt=window_start - buffer,
+        )
+        .exclude(id__in=exclude_ids)
+        .values_list("id", "theater_id", "start_time", "end_time")
+    )
+    return [
+        ScheduleSlot(show_id, theater_id, start_time, end_time, True)
+        for show_id, theater_id, start_time, end_time in shows
+    ]
+
+
+def validate_schedule(proposed, exclude_ids=()):
+    """
+    Check a batch of proposed shows against each other and the saved schedule.
+
+    ``proposed`` is a list of dicts with ``theater`` (a Theater or its pk),
+    ``start_time`` and ``end_time``. Conflicts reference proposed shows by
+    their index in the list and saved shows by id.
+    """
+    if not proposed:
+        return []
+
+    buffer = get_cleaning_buffer()
+    slots = []
+    for index, item in enumerate(proposed):
+        theater = item["theater"]
+        theater_id = getattr(theater, "pk", theater)
+        slots.append(
+            ScheduleSlot(index, theater_id, item["start_time"], item["end_time"], False)
+        )
+
+    theater_ids = {slot.theater_id for slot in slots}
+    window_start = min(slot.start_time for slot in slots)
+    window_end = max(slot.end_time for slot in slots)
+    slots.extend(
+        existing_slots(theater_ids, window_start, window_end, exclude_ids, buffer)
+    )
+
+    return find_conflicts(slots, buffer)
+
+
+def check_show_conflicts(theater, start_time, end_time, instance=None):
+    """Return conflicts for a single show being created or updated."""
+    exclude_ids = [instance.pk] if instance is not None and instance.pk else []
+    proposed = [{"theater": theater, "start_time": start_time, "end_time": end_time}]
+    return validate_schedule(proposed, exclude_ids=exclude_ids)
+
+
+def expand_schedule_template(
+    movie,
+    theater,
+    start_date,
+    end_date,
+    slots,
+    weekdays=None,
+    total_seats=None,
+    duration_minutes=None,
+):
+    """
+    Build unsaved Show instances for a recurring schedule.
+
+    Each slot is a dict with ``time`` and ``price`` and an optional
+    ``show_type``. A show is created for every slot on every date from
+    start_date to end_date (inclusive) whose weekday (Monday is 0) is in
+    ``weekdays``, or on every date when weekdays is not given. Slot times are
+    in the current timezone.
+    """
+    tz = timezone.get_current_timezone()
+    duration = timedelta(minutes=duration_minutes or movie.duration_minutes)
+    seats = total_seats or theater.capacity
+
+    shows = []
+    day = start_date
+    while day <= end_date:
+        if weekdays is None or day.weekday() in weekdays:
+            for slot in slots:
+                start_time = timezone.make_aware(
+                    datetime.combine(day, slot["time"]), tz
+                )
+                shows.append(
+                    Show(
+                        movie=movie,
+                        theater=theater,
+                        start_time=start_time,
+                        end_time=start_time + duration,
+                        price=slot["price"],
+                        show_type=slot.get("show_type", "REGULAR"),
+                        total_seats=seats,
+                        # bulk_create bypasses Show.save, so set this here
+                        available_seats=seats,
+                    )
+                )
+        day += timedelta(days=1)
+
+    shows.sort(key=lambda show: show.start_time)
+    return shows
+
+
+def validate_shows(shows):
+    """Check unsaved Show instances for conflicts."""
+    return validate_schedule(
+        [
+            {
+                "theater": show.theater_id,
+                "start_time": show.start_time,
+                "end_time": show.end_time,
+            }
+            for show in shows
+        ]
+    )
+
+
+def create_scheduled_shows(shows, batch_size=500):
+    """
+    Validate and insert a batch of unsaved shows.
+
+    Returns ``(created_shows, conflicts)``. Nothing is written when there are
+    conflicts. The theaters involved are locked for the duration so two
+    schedules can't be inserted into the same theater concurrently.
+    """
+    with transaction.atomic():
+        theater_ids = sorted({show.theater_id for show in shows})
+        list(Theater.objects.select_for_update().filter(id__in=theater_ids))
+
+        conflicts = validate_shows(shows)
+        if conflicts:
+            return [], conflicts
+
+        created = Show.objects.bulk_create(shows, batch_size=batch_size)
+        # bulk_create doesn't send post_save
+        bump_catalog_version("show")
+
+    return created, []
@@ -1,6 +1,10 @@
+from datetime import timedelta
+
 from rest_framework import serializers
 
 from .models import Genre, Movie, Show, Theater
+from .renditions import get_rendition_urls
+from .scheduling import check_show_conflicts
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -13,10 +17,22 @@ class MovieListSerializer(serializers.ModelSerializer):
     """Simplified serializer for listing movies"""
 
     genres = GenreSerializer(many=True, read_only=True)
+    poster_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Movie
-        fields = ("id", "title", "release_date", "rating", "poster_image", "genres")
+        fields = (
+            "id",
+            "title",
+            "release_date",
+            "rating",
+            "poster_image",
+            "poster_renditions",
+            "genres",
+        )
+
+    def get_poster_renditions(self, obj):
+        return get_rendition_urls(obj, "poster_image", self.context.get("request"))
 
 
 class MovieDetailSerializer(serializers.ModelSerializer):
@@ -30,6 +46,8 @@ class MovieDetailSerializer(serializers.ModelSerializer):
         source="genres",
         required=False,
     )
+    poster_renditions = serializers.SerializerMethodField()
+    backdrop_renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Movie
@@ -42,7 +60,9 @@ class MovieDetailSerializer(serializers.ModelSerializer):
             "genres",
             "genre_ids",
             "poster_image",
+            "poster_renditions",
             "backdrop_image",
+            "backdrop_renditions",
             "trailer_url",
             "rating",
             "director",
@@ -53,6 +73,12 @@ class MovieDetailSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("created_at", "updated_at")
 
+    def get_poster_renditions(self, obj):
+        return get_rendition_urls(obj, "poster_image", self.context.get("request"))
+
+    def get_backdrop_renditions(self, obj):
+        return get_rendition_urls(obj, "backdrop_image", self.context.get("request"))
+
     def create(self, validated_data):
         genres_data = validated_data.pop("genres", [])
         movie = Movie.objects.create(**validated_data)
@@ -133,3 +159,120 @@ class ShowDetailSerializer(serializers.ModelSerializer):
             "updated_at",
         )
         read_only_fields = ("created_at", "updated_at", "available_seats")
+
+    def validate(self, attrs):
+        """Reject shows that end before they start or clash with the schedule."""
+        instance = self.instance
+        theater = attrs.get("theater", getattr(instance, "theater", None))
+        start_time = attrs.get("start_time", getattr(instance, "start_time", None))
+        end_time = attrs.get("end_time", getattr(instance, "end_time", None))
+        is_active = attrs.get("is_active", getattr(instance, "is_active", True))
+
+        if start_time and end_time and end_time <= start_time:
+            raise serializers.ValidationError(
+                {"end_time": "End time must be after start time."}
+            )
+
+        if is_active and theater and start_time and end_time:
+            conflicts = check_show_conflicts(
+                theater, start_time, end_time, instance=instance
+            )
+            if conflicts:
+                raise serializers.ValidationError(
+                    {
+                        "non_field_errors": [
+                            "This show conflicts with the theater's schedule."
+                        ],
+                        "conflicts": conflicts,
+                    }
+                )
+
+        return attrs
+
+
+class ProposedShowSerializer(serializers.Serializer):
+    """A show in a proposed schedule that hasn't been created yet"""
+
+    theater_id = serializers.PrimaryKeyRelatedField(
+        queryset=Theater.objects.all(), source="theater"
+    )
+    movie_id = serializers.PrimaryKeyRelatedField(
+        queryset=Movie.objects.all(), source="movie", required=False
+    )
+    start_time = serializers.DateTimeField()
+    end_time = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if attrs["end_time"] <= attrs["start_time"]:
+            raise serializers.ValidationError(
+                {"end_time": "End time must be after start time."}
+            )
+        return attrs
+
+
+class ScheduleValidationSerializer(serializers.Serializer):
+    """Input for validating a batch of proposed shows in one request"""
+
+    shows = ProposedShowSerializer(many=True, allow_empty=False)
+
+
+class ScheduleSlotSerializer(serializers.Serializer):
+    """A daily time slot in a recurring schedule template"""
+
+    time = serializers.TimeField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    show_type = serializers.ChoiceField(
+        choices=Show.SHOW_TYPE_CHOICES, default="REGULAR"
+    )
+
+
+class ScheduleTemplateSerializer(serializers.Serializer):
+    """
+    Recurring schedule template, e.g. movie X in theater Y at these times
+    daily for four weeks.
+    """
+
+    MAX_SHOWS = 5000
+
+    movie_id = serializers.PrimaryKeyRelatedField(
+        queryset=Movie.objects.filter(is_active=True), source="movie"
+    )
+    theater_id = serializers.PrimaryKeyRelatedField(
+        queryset=Theater.objects.filter(is_active=True), source="theater"
+    )
+    start_date = serializers.DateField()
+    end_date = serializers.DateField(required=False)
+    weeks = serializers.IntegerField(min_value=1, max_value=52, required=False)
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        required=False,
+        allow_empty=False,
+        help_text="Days of the week to schedule (Monday is 0). Defaults to daily.",
+    )
+    slots = ScheduleSlotSerializer(many=True, allow_empty=False)
+    total_seats = serializers.IntegerField(min_value=1, required=False)
+    duration_minutes = serializers.IntegerField(min_value=1, required=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if "end_date" not in attrs:
+            if "weeks" not in attrs:
+                raise serializers.ValidationError(
+                    "Either end_date or weeks must be provided."
+                )
+            attrs["end_date"] = attrs["start_date"] + timedelta(
+                weeks=attrs["weeks"], days=-1
+            )
+
+        if attrs["end_date"] < attrs["start_date"]:
+            raise serializers.ValidationError(
+                {"end_date": "End date must not be before start date."}
+            )
+
+        days = (attrs["end_date"] - attrs["start_date"]).days + 1
+        if days * len(attrs["slots"]) > self.MAX_SHOWS:
+            raise serializers.ValidationError(
+                f"A schedule template can create at most {self.MAX_SHOWS} shows."
+            )
+
+        return attrs
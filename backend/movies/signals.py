@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .etags import bump_catalog_version
+from .models import Genre, Movie, Show, Theater
+from .renditions import (
+    stored_rendition_names,
+    delete_renditions,
+    needs_renditions,
+    schedule_movie_renditions,
+)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+@receiver(post_save, sender=Theater)
+@receiver(post_delete, sender=Theater)
+@receiver(post_save, sender=Show)
+@receiver(post_delete, sender=Show)
+def invalidate_catalog_etags(sender, **kwargs):
+    """
+    Replace the catalog version stamp of the model that was written, which
+    changes the ETag of every endpoint that includes it.
+    """
+    bump_catalog_version(sender._meta.model_name)
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+def invalidate_movie_genre_etags(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_catalog_version("movie")
+
+
+@receiver(post_save, sender=Movie)
+def render_movie_images(sender, instance, raw=False, **kwargs):
+    """Render the renditions of new or removed images after the save commits."""
+    if not raw and needs_renditions(instance):
+        schedule_movie_renditions(instance.pk)
+
+
+@receiver(post_delete, sender=Movie)
+def delete_movie_renditions(sender, instance, **kwargs):
+    names = stored_rendition_names(instance.renditions)
+    if names:
+        transaction.on_commit(lambda: delete_renditions(names))
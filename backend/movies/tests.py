@@ -1,3 +1,225 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta, timezone
 
-# Create your tests here.
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from dashboard.models import VersionStamp
+from users.models import CustomUser
+
+from .models import Genre, Movie
+from .renditions import (
+    RENDITION_ROOT,
+    RENDITION_SIZES,
+    _render_in_background,
+    generate_movie_renditions,
+    needs_renditions,
+    stored_rendition_names,
+)
+from .scheduling import ScheduleSlot, find_conflicts
+
+BUFFER = timedelta(minutes=15)
+START = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def slot(key, theater_id, start_hours, end_hours, is_existing=False):
+    return ScheduleSlot(
+        key,
+        theater_id,
+        START + timedelta(hours=start_hours),
+        START + timedelta(hours=end_hours),
+        is_existing,
+    )
+
+
+class FindConflictsTests(SimpleTestCase):
+    def test_back_to_back_shows_with_buffer_do_not_conflict(self):
+        slots = [slot(0, 1, 0, 2), slot(1, 1, 2.25, 4)]
+        self.assertEqual(find_conflicts(slots, BUFFER), [])
+
+    def test_overlap_and_buffer_violations_are_reported(self):
+        slots = [slot(0, 1, 0, 2), slot(1, 1, 1, 3), slot(2, 1, 3.1, 5)]
+        conflicts = find_conflicts(slots, BUFFER)
+
+        self.assertEqual(
+            [(c["show"], c["conflicts_with"], c["type"]) for c in conflicts],
+            [
+                ({"index": 1}, {"index": 0}, "overlap"),
+                ({"index": 2}, {"index": 1}, "cleaning_buffer"),
+            ],
+        )
+
+    def test_theaters_are_checked_independently(self):
+        slots = [slot(0, 1, 0, 2), slot(1, 2, 0, 2)]
+        self.assertEqual(find_conflicts(slots, BUFFER), [])
+
+    def test_existing_shows_are_not_compared_with_each_other(self):
+        slots = [slot(1, 1, 0, 2, True), slot(2, 1, 1, 3, True), slot(0, 1, 1.5, 4)]
+        conflicts = find_conflicts(slots, BUFFER)
+
+        self.assertEqual(len(conflicts), 2)
+        self.assertTrue(all(c["show"] == {"index": 0} for c in conflicts))
+
+
+# A stand-in for the shared Redis stamp cache
+SHARED_STAMP_CACHE = {
+    **settings.CACHES,
+    "version_stamps": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "version-stamps",
+    },
+}
+
+UNREACHABLE_STAMP_CACHE = {
+    **settings.CACHES,
+    "version_stamps": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:1/0",
+    },
+}
+
+
+@override_settings(CACHES=SHARED_STAMP_CACHE)
+@mock.patch("xcounter.cache_utils._stamp_cache_retry_at", 0)
+class CatalogETagTests(TestCase):
+    url = "/api/movies/genres/"
+
+    def setUp(self):
+        caches["version_stamps"].clear()
+        self.client = APIClient()
+        Genre.objects.create(name="Drama")
+
+    def test_matching_etag_is_answered_with_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_write_invalidates_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Genre.objects.create(name="Comedy")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_bump_from_another_process_invalidates_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        # Other workers share the stamps in the stamp cache
+        caches["version_stamps"].set("version_stamp:catalog:genre", "bumped")
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unreachable_stamp_cache_falls_back_to_database(self):
+        with override_settings(CACHES=UNREACHABLE_STAMP_CACHE), self.assertLogs(
+            "xcounter.cache_utils", "WARNING"
+        ):
+            etag = self.client.get(self.url)["ETag"]
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+            VersionStamp.objects.filter(name="catalog:genre").update(stamp="bumped")
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), MOVIE_RENDITIONS_ASYNC=False)
+class RenditionTests(TestCase):
+    def setUp(self):
+        self.movie = Movie.objects.create(
+            title="Poster Movie",
+            description="Poster movie",
+            release_date=date(2025, 1, 1),
+            duration_minutes=100,
+            poster_image=self.upload("poster.png"),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(
+            CustomUser.objects.create_user(email="customer@example.com")
+        )
+
+    def tearDown(self):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, name):
+        output = io.BytesIO()
+        Image.new("RGB", (400, 600), "red").save(output, "PNG")
+        return SimpleUploadedFile(name, output.getvalue(), content_type="image/png")
+
+    def get_renditions(self):
+        response = self.client.get(f"/api/movies/movies/{self.movie.pk}/")
+        return response.data["poster_renditions"]
+
+    def test_requests_do_not_render(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertEqual(self.get_renditions(), {})
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(default_storage.exists(RENDITION_ROOT))
+
+    def test_upload_is_rendered_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.poster_image = self.upload("new-poster.png")
+            self.movie.save()
+            # Nothing is rendered before the save commits
+            self.assertFalse(default_storage.exists(RENDITION_ROOT))
+
+        self.assertNotEqual(self.get_renditions(), {})
+
+    @override_settings(MOVIE_RENDITIONS_ASYNC=True)
+    def test_upload_is_rendered_in_background(self):
+        with mock.patch("movies.renditions._executor") as executor:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.movie.poster_image = self.upload("new-poster.png")
+                self.movie.save()
+
+        executor.submit.assert_called_once_with(_render_in_background, self.movie.pk)
+
+    def test_replaced_image_renditions_are_deleted(self):
+        generate_movie_renditions(self.movie)
+        old_names = stored_rendition_names(self.movie.renditions)
+        self.assertTrue(all(default_storage.exists(name) for name in old_names))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.movie.poster_image = self.upload("new-poster.png")
+            self.movie.save()
+
+        self.movie.refresh_from_db()
+        new_names = stored_rendition_names(self.movie.renditions)
+        self.assertTrue(new_names)
+        self.assertFalse(old_names & new_names)
+        self.assertFalse(any(default_storage.exists(name) for name in old_names))
+        self.assertTrue(all(default_storage.exists(name) for name in new_names))
+
+    def test_stored_renditions_are_served(self):
+        self.assertTrue(generate_movie_renditions(self.movie))
+
+        renditions = self.get_renditions()
+        self.assertEqual(set(renditions), set(RENDITION_SIZES["poster_image"]))
+        self.assertTrue(renditions["thumb"]["webp"].endswith(".webp"))
+
+    def test_new_upload_needs_new_renditions(self):
+        generate_movie_renditions(self.movie)
+        self.movie.refresh_from_db()
+        self.movie.poster_image = self.upload("new-poster.png")
+        self.movie.save()
+
+        self.assertTrue(needs_renditions(self.movie))
+        self.assertEqual(self.get_renditions(), {})
+
+        call_command("generate_movie_renditions", stdout=io.StringIO())
+        self.assertNotEqual(self.get_renditions(), {})
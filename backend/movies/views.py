@@ -2,25 +2,34 @@ from django.db.models import Avg, Count, Prefetch, Q
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from reviews.models import Review, ReviewReply
 from users.permissions import IsAdmin, IsAdminOrModerator
 
+from .etags import CatalogETagMixin
 from .models import Genre, Movie, Show, Theater
+from .scheduling import (
+    create_scheduled_shows,
+    expand_schedule_template,
+    validate_schedule,
+    validate_shows,
+)
 from .serializers import (
     GenreSerializer,
     MovieDetailSerializer,
     MovieListSerializer,
+    ScheduleTemplateSerializer,
+    ScheduleValidationSerializer,
     ShowDetailSerializer,
     ShowListSerializer,
     TheaterSerializer,
 )
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(CatalogETagMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing movie genres.
     Only admins can create, update, or delete genres.
@@ -29,6 +38,7 @@ class GenreViewSet(viewsets.ModelViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [IsAuthenticated]
+    catalog_dependencies = ("genre",)
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ["name", "description"]
 
@@ -45,7 +55,7 @@ class GenreViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
 
-class MovieViewSet(viewsets.ModelViewSet):
+class MovieViewSet(CatalogETagMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing movies.
     Admin can create, update, or delete movies.
@@ -54,6 +64,7 @@ class MovieViewSet(viewsets.ModelViewSet):
     """
 
     permission_classes = [IsAuthenticated]
+    catalog_dependencies = ("movie", "genre")
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -154,7 +165,7 @@ class MovieViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class TheaterViewSet(viewsets.ModelViewSet):
+class TheaterViewSet(CatalogETagMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing theaters.
     Admin can create, update, or delete theaters.
@@ -165,10 +176,19 @@ class TheaterViewSet(viewsets.ModelViewSet):
     queryset = Theater.objects.all()
     serializer_class = TheaterSerializer
     permission_classes = [IsAuthenticated]
+    catalog_dependencies = ("theater",)
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ["name", "location", "description"]
     filterset_fields = ["is_active"]
 
+    def get_etag_variant(self, request):
+        """Admins and moderators also see inactive theaters"""
+        if request.user.is_authenticated and (
+            request.user.is_admin or request.user.is_moderator
+        ):
+            return "staff"
+        return "public"
+
     def get_queryset(self):
         """Filter theaters based on user role"""
         if self.request.user.is_authenticated and (
@@ -196,7 +216,7 @@ class TheaterViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
 
-class ShowViewSet(viewsets.ModelViewSet):
+class ShowViewSet(CatalogETagMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing shows.
     Admin can create, update, or delete shows.
@@ -205,6 +225,7 @@ class ShowViewSet(viewsets.ModelViewSet):
     """
 
     permission_classes = [IsAuthenticated]
+    catalog_dependencies = ("show", "movie", "theater", "genre")
     filter_backends = [
         filters.SearchFilter,
         DjangoFilterBackend,
@@ -214,6 +235,14 @@ class ShowViewSet(viewsets.ModelViewSet):
     ordering_fields = ["start_time", "price"]
     ordering = ["start_time"]
 
+    def get_etag_variant(self, request):
+        """Admins and moderators also see inactive shows"""
+        if request.user.is_authenticated and (
+            request.user.is_admin or request.user.is_moderator
+        ):
+            return "staff"
+        return "public"
+
     def get_queryset(self):
         """Filter shows based on user role and query parameters"""
         if self.request.user.is_authenticated and (
@@ -275,3 +304,81 @@ class ShowViewSet(viewsets.ModelViewSet):
 
         serializer = ShowListSerializer(shows, many=True, context={"request": request})
         return Response(serializer.data)
+
+    @action(detail=False, methods=["post"], url_path="validate-schedule")
+    def validate_schedule(self, request):
+        """
+        API endpoint to check a batch of proposed shows for conflicts.
+
+        Every overlap or cleaning-buffer violation, between proposed shows or
+        with shows already scheduled, is returned in one response.
+        """
+        serializer = ScheduleValidationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        conflicts = validate_schedule(serializer.validated_data["shows"])
+        return Response(
+            {
+                "valid": not conflicts,
+                "conflict_count": len(conflicts),
+                "conflicts": conflicts,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"], url_path="generate-schedule")
+    def generate_schedule(self, request):
+        """
+        API endpoint to create a recurring schedule from a template.
+
+        The template is expanded into shows in memory, checked for conflicts
+        in one pass and inserted with a batched write. With dry_run the shows
+        are validated and returned without being saved.
+        """
+        serializer = ScheduleTemplateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        shows = expand_schedule_template(
+            movie=data["movie"],
+            theater=data["theater"],
+            start_date=data["start_date"],
+            end_date=data["end_date"],
+            slots=data["slots"],
+            weekdays=data.get("weekdays"),
+            total_seats=data.get("total_seats"),
+            duration_minutes=data.get("duration_minutes"),
+        )
+
+        if data["dry_run"]:
+            conflicts = validate_shows(shows)
+            created = []
+        else:
+            created, conflicts = create_scheduled_shows(shows)
+
+        if conflicts:
+            return Response(
+                {
+                    "error": "The schedule has conflicting shows.",
+                    "conflict_count": len(conflicts),
+                    "conflicts": conflicts,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if data["dry_run"]:
+            return Response(
+                {
+                    "dry_run": True,
+                    "show_count": len(shows),
+                    "shows": ShowListSerializer(shows, many=True).data,
+                }
+            )
+
+        return Response(
+            {
+                "show_count": len(created),
+                "shows": ShowListSerializer(created, many=True).data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0003_alter_notification_notification_type_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="notification_type",
+            field=models.CharField(
+                choices=[
+                    ("BOOKING_CONFIRMATION", "Booking Confirmation"),
+                    ("BOOKING_CANCELLATION", "Booking Cancellation"),
+                    ("PAYMENT_CONFIRMATION", "Payment Confirmation"),
+                    ("TICKET_READY", "Ticket Ready"),
+                    ("SYSTEM_ANNOUNCEMENT", "System Announcement"),
+                    ("SHOW_REMINDER", "Show Reminder"),
+                    ("MOVIE_PREMIERE", "Movie Premiere"),
+                    ("USER_INACTIVITY", "User Inactivity"),
+                    ("PROMOTION", "Promotion"),
+                    ("REVIEW_RESPONSE", "Review Response"),
+                    ("NEW_MESSAGE", "New Message"),
+                    ("REPORT_READY", "Report Ready"),
+                ],
+                default="SYSTEM_ANNOUNCEMENT",
+                max_length=50,
+            ),
+        ),
+    ]
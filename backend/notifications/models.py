@@ -15,6 +15,7 @@ class NotificationType(models.TextChoices):
     PROMOTION = "PROMOTION", "Promotion"
     REVIEW_RESPONSE = "REVIEW_RESPONSE", "Review Response"
     NEW_MESSAGE = "NEW_MESSAGE", "New Message"  # Added for message notifications
+    REPORT_READY = "REPORT_READY", "Report Ready"
 
 
 class Notification(models.Model):
@@ -161,8 +161,9 @@ class PointsTransactionAdmin(admin.ModelAdmin):
     )
 
     def reference_display(self, obj):
-        if obj.booking:
-            return f"Booking: {obj.booking.booking_number}"
+        booking_number = obj.get_booking_number()
+        if booking_number:
+            return f"Booking: {booking_number}"
         return obj.reference or "N/A"
 
     reference_display.short_description = "Reference"
@@ -250,6 +250,14 @@ class PointsTransaction(models.Model):
     booking = models.ForeignKey(
         "bookings.Booking", on_delete=models.SET_NULL, null=True, blank=True
     )
+    # Set when the booking is moved to cold storage (see bookings/archive.py)
+    archived_booking = models.ForeignKey(
+        "bookings.ArchivedBooking",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="points_transactions",
+    )
     transaction_date = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -262,6 +270,11 @@ class PointsTransaction(models.Model):
     def __str__(self):
         return f"{self.get_transaction_type_display()}: {self.points} points for {self.customer.user.email}"
 
+    def get_booking_number(self):
+        """Return the number of the booking, live or archived."""
+        booking = self.booking or self.archived_booking
+        return booking.booking_number if booking else None
+
 
 @receiver(post_save, sender="users.CustomUser")
 def create_customer_profile(sender, instance, created, **kwargs):
@@ -43,7 +43,7 @@ class PointsTransactionSerializer(serializers.ModelSerializer):
         read_only_fields = ["transaction_date", "booking_number"]
 
     def get_booking_number(self, obj):
-        return obj.booking.booking_number if obj.booking else None
+        return obj.get_booking_number()
 
 
 class CustomerProfileSerializer(serializers.ModelSerializer):
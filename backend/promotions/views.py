@@ -1,3 +1,4 @@
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
@@ -5,6 +6,7 @@ from rest_framework.response import Response
 
 from users.models import UserProfile
 from users.permissions import IsAdminUser, IsStaffUser
+from xcounter.exports import stream_csv
 
 from .models import CustomerProfile, PointsTransaction, TierBenefit, TransactionType
 from .serializers import (
@@ -214,6 +216,27 @@ class PointsTransactionViewSet(
     filterset_fields = ["transaction_type", "customer__user"]
     search_fields = ["customer__user__email", "reference"]
     ordering_fields = ["transaction_date", "points"]
+    export_columns = [
+        ("Date", "transaction_date"),
+        ("Customer", "customer__user__email"),
+        ("Type", "transaction_type"),
+        ("Points", "points"),
+        ("Reference", "reference"),
+        (
+            "Booking Number",
+            Coalesce("booking__booking_number", "archived_booking__booking_number"),
+        ),
+    ]
 
     def get_queryset(self):
-        return PointsTransaction.objects.all().order_by("-transaction_date")
+        return PointsTransaction.objects.select_related(
+            "booking", "archived_booking"
+        ).order_by("-transaction_date")
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream the points transactions matching the list filters as CSV
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return stream_csv(request, queryset, self.export_columns, "points-transactions")
@@ -18,13 +18,19 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "xcounter.settings")
 
 django_asgi_app = get_asgi_application()
 
+import dashboard.routing
 import notifications.routing
 
 application = ProtocolTypeRouter(
     {
         "http": django_asgi_app,
         "websocket": AllowedHostsOriginValidator(
-            AuthMiddlewareStack(URLRouter(notifications.routing.websocket_urlpatterns))
+            AuthMiddlewareStack(
+                URLRouter(
+                    notifications.routing.websocket_urlpatterns
+                    + dashboard.routing.websocket_urlpatterns
+                )
+            )
         ),
     }
 )
@@ -3,11 +3,27 @@ Cache utilities for the application.
 """
 
 import hashlib
+import logging
+import time
+import uuid
 from functools import wraps
 
+from django.apps import apps
+from django.conf import settings
 from django.core.cache import cache, caches
+from django.db import transaction
 from django.utils.encoding import force_str
 
+logger = logging.getLogger(__name__)
+
+# Cache shared by every process that holds the current version stamps
+VERSION_STAMP_CACHE = "version_stamps"
+
+# Seconds to stop using the stamp cache for after it fails
+VERSION_STAMP_CACHE_RETRY = 30
+
+_stamp_cache_retry_at = 0
+
 
 def generate_cache_key(prefix, *args, **kwargs):
     """
@@ -178,3 +194,117 @@ def clear_model_cache(model, pk=None):
         # For whole model clearing, we rely on cache timeout
         # or could implement a registry of keys per model if needed
         pass
+
+
+def _version_stamp_model():
+    return apps.get_model("dashboard", "VersionStamp")
+
+
+def _version_stamp_key(name):
+    return f"version_stamp:{name}"
+
+
+def _stamp_cache_call(method, *args):
+    """
+    Call a method of the version stamp cache.
+
+    Returns None when no stamp cache is configured or it fails; after a
+    failure it is skipped for VERSION_STAMP_CACHE_RETRY seconds, so an
+    unreachable server doesn't slow every request down.
+    """
+    global _stamp_cache_retry_at
+    if VERSION_STAMP_CACHE not in settings.CACHES:
+        return None
+    if time.monotonic() < _stamp_cache_retry_at:
+        return None
+    try:
+        return getattr(caches[VERSION_STAMP_CACHE], method)(*args)
+    except Exception as e:
+        logger.warning(f"Version stamp cache unavailable: {str(e)}")
+        _stamp_cache_retry_at = time.monotonic() + VERSION_STAMP_CACHE_RETRY
+        return None
+
+
+def get_version_stamp(name):
+    """
+    Get the current version stamp for a named data set.
+
+    A version stamp is an opaque token that changes whenever the data it
+    covers changes. Stamps are read from the "version_stamps" cache, which
+    every process shares, so checking them doesn't touch the database. The
+    database holds them too: it is read when a stamp isn't cached or the
+    cache is unreachable. Stamps are random rather than counters, so a stamp
+    that was handed out never comes back.
+
+    Args:
+        name: Name of the data set (e.g. "genre")
+
+    Returns:
+        The version stamp as a string
+    """
+    return get_version_stamps(name)[0]
+
+
+def get_version_stamps(*names):
+    """
+    Get the version stamps for several data sets, from the stamp cache if
+    they are all in it and with one query otherwise.
+
+    Returns:
+        A list of stamps in the same order as the names
+    """
+    keys = {name: _version_stamp_key(name) for name in names}
+    cached = _stamp_cache_call("get_many", list(keys.values())) or {}
+    if all(key in cached for key in keys.values()):
+        return [cached[keys[name]] for name in names]
+
+    VersionStamp = _version_stamp_model()
+    stamps = dict(
+        VersionStamp.objects.filter(name__in=names).values_list("name", "stamp")
+    )
+    missing = [name for name in dict.fromkeys(names) if name not in stamps]
+    if missing:
+        # First use of these data sets; concurrent callers may create them too
+        VersionStamp.objects.bulk_create(
+            [VersionStamp(name=name, stamp=uuid.uuid4().hex) for name in missing],
+            ignore_conflicts=True,
+        )
+        stamps.update(
+            VersionStamp.objects.filter(name__in=missing).values_list("name", "stamp")
+        )
+
+    # add() never replaces a stamp a concurrent bump has just cached
+    for name in dict.fromkeys(names):
+        if keys[name] not in cached:
+            _stamp_cache_call("add", keys[name], stamps[name])
+    return [stamps[name] for name in names]
+
+
+def bump_version_stamp(*names):
+    """
+    Replace the version stamps of the given data sets once the current
+    transaction commits, so readers never pair a new stamp with old data.
+
+    The new stamps are written to the database and then to the stamp cache.
+    If the cache can't be written, the old stamps it holds expire after the
+    cache's timeout.
+
+    Args:
+        *names: Names of the data sets that changed
+    """
+
+    def bump():
+        VersionStamp = _version_stamp_model()
+        stamps = {name: uuid.uuid4().hex for name in dict.fromkeys(names)}
+        VersionStamp.objects.bulk_create(
+            [VersionStamp(name=name, stamp=stamp) for name, stamp in stamps.items()],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["stamp"],
+        )
+        _stamp_cache_call(
+            "set_many",
+            {_version_stamp_key(name): stamp for name, stamp in stamps.items()},
+        )
+
+    transaction.on_commit(bump)
@@ -152,6 +152,44 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Minimum gap between two shows in the same theater (see movies/scheduling.py)
+SHOW_CLEANING_BUFFER_MINUTES = int(os.environ.get("SHOW_CLEANING_BUFFER_MINUTES", 15))
+
+# Render poster and backdrop renditions of new uploads in a background thread
+# once the save commits, or in the saving thread right after the commit when
+# False (see movies/renditions.py)
+MOVIE_RENDITIONS_ASYNC = os.environ.get("MOVIE_RENDITIONS_ASYNC", "True") == "True"
+
+# Bookings for shows older than this are moved to cold storage by archive_bookings
+BOOKING_ARCHIVE_RETENTION_DAYS = int(
+    os.environ.get("BOOKING_ARCHIVE_RETENTION_DAYS", 365)
+)
+
+# Maximum number of points returned by the metric values endpoint
+METRIC_VALUES_MAX_POINTS = int(os.environ.get("METRIC_VALUES_MAX_POINTS", 500))
+
+# Role dashboard payload cache: how long a payload is kept (it is invalidated
+# by metric writes well before that) and how long a rebuild may hold its lock
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get("DASHBOARD_CACHE_TIMEOUT", 60 * 60 * 24))
+DASHBOARD_CACHE_REBUILD_TIMEOUT = int(
+    os.environ.get("DASHBOARD_CACHE_REBUILD_TIMEOUT", 30)
+)
+
+# Batched chart endpoint: charts per request and threads computing cache misses
+CHART_BATCH_MAX_CHARTS = int(os.environ.get("CHART_BATCH_MAX_CHARTS", 20))
+CHART_BATCH_MAX_WORKERS = int(os.environ.get("CHART_BATCH_MAX_WORKERS", 4))
+
+# Report generation queue (see dashboard/report_queue.py): render reports in
+# run_report_workers processes (or inline when False), how many at a time,
+# and after how many seconds a report still processing is considered failed
+REPORT_GENERATION_ASYNC = os.environ.get("REPORT_GENERATION_ASYNC", "True") == "True"
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", 2))
+REPORT_JOB_TIMEOUT = int(os.environ.get("REPORT_JOB_TIMEOUT", 60 * 30))
+
+# Rows read per database round trip by the streaming CSV exports
+# (see xcounter/exports.py)
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))
+
 # REST Framework settings
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
@@ -211,6 +249,19 @@ CACHES = {
             "CULL_FREQUENCY": 3,  # Purge 1/3 of entries when MAX_ENTRIES is reached
         },
     },
+    # Version stamps (see xcounter/cache_utils.py), shared by every process so
+    # conditional GETs don't need the database. Stamps are also stored in the
+    # database, which is used when Redis is unreachable and refills the cache
+    # after a stamp expires
+    "version_stamps": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get(
+            "VERSION_STAMP_CACHE_URL", "redis://127.0.0.1:6379/1"
+        ),
+        "TIMEOUT": int(os.environ.get("VERSION_STAMP_CACHE_TIMEOUT", 300)),
+        "KEY_PREFIX": "xcounter",
+        "OPTIONS": {"socket_connect_timeout": 1, "socket_timeout": 1},
+    },
 }
 
 # Cache key prefix to avoid clashes with other applications